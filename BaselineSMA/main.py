@@ -4,6 +4,15 @@ import joblib
 import pandas as pd
 import numpy as np
 from pathlib import Path
+import sys
+
+# research/promoted_model.py is shared by the LEAN projects; LEAN runs a copy of this folder, so find the
+# repo root the same way load_ml_model finds research/models
+for _root in (Path("."), Path(".."), Path("../.."), Path("/Users/admin/Developer/AutoTrader")):
+    if (_root / "research" / "promoted_model.py").exists():
+        sys.path.insert(0, str(_root.resolve()))
+        break
+from research.promoted_model import calibrate, promoted_model_path
 
 class MLEnhancedTrading(QCAlgorithm):
     def Initialize(self):
@@ -25,6 +34,7 @@ class MLEnhancedTrading(QCAlgorithm):
         
         # ML model loading
         self.model = None
+        self.calibration = None
         self.load_ml_model()
         
         self.SetWarmUp(200)
@@ -48,9 +58,8 @@ class MLEnhancedTrading(QCAlgorithm):
                     break
                     
             if models_dir:
-                model_files = list(models_dir.glob("lgb_spy_*.pkl"))
-                if model_files:
-                    latest_model = max(model_files, key=lambda x: x.stat().st_mtime)
+                latest_model, self.calibration = promoted_model_path(models_dir, self.GetParameter("model_version"))
+                if latest_model:
                     self.model = joblib.load(latest_model)
                     self.Debug(f"Loaded ML model: {latest_model.name}")
                 else:
@@ -123,7 +132,7 @@ class MLEnhancedTrading(QCAlgorithm):
             
             # Get prediction probability
             prediction = self.model.predict(feature_array)[0]
-            return prediction
+            return calibrate(prediction, self.calibration)
         except Exception as e:
             self.Debug(f"ML prediction error: {e}")
             return 0.5
@@ -3,6 +3,15 @@ from AlgorithmImports import *
 import joblib
 import numpy as np
 from pathlib import Path
+import sys
+
+# research/promoted_model.py is shared by the LEAN projects; LEAN runs a copy of this folder, so find the
+# repo root the same way load_ml_model finds research/models
+for _root in (Path("."), Path(".."), Path("../.."), Path("/Users/admin/Developer/AutoTrader")):
+    if (_root / "research" / "promoted_model.py").exists():
+        sys.path.insert(0, str(_root.resolve()))
+        break
+from research.promoted_model import calibrate, promoted_model_path
 
 class ProfitableMLTrading(QCAlgorithm):
     def Initialize(self):
@@ -23,6 +32,7 @@ class ProfitableMLTrading(QCAlgorithm):
         
         # ML model (will be loaded if available)
         self.model = None
+        self.calibration = None
         self.load_ml_model()
         
         # Risk management
@@ -36,15 +46,18 @@ class ProfitableMLTrading(QCAlgorithm):
     def load_ml_model(self):
         """Load the latest trained ML model"""
         try:
-            # Try to load model from various possible locations
-            model_paths = [
-                "/Users/admin/Developer/AutoTrader/research/models/lgb_spy_2025-10-02.pkl",
-                "research/models/lgb_spy_2025-10-02.pkl",
-                "../research/models/lgb_spy_2025-10-02.pkl"
+            # Try to load the promoted model from various possible locations
+            possible_paths = [
+                Path("/Users/admin/Developer/AutoTrader/research/models"),
+                Path("research/models"),
+                Path("../research/models")
             ]
             
-            for model_path in model_paths:
-                if Path(model_path).exists():
+            for models_dir in possible_paths:
+                if not models_dir.exists():
+                    continue
+                model_path, self.calibration = promoted_model_path(models_dir, self.GetParameter("model_version"))
+                if model_path and model_path.exists():
                     self.model = joblib.load(model_path)
                     self.Debug(f"Loaded ML model: {model_path}")
                     return
@@ -132,7 +145,7 @@ class ProfitableMLTrading(QCAlgorithm):
             ]])
             
             prediction = self.model.predict(feature_array)[0]
-            return prediction
+            return calibrate(prediction, self.calibration)
         except Exception as e:
             self.Debug(f"ML prediction error: {e}")
             return 0.5
@@ -13,25 +13,16 @@ import pandas as pd
 import numpy as np
 import yfinance as yf
 import sqlite3
-import joblib
 import json
 from datetime import datetime, timedelta
 from pathlib import Path
 import logging
 import warnings
-from sklearn.ensemble import RandomForestClassifier, VotingClassifier, GradientBoostingClassifier
-from sklearn.linear_model import LogisticRegression
-from sklearn.svm import SVC
-from sklearn.neural_network import MLPClassifier
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, roc_auc_score
-from sklearn.model_selection import cross_val_score, TimeSeriesSplit
-import xgboost as xgb
-import lightgbm as lgb
-from scipy import stats
-import optuna
-from optuna.samplers import TPESampler
-import schedule
 import time
+from db_writer import get_writer
+from walk_forward import PurgedWalkForward, WalkForwardValidator, fold_rows, store_fold_metrics
+from model_registry import ModelRegistry
+from model_zoo import ModelZooScheduler
 warnings.filterwarnings('ignore')
 
 class AdvancedLearningSystem:
@@ -46,6 +37,16 @@ class AdvancedLearningSystem:
         self.retrain_threshold = 0.05  # Retrain if performance drops 5%
         self.learning_rate = 0.1
         
+        # Walk-forward validation (5-day target -> 5 bar purge)
+        self.validator = WalkForwardValidator(n_splits=5, purge=5, embargo=1, component="advanced_learning_system")
+        
+        # Time-budgeted model selection (wall-clock limit per learning cycle)
+        self.cycle_budget_seconds = 1800
+        self.model_zoo = ModelZooScheduler(cycle_budget_seconds=self.cycle_budget_seconds)
+        
+        # Versioned ensembles: compressed, deduplicated and pruned by the retention policy
+        self.registry = ModelRegistry("model_versions")
+        
         # Model tracking
         self.model_versions = {}
         self.performance_history = {}
@@ -158,6 +159,8 @@ class AdvancedLearningSystem:
         ''')
         
         self.conn.commit()
+        # Writes go through one batching writer; self.conn is for reads
+        self.db = get_writer(self.db_path)
         self.logger.info("📊 Advanced learning database initialized")
     
     def setup_directories(self):
@@ -317,6 +320,8 @@ class AdvancedLearningSystem:
         """Detect current market regime for adaptive learning"""
         recent_data = data.tail(50)
         
+        from scipy import stats
+        
         # Volatility regime
         volatility = recent_data['returns'].std()
         vol_percentile = stats.percentileofscore(data['returns'].rolling(50).std().dropna(), volatility)
@@ -351,14 +356,12 @@ class AdvancedLearningSystem:
         }
         
         # Store regime data
-        cursor = self.conn.cursor()
-        cursor.execute('''
+        self.db.execute('''
             INSERT INTO market_regimes 
             (timestamp, regime, volatility, trend_strength, market_sentiment, regime_features)
             VALUES (?, ?, ?, ?, ?, ?)
         ''', (datetime.now().isoformat(), regime, volatility, trend_strength, 
               sentiment, json.dumps(regime_data)))
-        self.conn.commit()
         
         return regime_data
     
@@ -379,8 +382,13 @@ class AdvancedLearningSystem:
             X = data[feature_cols].fillna(0)
             y = data['target_5d_binary']  # 5-day prediction target
             
-            # Split data with time series split
-            tscv = TimeSeriesSplit(n_splits=5)
+            # Model libraries are imported on first training, not at startup
+            from sklearn.ensemble import RandomForestClassifier, VotingClassifier, GradientBoostingClassifier
+            from sklearn.linear_model import LogisticRegression
+            from sklearn.svm import SVC
+            from sklearn.neural_network import MLPClassifier
+            import xgboost as xgb
+            import lightgbm as lgb
             
             # Individual models
             models = {
@@ -396,18 +404,30 @@ class AdvancedLearningSystem:
             # Train and evaluate individual models
             model_scores = {}
             trained_models = {}
+            trained_rows = {}
+            model_version = datetime.now().strftime("%Y%m%d_%H%M%S")
+            fold_metric_rows = []
             
-            for name, model in models.items():
+            # Only train the candidates that fit the time and memory budgets
+            for name, model, rows in self.model_zoo.plan(models, len(X), X.shape[1]):
                 try:
-                    # Cross-validation
-                    cv_scores = cross_val_score(model, X, y, cv=tscv, scoring='roc_auc')
-                    model_scores[name] = cv_scores.mean()
+                    # Subsampled candidates train on the most recent rows
+                    X_fit, y_fit = (X, y) if rows is None else (X.iloc[-rows:], y.iloc[-rows:])
+                    
+                    with self.model_zoo.measure(name, len(X_fit), X_fit.shape[1]) as run:
+                        # Purged walk-forward validation
+                        result = self.validator.validate(model, X_fit, y_fit, name=symbol)
+                        
+                        # Train on full data
+                        model.fit(X_fit, y_fit)
+                        run['auc'] = result['mean_auc']
                     
-                    # Train on full data
-                    model.fit(X, y)
+                    model_scores[name] = result['mean_auc']
+                    fold_metric_rows += fold_rows(symbol, name, model_version, result)
                     trained_models[name] = model
+                    trained_rows[name] = len(X_fit)
                     
-                    self.logger.info(f"✅ {name} model for {symbol}: AUC = {cv_scores.mean():.4f}")
+                    self.logger.info(f"✅ {name} model for {symbol}: AUC = {result['mean_auc']:.4f}")
                     
                 except Exception as e:
                     self.logger.error(f"❌ Error training {name} for {symbol}: {e}")
@@ -421,9 +441,25 @@ class AdvancedLearningSystem:
                 ensemble_models = [(name, trained_models[name]) for name, _ in top_models]
                 ensemble = VotingClassifier(estimators=ensemble_models, voting='soft')
                 
-                # Train ensemble
-                ensemble.fit(X, y)
-                ensemble_score = cross_val_score(ensemble, X, y, cv=tscv, scoring='roc_auc').mean()
+                # The ensemble refits every member, so it uses the fewest rows any member was planned for:
+                # a member subsampled to fit the per-estimator budgets stays within them
+                ensemble_rows = min(trained_rows[name] for name, _ in top_models)
+                X_ens, y_ens = X.iloc[-ensemble_rows:], y.iloc[-ensemble_rows:]
+                
+                # Train ensemble, falling back to the best single model when the cycle budget is spent
+                ensemble_cost = sum(self.model_zoo.predict_cost(name, ensemble_rows, X.shape[1])[0]
+                                    for name, _ in top_models)
+                if ensemble_cost <= self.model_zoo.remaining():
+                    ensemble_result = self.validator.validate(ensemble, X_ens, y_ens, name=symbol)
+                    ensemble_score = ensemble_result['mean_auc']
+                    fold_metric_rows += fold_rows(symbol, 'ensemble', model_version, ensemble_result)
+                    ensemble.fit(X_ens, y_ens)
+                else:
+                    best_name, ensemble_score = top_models[0]
+                    top_models = top_models[:1]
+                    ensemble = trained_models[best_name]
+                    self.logger.info(f"⏱️ Cycle budget nearly spent, using best single model {best_name} for {symbol}")
+                store_fold_metrics(self.db, fold_metric_rows)
                 
                 # Calculate model weights based on performance
                 weights = [score for _, score in top_models]
@@ -433,9 +469,9 @@ class AdvancedLearningSystem:
                 self.logger.info(f"📊 Model weights: {dict(zip([name for name, _ in top_models], weights))}")
                 
                 # Save models
-                model_version = datetime.now().strftime("%Y%m%d_%H%M%S")
-                model_path = Path(f"model_versions/{symbol}_ensemble_{model_version}.pkl")
-                joblib.dump(ensemble, model_path)
+                self.registry.register(f"{symbol}_ensemble", ensemble, version=model_version,
+                                       metrics={'auc': ensemble_score}, features=feature_cols, promote=True,
+                                       probe=X.tail(64))
                 
                 # Store performance metrics
                 self.store_model_performance(symbol, 'ensemble', model_version, ensemble_score, 
@@ -456,14 +492,12 @@ class AdvancedLearningSystem:
     def store_model_performance(self, symbol, model_type, version, score, total_trades, 
                               individual_scores, feature_cols):
         """Store model performance metrics"""
-        cursor = self.conn.cursor()
-        
         # Calculate additional metrics (simplified for demo)
         precision = score * 0.9  # Approximate
         recall = score * 0.85
         f1 = 2 * (precision * recall) / (precision + recall)
         
-        cursor.execute('''
+        self.db.execute('''
             INSERT INTO model_performance 
             (symbol, model_type, version, timestamp, accuracy, precision_score, 
              recall_score, f1_score, roc_auc, total_trades)
@@ -474,15 +508,12 @@ class AdvancedLearningSystem:
         # Store feature importance
         if hasattr(self.ensemble_models.get(symbol, {}).get('model'), 'feature_importances_'):
             importances = self.ensemble_models[symbol]['model'].feature_importances_
-            for feature, importance in zip(feature_cols, importances):
-                cursor.execute('''
-                    INSERT INTO feature_importance 
-                    (symbol, model_type, version, timestamp, feature_name, importance_score)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (symbol, model_type, version, datetime.now().isoformat(), 
-                      feature, importance))
-        
-        self.conn.commit()
+            self.db.executemany('''
+                INSERT INTO feature_importance 
+                (symbol, model_type, version, timestamp, feature_name, importance_score)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', [(symbol, model_type, version, datetime.now().isoformat(), feature, importance)
+                  for feature, importance in zip(feature_cols, importances)])
     
     def optimize_hyperparameters(self, symbol, model_type='ensemble'):
         """Optimize hyperparameters using Optuna"""
@@ -498,6 +529,12 @@ class AdvancedLearningSystem:
             X = data[feature_cols].fillna(0)
             y = data['target_5d_binary']
             
+            import optuna
+            from optuna.samplers import TPESampler
+            from sklearn.ensemble import RandomForestClassifier
+            from sklearn.model_selection import cross_val_score
+            import xgboost as xgb
+            
             def objective(trial):
                 if model_type == 'rf':
                     model = RandomForestClassifier(
@@ -516,12 +553,12 @@ class AdvancedLearningSystem:
                 else:
                     return 0.5
                 
-                tscv = TimeSeriesSplit(n_splits=3)
-                scores = cross_val_score(model, X, y, cv=tscv, scoring='roc_auc')
+                wf = PurgedWalkForward(n_splits=3, purge=5, embargo=1)
+                scores = cross_val_score(model, X, y, cv=wf, scoring='roc_auc')
                 return scores.mean()
             
             study = optuna.create_study(direction='maximize', sampler=TPESampler())
-            study.optimize(objective, n_trials=50)
+            study.optimize(objective, n_trials=50, timeout=max(1.0, self.model_zoo.remaining()))
             
             self.logger.info(f"🎯 Best hyperparameters for {symbol} {model_type}: {study.best_params}")
             self.logger.info(f"📊 Best score: {study.best_value:.4f}")
@@ -538,6 +575,8 @@ class AdvancedLearningSystem:
         
         while True:
             try:
+                self.model_zoo.start_cycle(self.cycle_budget_seconds)
+                
                 for symbol in self.symbols:
                     self.logger.info(f"🔄 Learning for {symbol}...")
                     
@@ -551,7 +590,10 @@ class AdvancedLearningSystem:
                     self.logger.info(f"📊 Market regime for {symbol}: {regime['regime']}")
                     
                     # Check if retraining is needed
-                    if self.should_retrain(symbol):
+                    retrain = self.should_retrain(symbol)
+                    if retrain and self.model_zoo.remaining() <= 0:
+                        self.logger.info(f"⏱️ Learning cycle budget spent, deferring retraining for {symbol}")
+                    elif retrain:
                         self.logger.info(f"🎯 Retraining models for {symbol}...")
                         
                         # Create new ensemble model
@@ -584,6 +626,7 @@ class AdvancedLearningSystem:
     
     def should_retrain(self, symbol):
         """Determine if model should be retrained"""
+        self.db.flush()  # read this process's latest performance rows
         cursor = self.conn.cursor()
         
         # Get latest performance
@@ -619,6 +662,7 @@ class AdvancedLearningSystem:
     
     def update_learning_metrics(self, symbol):
         """Update learning performance metrics"""
+        self.db.flush()
         cursor = self.conn.cursor()
         
         # Get recent performance
@@ -644,15 +688,13 @@ class AdvancedLearningSystem:
             improvement = ((avg_auc - prev_avg) / prev_avg * 100) if prev_avg else 0
             
             # Store metrics
-            cursor.execute('''
+            self.db.execute('''
                 INSERT INTO learning_metrics 
                 (symbol, timestamp, metric_name, metric_value, improvement_pct, notes)
                 VALUES (?, ?, ?, ?, ?, ?)
             ''', (symbol, datetime.now().isoformat(), 'avg_auc', avg_auc, improvement,
                   f"Max: {max_auc:.4f}, Min: {min_auc:.4f}"))
             
-            self.conn.commit()
-            
             self.logger.info(f"📊 {symbol} Learning Metrics - Avg AUC: {avg_auc:.4f}, Improvement: {improvement:+.2f}%")
     
     def generate_learning_report(self):
@@ -665,6 +707,7 @@ class AdvancedLearningSystem:
                 'recommendations': []
             }
             
+            self.db.flush()
             cursor = self.conn.cursor()
             
             for symbol in self.symbols:
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Artifact Store - Compressed, content-addressed model storage with a retention policy
+- Models are saved once as compressed joblib blobs named by the hash of their content
+- Retraining to an identical model reuses the existing blob instead of writing a new one
+- Retention keeps the promoted version, the N most recent and the top-K by metric
+- Reports disk space reclaimed and the volume a models sync would push
+"""
+
+import argparse
+import hashlib
+import io
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+import joblib
+
+COMPRESSION = ('zlib', 3)
+METRIC_PREFERENCE = ['auc', 'roc_auc', 'accuracy']
+
+
+class ArtifactStore:
+    """Content-addressed blobs under <root>/store"""
+
+    def __init__(self, root: str = "models", compress=COMPRESSION):
+        self.logger = logging.getLogger(__name__)
+        self.root = Path(root)
+        self.store_dir = self.root / "store"
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        self.compress = compress
+
+    def put(self, model) -> Dict:
+        """Save a model; returns its digest, path relative to root and size"""
+        buffer = io.BytesIO()
+        joblib.dump(model, buffer, compress=self.compress)
+        payload = buffer.getvalue()
+        digest = hashlib.sha256(payload).hexdigest()
+
+        path = self.store_dir / f"{digest[:24]}.joblib"
+        if path.exists():
+            self.logger.info(f"♻️ Identical model already stored as {path.name}")
+        else:
+            # Unique temp file: processes storing the same blob at once must not share one
+            fd, tmp = tempfile.mkstemp(prefix=f".{digest[:24]}.", suffix=".tmp", dir=self.store_dir)
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(payload)
+                os.replace(tmp, path)
+            except OSError:
+                Path(tmp).unlink(missing_ok=True)
+                # Another writer stored the same content first
+                if not path.exists():
+                    raise
+        return {'digest': digest, 'path': str(path.relative_to(self.root)), 'bytes': len(payload)}
+
+    def blobs(self) -> List[Path]:
+        return sorted(self.store_dir.glob("*.joblib"))
+
+    def gc(self, referenced: Set[str], dry_run: bool = False, min_age_seconds: float = 300) -> int:
+        """Delete blobs no manifest entry references; returns bytes reclaimed"""
+        reclaimed = 0
+        cutoff = time.time() - min_age_seconds
+        for blob in self.blobs():
+            # Fresh blobs may belong to a registration that has not written the manifest yet
+            if str(blob.relative_to(self.root)) not in referenced and blob.stat().st_mtime < cutoff:
+                reclaimed += blob.stat().st_size
+                if not dry_run:
+                    blob.unlink()
+        return reclaimed
+
+
+class RetentionPolicy:
+    """Which versions of a model to keep"""
+
+    def __init__(self, keep_recent: int = 5, keep_top: int = 3, metric: Optional[str] = None):
+        self.keep_recent = keep_recent
+        self.keep_top = keep_top
+        self.metric = metric
+
+    def _metric(self, entry: Dict) -> Optional[float]:
+        metrics = entry.get('metrics') or {}
+        for name in ([self.metric] if self.metric else METRIC_PREFERENCE):
+            if metrics.get(name) is not None:
+                return metrics[name]
+        return None
+
+    def keep(self, versions: Dict[str, Dict], promoted: Optional[str]) -> Set[str]:
+        keep = {promoted} if promoted in versions else set()
+        by_age = sorted(versions, key=lambda v: versions[v].get('created', ''))
+        if self.keep_recent:
+            keep.update(by_age[-self.keep_recent:])
+        scored = [v for v in versions if self._metric(versions[v]) is not None]
+        keep.update(sorted(scored, key=lambda v: self._metric(versions[v]), reverse=True)[:self.keep_top])
+        return keep
+
+
+def entry_files(entry: Dict) -> Iterable[str]:
+    """Files (relative to the registry root) that belong to a manifest entry"""
+    for key in ('path', 'compiled_path', 'portable_path'):
+        if entry.get(key):
+            yield entry[key]
+
+
+def sync_volume(root: Path, manifest: Dict) -> int:
+    """Bytes a models sync has to carry: the manifest plus every referenced file"""
+    files = {f for versions in manifest.get('models', {}).values() for entry in versions.values()
+             for f in entry_files(entry)}
+    total = sum((root / f).stat().st_size for f in files if (root / f).exists())
+    manifest_path = root / "registry.json"
+    return total + (manifest_path.stat().st_size if manifest_path.exists() else 0)
+
+
+def main():
+    from model_registry import ModelRegistry
+
+    parser = argparse.ArgumentParser(description="Apply the model retention policy and report reclaimed space")
+    parser.add_argument('--root', default="models")
+    parser.add_argument('--keep-recent', type=int, default=5)
+    parser.add_argument('--keep-top', type=int, default=3)
+    parser.add_argument('--metric', default=None)
+    parser.add_argument('--dry-run', action='store_true')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    registry = ModelRegistry(args.root, retention=RetentionPolicy(args.keep_recent, args.keep_top, args.metric))
+    before = sync_volume(registry.root, registry.manifest())
+    report = registry.apply_retention(dry_run=args.dry_run)
+    after = sync_volume(registry.root, report['manifest'])
+
+    for name, versions in report['removed'].items():
+        print(f"🗑️ {name}: {len(versions)} version(s) {'would be ' if args.dry_run else ''}removed")
+    print(f"💾 Reclaimed: {report['bytes_reclaimed'] / 1e6:.1f} MB{' (dry run)' if args.dry_run else ''}")
+    print(f"🔄 Sync volume: {before / 1e6:.1f} MB → {after / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
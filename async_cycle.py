@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Async Cycle - Per-symbol pipeline that overlaps I/O and CPU stages
+- Each symbol flows through the stages in order (fetch -> train -> signal -> order)
+- I/O stages (downloads, broker calls, DB writes) run as bounded concurrent tasks on a thread pool
+- CPU stages run in an executor sized to the machine, so features and fits of different symbols overlap
+- Bounded queues between stages give backpressure: a fast fetch stage cannot run far ahead of training
+- A failing or empty symbol is dropped without stopping the others; cycle latency approaches the slowest
+  symbol instead of the sum over symbols
+"""
+
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Stage:
+    """One step of the per-symbol pipeline: fn(symbol, value) -> value (None drops the symbol)"""
+
+    def __init__(self, name: str, fn: Callable, kind: str = "io", concurrency: Optional[int] = None):
+        if kind not in ("io", "cpu"):
+            raise ValueError(f"Stage kind must be 'io' or 'cpu', not {kind!r}")
+        self.name = name
+        self.fn = fn
+        self.kind = kind
+        self.concurrency = concurrency or (8 if kind == "io" else os.cpu_count() or 1)
+
+
+class AsyncPipeline:
+    """Run symbols through stages concurrently, one bounded queue between consecutive stages"""
+
+    def __init__(self, stages: List[Stage], queue_size: int = 4, tracer=None,
+                 cpu_executor: Optional[Executor] = None):
+        self.stages = stages
+        self.queue_size = queue_size
+        self.tracer = tracer
+        # Threads by default: the stage functions are bound methods sharing state with their trader,
+        # and numpy/sklearn/lightgbm release the GIL in their heavy loops
+        self.cpu_executor = cpu_executor
+
+    async def run(self, symbols: Iterable[str]) -> Dict:
+        """{'results': {symbol: last stage value}, 'errors': {symbol: (stage, error)}, 'dropped': {symbol: stage}}"""
+        loop = asyncio.get_running_loop()
+        results, errors, dropped = {}, {}, {}
+        queues = [asyncio.Queue(maxsize=self.queue_size) for _ in self.stages]
+        io_workers = sum(stage.concurrency for stage in self.stages if stage.kind == "io")
+        io_executor = ThreadPoolExecutor(max_workers=max(1, io_workers), thread_name_prefix="cycle-io")
+        cpu_executor = self.cpu_executor or ThreadPoolExecutor(max_workers=os.cpu_count() or 1,
+                                                               thread_name_prefix="cycle-cpu")
+
+        async def worker(index: int, stage: Stage):
+            executor = io_executor if stage.kind == "io" else cpu_executor
+            last = index == len(self.stages) - 1
+            while True:
+                symbol, value = await queues[index].get()
+                try:
+                    start = time.perf_counter()
+                    result = await loop.run_in_executor(executor, stage.fn, symbol, value)
+                    if self.tracer is not None:
+                        self.tracer.record(f"{stage.name}_per_symbol", (time.perf_counter() - start) * 1000)
+                    if result is None:
+                        dropped[symbol] = stage.name
+                    elif last:
+                        results[symbol] = result
+                    else:
+                        # Blocks while the next stage is saturated
+                        await queues[index + 1].put((symbol, result))
+                except Exception as e:
+                    errors[symbol] = (stage.name, e)
+                    logger.error(f"❌ {stage.name} failed for {symbol}: {e}")
+                finally:
+                    queues[index].task_done()
+
+        workers = [asyncio.create_task(worker(i, stage))
+                   for i, stage in enumerate(self.stages) for _ in range(stage.concurrency)]
+        try:
+            for symbol in symbols:
+                await queues[0].put((symbol, None))
+            # Stage i has forwarded everything once its queue drains, so drain them in order
+            for queue in queues:
+                await queue.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            io_executor.shutdown(wait=False)
+            if self.cpu_executor is None:
+                cpu_executor.shutdown(wait=False)
+        return {'results': results, 'errors': errors, 'dropped': dropped}
+
+    def run_sync(self, symbols: Iterable[str]) -> Dict:
+        """run() from synchronous code (the trading loops are not async)"""
+        return asyncio.run(self.run(symbols))
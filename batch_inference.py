@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Batch Inference - One predict_proba call per model for the whole universe
+- Takes the latest feature row of every symbol in one table
+- Groups rows by the model that scores them (a global model's per-symbol views share one group)
+- Derives class and confidence from the same probabilities instead of predict + predict_proba
+- Returns a signal table indexed by symbol
+"""
+
+import logging
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+SIGNAL_COLUMNS = ['prediction', 'confidence', 'probability']
+
+logger = logging.getLogger(__name__)
+
+
+def _model_columns(model, features: pd.DataFrame):
+    """Feature columns a model was trained on, in training order"""
+    for attr in ('feature_cols', 'feature_names_in_'):
+        columns = getattr(model, attr, None)
+        if columns is not None and set(columns) <= set(features.columns):
+            return list(columns)
+    return list(features.columns)
+
+
+def predict_batch(features: pd.DataFrame, models: Dict[str, object]) -> pd.DataFrame:
+    """Score one feature row per symbol (features indexed by symbol) with each symbol's model"""
+    groups = {}
+    for symbol in features.index:
+        model = models.get(symbol)
+        if model is None:
+            continue
+        # Global-model views all delegate to the same underlying model
+        target = getattr(model, 'global_model', model)
+        groups.setdefault(id(target), (target, []))[1].append(symbol)
+
+    tables = []
+    for target, symbols in groups.values():
+        try:
+            rows = features.loc[symbols, _model_columns(target, features)]
+            if hasattr(target, 'for_symbol'):
+                proba = target.predict_proba(rows, symbols)
+                classes = np.asarray(target.model.classes_)
+            else:
+                # Models fitted on plain arrays are scored on plain arrays
+                X = rows if hasattr(target, 'feature_names_in_') else rows.values
+                proba = target.predict_proba(X)
+                classes = np.asarray(target.classes_)
+
+            positive = np.flatnonzero(classes == 1)
+            tables.append(pd.DataFrame({
+                'prediction': classes[proba.argmax(axis=1)],
+                'confidence': proba.max(axis=1),
+                'probability': proba[:, positive[0]] if len(positive) else np.nan
+            }, index=pd.Index(symbols, name='symbol')))
+        except Exception as e:
+            logger.error(f"❌ Batch inference failed for {', '.join(symbols)}: {e}")
+
+    if not tables:
+        return pd.DataFrame(columns=SIGNAL_COLUMNS, index=pd.Index([], name='symbol'))
+    table = pd.concat(tables)
+    return table.loc[[s for s in features.index if s in table.index]]
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+DB Writer Benchmark - Insert throughput of concurrent components sharing one SQLite database
+- connect_per_insert: a new connection and commit per row (MasterOrchestrator before db_writer.py)
+- commit_per_row: one long-lived connection per component, commit after every row (headless, smart, advanced)
+- db_writer: every component submits to the database's single batching writer (db_writer.py)
+- Several writer threads insert at once while a reader polls the table, as when the components run together
+- Reports rows per second, "database is locked" failures, p95 and max time a writer is blocked per insert,
+  and the reader's query count; writes JSON + CSV reports
+"""
+
+import argparse
+import csv
+import json
+import logging
+import platform
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+from benchmark_training import REPORT_DIR, git_commit
+from db_writer import DBWriter
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+MODES = ['connect_per_insert', 'commit_per_row', 'db_writer']
+INSERT_SQL = '''
+    INSERT INTO trades (timestamp, symbol, action, price, quantity, portfolio_value, pnl, model_confidence)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+# sqlite3's default busy timeout, which most of the traders' own connections use
+BUSY_TIMEOUT_SECONDS = 5
+
+
+def setup_database(db_path: Path):
+    with sqlite3.connect(db_path) as conn:
+        conn.execute('''
+            CREATE TABLE trades (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp TEXT,
+                symbol TEXT,
+                action TEXT,
+                price REAL,
+                quantity INTEGER,
+                portfolio_value REAL,
+                pnl REAL,
+                model_confidence REAL
+            )
+        ''')
+
+
+def _row(writer: int, i: int) -> tuple:
+    return (datetime.now().isoformat(), f"SYM{writer}", 'BUY', 100.0 + i, 1, 10000.0, 0.0, 0.7)
+
+
+def run_mode(mode: str, writers: int, rows: int) -> Dict:
+    """rows inserts from each of writers threads in one scratch database"""
+    with tempfile.TemporaryDirectory(prefix="db_writer_bench_") as scratch:
+        db_path = Path(scratch) / "bench.db"
+        setup_database(db_path)
+        db = DBWriter(db_path) if mode == 'db_writer' else None
+
+        waits, locked = [], [0]
+        lock = threading.Lock()
+        done = threading.Event()
+        reads = [0]
+
+        def write(writer: int):
+            conn = None if mode != 'commit_per_row' else sqlite3.connect(db_path, timeout=BUSY_TIMEOUT_SECONDS)
+            local_waits = []
+            for i in range(rows):
+                start = time.perf_counter()
+                try:
+                    if mode == 'connect_per_insert':
+                        with sqlite3.connect(db_path, timeout=BUSY_TIMEOUT_SECONDS) as c:
+                            c.execute(INSERT_SQL, _row(writer, i))
+                    elif mode == 'commit_per_row':
+                        conn.execute(INSERT_SQL, _row(writer, i))
+                        conn.commit()
+                    else:
+                        db.execute(INSERT_SQL, _row(writer, i))
+                except sqlite3.OperationalError as e:
+                    if 'locked' not in str(e):
+                        raise
+                    with lock:
+                        locked[0] += 1
+                local_waits.append((time.perf_counter() - start) * 1000)
+            if conn is not None:
+                conn.close()
+            with lock:
+                waits.extend(local_waits)
+
+        def read():
+            with sqlite3.connect(db_path, timeout=BUSY_TIMEOUT_SECONDS) as conn:
+                while not done.is_set():
+                    conn.execute('SELECT COUNT(*) FROM trades').fetchone()
+                    reads[0] += 1
+                    time.sleep(0.001)
+
+        reader = threading.Thread(target=read)
+        reader.start()
+        threads = [threading.Thread(target=write, args=(writer,)) for writer in range(writers)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if db is not None:
+            db.flush()
+        seconds = time.perf_counter() - start
+        done.set()
+        reader.join()
+        if db is not None:
+            db.close()
+
+        with sqlite3.connect(db_path) as conn:
+            stored = conn.execute('SELECT COUNT(*) FROM trades').fetchone()[0]
+
+    waits.sort()
+    return {
+        'mode': mode,
+        'writers': writers,
+        'rows_submitted': writers * rows,
+        'rows_stored': stored,
+        'seconds': round(seconds, 3),
+        'rows_per_second': round(stored / seconds, 1),
+        'locked_errors': locked[0],
+        'p95_wait_ms': round(waits[int(len(waits) * 0.95)], 3) if waits else None,
+        'max_wait_ms': round(waits[-1], 3) if waits else None,
+        'reader_queries': reads[0],
+    }
+
+
+def run_benchmark(modes: List[str], writers: int, rows: int) -> Dict:
+    results = []
+    for mode in modes:
+        result = run_mode(mode, writers, rows)
+        results.append(result)
+        logger.info(f"✅ {mode}: {result['rows_per_second']:,.0f} rows/s, {result['locked_errors']} locked, "
+                     f"p95 wait {result['p95_wait_ms']}ms, max {result['max_wait_ms']}ms")
+
+    baseline = results[0]['rows_per_second'] if results else None
+    for result in results:
+        result['speedup'] = round(result['rows_per_second'] / baseline, 1) if baseline else None
+    return {
+        'metadata': {
+            'timestamp': datetime.now().isoformat(),
+            'git_commit': git_commit(),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'writers': writers,
+            'rows_per_writer': rows,
+        },
+        'results': results
+    }
+
+
+def save_report(report: Dict, output_dir: Path = REPORT_DIR) -> Path:
+    """Write the report as JSON and CSV; returns the JSON path"""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    stem = output_dir / f"db_writer_{report['metadata']['git_commit']}_{stamp}"
+
+    with open(f"{stem}.json", 'w') as f:
+        json.dump(report, f, indent=2)
+
+    fields = ['mode', 'writers', 'rows_submitted', 'rows_stored', 'seconds', 'rows_per_second', 'speedup',
+              'locked_errors', 'p95_wait_ms', 'max_wait_ms', 'reader_queries']
+    with open(f"{stem}.csv", 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(report['results'])
+
+    logger.info(f"📁 Report written to {stem}.json / .csv")
+    return Path(f"{stem}.json")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare SQLite insert strategies under concurrent writers")
+    parser.add_argument('--modes', nargs='+', default=MODES, choices=MODES)
+    parser.add_argument('--writers', type=int, default=4, help="concurrent components")
+    parser.add_argument('--rows', type=int, default=500, help="inserts per component")
+    parser.add_argument('--output-dir', default=str(REPORT_DIR))
+    args = parser.parse_args()
+
+    report = run_benchmark(args.modes, args.writers, args.rows)
+    save_report(report, Path(args.output_dir))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+Inference Benchmark - Signal-path throughput of every trader at universe scale
+- Replays bundled LEAN daily or minute bars through headless generate_signals, smart generate_smart_signal,
+  fully-automatic generate_signal and MasterOrchestrator.generate_signals
+- Universes of 100 or 1,000 symbols are built by cycling the bundled symbols, each copy a few bars apart
+- Market data, browser and broker I/O are replaced by the replay; models are trained once per bundled symbol
+  and registered for each copy, so the timed cycles measure inference and not retraining
+- Reports symbols per second, per-stage p50/p95 from each trader's LatencyTracer and peak memory
+- Each run is isolated in its own process and scratch directory; writes JSON + CSV reports
+"""
+
+import argparse
+import copy
+import csv
+import importlib
+import json
+import logging
+import os
+import platform
+import resource
+import shutil
+import tempfile
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from benchmark_training import REPORT_DIR, RSS_UNIT, git_commit
+from lean_data import available_equity_minute_symbols, available_equity_symbols, load_equity_daily, load_equity_minute
+
+warnings.filterwarnings('ignore')
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+TRADERS = ['headless', 'smart', 'fully', 'master']
+RESOLUTIONS = ['daily', 'minute']
+# Every replayed fetch returns this many bars, whatever period the trader asks yfinance for
+HISTORY_BARS = 500
+# Bars between consecutive copies of the same bundled symbol
+COPY_STRIDE = {'daily': 5, 'minute': 1}
+
+
+def _peak_rss_bytes() -> int:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * RSS_UNIT
+
+
+class ReplayFeed:
+    """Bars of a synthetic universe, advanced one bar per cycle"""
+
+    def __init__(self, resolution: str, size: int, cycles: int):
+        loader = load_equity_daily if resolution == 'daily' else load_equity_minute
+        bases = available_equity_symbols() if resolution == 'daily' else available_equity_minute_symbols()
+        copies = -(-size // len(bases))
+        needed = HISTORY_BARS + cycles + copies * COPY_STRIDE[resolution]
+
+        frames = {}
+        for base in bases:
+            frame = loader(base)
+            if len(frame) >= needed:
+                frames[base] = frame
+            else:
+                logger.info(f"⏭️ {base} {resolution}: {len(frame)} bars, {needed} needed")
+        if not frames:
+            raise ValueError(f"No bundled {resolution} symbol has {needed} bars")
+        self.bases = sorted(frames)
+        self.cursor = 0
+
+        # symbol -> (frame, index one past its last bar at cursor 0); bases start where their first copy does
+        self._frames = {base: (frames[base], len(frames[base]) - cycles) for base in self.bases}
+        self.symbols = []
+        for i in range(size):
+            base, k = self.bases[i % len(self.bases)], i // len(self.bases)
+            symbol = f"{base}_{k:03d}"
+            self._frames[symbol] = (frames[base], len(frames[base]) - cycles - k * COPY_STRIDE[resolution])
+            self.symbols.append(symbol)
+
+    def base(self, symbol: str) -> str:
+        return symbol.rsplit('_', 1)[0]
+
+    def advance(self):
+        self.cursor += 1
+
+    def history(self, symbol: str, bars: int = HISTORY_BARS) -> pd.DataFrame:
+        frame, end = self._frames[symbol]
+        end += self.cursor
+        return frame.iloc[max(0, end - bars):end]
+
+
+class _ReplayTicker:
+    def __init__(self, feed: ReplayFeed, symbol: str):
+        self.feed = feed
+        self.symbol = symbol
+
+    def history(self, period=None, **kwargs) -> pd.DataFrame:
+        return self.feed.history(self.symbol).copy()
+
+
+class ReplayYFinance:
+    """Stands in for the yfinance module inside a trader"""
+
+    def __init__(self, feed: ReplayFeed):
+        self.feed = feed
+
+    def Ticker(self, symbol: str) -> _ReplayTicker:
+        return _ReplayTicker(self.feed, symbol)
+
+    def download(self, symbol: str, **kwargs) -> pd.DataFrame:
+        return self.feed.history(symbol).copy()
+
+
+def clone_promoted(registry, source: str, names: List[str]):
+    """Point names at source's promoted version (same stored files) with one manifest write"""
+    manifest = copy.deepcopy(registry.manifest())
+    version = manifest['promoted'][source]
+    for name in names:
+        manifest['models'][name] = {version: dict(manifest['models'][source][version])}
+        manifest['promoted'][name] = version
+    tmp = registry.manifest_path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(manifest, default=str))
+    os.replace(tmp, registry.manifest_path)
+
+
+def _copies(feed: ReplayFeed) -> Dict[str, List[str]]:
+    copies = {}
+    for symbol in feed.symbols:
+        copies.setdefault(feed.base(symbol), []).append(symbol)
+    return copies
+
+
+class HeadlessAdapter:
+    """HeadlessAutoTrader: bars go through its market_data table, signals through generate_signals"""
+    module = 'headless_auto_trader'
+
+    def setup(self, module, feed: ReplayFeed):
+        self.trader = module.HeadlessAutoTrader()
+        self.feed = feed
+        for base, symbols in _copies(feed).items():
+            self._insert({base: feed.history(base)})
+            self.trader.train_model(base, 'stocks')
+            clone_promoted(self.trader.registry, f"{base}_stocks", [f"{s}_stocks" for s in symbols])
+        self._insert({symbol: feed.history(symbol) for symbol in feed.symbols})
+        self.universe = [(symbol, 'stocks') for symbol in feed.symbols]
+        return self.trader.tracer
+
+    def _insert(self, frames: Dict[str, pd.DataFrame]):
+        rows = [(symbol, str(ts), bar['Open'], bar['High'], bar['Low'], bar['Close'], bar['Volume'], 'stocks')
+                for symbol, frame in frames.items() for ts, bar in frame.iterrows()]
+        self.trader.conn.executemany('''
+            INSERT INTO market_data (symbol, timestamp, open, high, low, close, volume, market_type)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+        self.trader.conn.commit()
+
+    def cycle(self) -> int:
+        with self.trader.tracer.stage("market_data"):
+            self._insert({symbol: self.feed.history(symbol, bars=1) for symbol in self.feed.symbols})
+        return len(self.trader.generate_signals(self.universe))
+
+
+class SmartAdapter:
+    """SmartTradingSystem: data through the yfinance replay, one generate_smart_signal per symbol"""
+    module = 'smart_trading_system'
+
+    def setup(self, module, feed: ReplayFeed):
+        self.system = module.SmartTradingSystem()
+        self.feed = feed
+        for base, symbols in _copies(feed).items():
+            name = f"{base}_smart_model"
+            if self.system.create_smart_model(base) is None:
+                # Below the AUC gate every call would retrain; register the LightGBM candidate instead
+                self._register_fallback(module, base, name)
+            clone_promoted(self.system.registry, name, [f"{s}_smart_model" for s in symbols])
+        return self.system.tracer
+
+    def _register_fallback(self, module, base: str, name: str):
+        data = self.system.collect_enhanced_data(base)
+        feature_cols = [col for col in data.columns if col not in
+                        ['target_5d', 'target_10d', 'Open', 'High', 'Low', 'Close', 'Volume']]
+        X = data[feature_cols].fillna(0)
+        model = module.lgb.LGBMClassifier(n_estimators=100, max_depth=6, learning_rate=0.1, random_state=42,
+                                          verbose=-1).fit(X, data['target_5d'])
+        self.system.registry.register(name, model, metrics={'auc': 0.5}, features=feature_cols,
+                                      promote=True, probe=X.tail(64))
+
+    def cycle(self) -> int:
+        return sum(self.system.generate_smart_signal(symbol) is not None for symbol in self.feed.symbols)
+
+    def close(self):
+        self.system.shadow.stop()
+
+
+class FullyAdapter:
+    """FullyAutomaticTrader: rule-based signals, data through the yfinance replay"""
+    module = 'fully_automatic_trader'
+
+    def setup(self, module, feed: ReplayFeed):
+        self.trader = module.FullyAutomaticTrader()
+        self.feed = feed
+        return self.trader.tracer
+
+    def cycle(self) -> int:
+        return sum(self.trader.generate_signal(symbol) is not None for symbol in self.feed.symbols)
+
+
+class MasterAdapter:
+    """MasterOrchestrator: per-symbol models from train_models, one generate_signals call per cycle"""
+    module = 'master_orchestrator'
+
+    def setup(self, module, feed: ReplayFeed):
+        self.orchestrator = module.MasterOrchestrator()
+        self.feed = feed
+        trained, calibrators = self.orchestrator.train_models({base: feed.history(base) for base in feed.bases})
+        # Each symbol owns a fitted model in production, so copies get their own object
+        self.models, self.calibrators = {}, {}
+        for symbol in feed.symbols:
+            base = feed.base(symbol)
+            if base in trained:
+                self.models[symbol] = copy.deepcopy(trained[base])
+                self.calibrators[symbol] = calibrators.get(base)
+        return self.orchestrator.tracer
+
+    def cycle(self) -> int:
+        with self.orchestrator.tracer.stage("market_data"):
+            all_data = {symbol: self.feed.history(symbol) for symbol in self.feed.symbols}
+        return len(self.orchestrator.generate_signals(all_data, self.models, self.calibrators))
+
+
+ADAPTERS = {'headless': HeadlessAdapter, 'smart': SmartAdapter, 'fully': FullyAdapter, 'master': MasterAdapter}
+
+
+def run_one(trader: str, resolution: str, size: int, cycles: int) -> Dict:
+    """Set up one trader on a replayed universe and time its signal cycles (runs in a fresh worker process)"""
+    adapter = ADAPTERS[trader]()
+    try:
+        module = importlib.import_module(adapter.module)
+    except ImportError as e:
+        return {'status': 'unavailable', 'error': str(e)}
+
+    workdir = tempfile.mkdtemp(prefix=f"bench_{trader}_")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    # Per-symbol INFO lines would turn the benchmark into a console-logging benchmark
+    logging.getLogger().setLevel(logging.WARNING)
+    try:
+        feed = ReplayFeed(resolution, size, cycles)
+        patches = [mock.patch.object(module, 'yf', ReplayYFinance(feed))]
+        for cls in ('SmartTradingSystem', 'FullyAutomaticTrader'):
+            if hasattr(module, cls):
+                patches.append(mock.patch.object(getattr(module, cls), 'setup_browser', lambda self: None))
+        for patch in patches:
+            patch.start()
+
+        start = time.perf_counter()
+        tracer = adapter.setup(module, feed)
+        setup_seconds = time.perf_counter() - start
+        setup_peak_mb = _peak_rss_bytes() / 1e6
+        # Setup stages (training, warm-up inserts) go to the scratch database, not the report
+        tracer.flush()
+
+        timings, signals = [], 0
+        for _ in range(cycles):
+            feed.advance()
+            start = time.perf_counter()
+            with tracer.stage("cycle"):
+                signals = adapter.cycle()
+            timings.append(time.perf_counter() - start)
+
+        if hasattr(adapter, 'close'):
+            adapter.close()
+        for patch in patches:
+            patch.stop()
+
+        # The first cycle loads every model and fills empty caches; later cycles are the steady state
+        steady = float(np.median(timings[1:])) if len(timings) > 1 else timings[0]
+        return {
+            'status': 'ok',
+            'n_symbols': len(feed.symbols),
+            'setup_seconds': setup_seconds,
+            'first_cycle_seconds': timings[0],
+            'cycle_seconds': steady,
+            'symbols_per_second': len(feed.symbols) / steady if steady else None,
+            'signals': signals,
+            'setup_peak_mb': setup_peak_mb,
+            'peak_mb': _peak_rss_bytes() / 1e6,
+            'stages': tracer.stats(),
+        }
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def run_benchmark(traders: List[str], resolutions: List[str], sizes: List[int], cycles: int) -> Dict:
+    """Run every (trader, resolution, size) combination and return the report"""
+    results = []
+    for resolution in resolutions:
+        for size in sizes:
+            for trader in traders:
+                key = {'trader': trader, 'resolution': resolution, 'universe': size, 'cycles': cycles}
+                try:
+                    with ProcessPoolExecutor(max_workers=1) as pool:
+                        metrics = pool.submit(run_one, trader, resolution, size, cycles).result()
+                except Exception as e:
+                    metrics = {'status': 'error', 'error': str(e)}
+                results.append({**key, **metrics})
+
+                if metrics['status'] != 'ok':
+                    logger.warning(f"⚠️ {trader} {resolution} n={size}: {metrics['status']} ({metrics['error']})")
+                    continue
+                p95 = {stage: s['p95_ms'] for stage, s in metrics['stages'].items() if stage != 'cycle'}
+                slowest = max(p95, key=p95.get) if p95 else None
+                logger.info(f"⏱️ {trader} {resolution} n={size}: {metrics['symbols_per_second']:.0f} symbols/s, "
+                            f"cycle {metrics['cycle_seconds']:.2f}s (first {metrics['first_cycle_seconds']:.2f}s), "
+                            f"{metrics['signals']} signals, slowest stage {slowest} p95 "
+                            f"{p95.get(slowest, 0):.1f}ms, {metrics['peak_mb']:.0f}MB")
+
+    return {
+        'metadata': {
+            'timestamp': datetime.now().isoformat(),
+            'git_commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'versions': {'numpy': np.__version__, 'pandas': pd.__version__},
+            'history_bars': HISTORY_BARS,
+            'copy_stride': COPY_STRIDE,
+        },
+        'results': results
+    }
+
+
+def save_report(report: Dict, output_dir: Path = REPORT_DIR) -> Path:
+    """Write the report as JSON and CSV (one column pair per stage); returns the JSON path"""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    stem = output_dir / f"inference_{report['metadata']['git_commit']}_{stamp}"
+
+    with open(f"{stem}.json", 'w') as f:
+        json.dump(report, f, indent=2)
+
+    stages = sorted({stage for r in report['results'] for stage in r.get('stages', {})})
+    fields = ['trader', 'resolution', 'universe', 'cycles', 'status', 'setup_seconds', 'first_cycle_seconds',
+              'cycle_seconds', 'symbols_per_second', 'signals', 'setup_peak_mb', 'peak_mb', 'error']
+    fields += [f"{stage}_{pct}_ms" for stage in stages for pct in ('p50', 'p95')]
+    with open(f"{stem}.csv", 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction='ignore')
+        writer.writeheader()
+        for result in report['results']:
+            row = dict(result)
+            for stage, summary in result.get('stages', {}).items():
+                row[f"{stage}_p50_ms"] = summary['p50_ms']
+                row[f"{stage}_p95_ms"] = summary['p95_ms']
+            writer.writerow(row)
+
+    logger.info(f"📁 Report written to {stem}.json / .csv")
+    return Path(f"{stem}.json")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark each trader's signal path on replayed LEAN data")
+    parser.add_argument('--traders', nargs='+', default=TRADERS, choices=TRADERS)
+    parser.add_argument('--resolutions', nargs='+', default=['daily'], choices=RESOLUTIONS)
+    parser.add_argument('--sizes', nargs='+', type=int, default=[100, 1000])
+    parser.add_argument('--cycles', type=int, default=5)
+    parser.add_argument('--output-dir', default=str(REPORT_DIR))
+    args = parser.parse_args()
+
+    report = run_benchmark(args.traders, args.resolutions, args.sizes, args.cycles)
+    save_report(report, Path(args.output_dir))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark - Interpreter start + import cost of every entry point, checked against a budget
+- Each entry point is imported in a fresh interpreter under -X importtime (its main() is not run)
+- Wall time is the median of several runs after one warm-up (so .pyc compilation is not counted)
+- The report lists the slowest direct imports of each entry point; the raw importtime logs are saved too
+- Short-lived CLIs and health checks must start well under a second; long-running traders get more
+- Exits non-zero when an entry point is over budget; entry points whose optional dependencies are not
+  installed are reported as unavailable
+"""
+
+import argparse
+import csv
+import json
+import logging
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+REPO_DIR = Path(__file__).resolve().parent
+REPORT_DIR = Path("reports/benchmarks")
+# Entry point module -> startup budget in seconds
+BUDGETS = {
+    # Short-lived CLIs, cron clients and health checks (pandas alone is ~0.3s)
+    'simple_signals': 0.75,
+    'daily_trading_signals': 0.75,
+    'strategy_host': 0.75,
+    'signal_daemon': 0.25,
+    'signal_bus': 0.25,
+    'supervisor': 0.25,
+    'market_scheduler': 0.25,
+    'complete_auto_trader': 0.5,
+    'latency_tracer': 0.25,
+    'state_checkpoint': 0.5,
+    'db_writer': 0.25,
+    # Browser traders (no browser until one is set up)
+    'browser_auto_trader': 1.0,
+    'ultimate_free_trader': 1.0,
+    # Long-running ML traders: sklearn is needed for their first cycle anyway
+    'master_orchestrator': 3.0,
+    'headless_auto_trader': 3.0,
+    'smart_trading_system': 3.0,
+    'fully_automatic_trader': 3.0,
+    'fully_automated_trader': 3.0,
+    'free_automated_trader': 3.0,
+    'advanced_learning_system': 1.5,
+}
+REPEATS = 3
+TOP_IMPORTS = 10
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s*\|\s+(\d+)\s*\|( *)(\S+)")
+MISSING_MODULE = re.compile(r"ModuleNotFoundError: No module named '([^']+)'")
+
+
+def parse_importtime(stderr: str) -> List[Dict]:
+    """Rows of -X importtime output: module, depth (0 = imported by -c), self and cumulative ms"""
+    rows = []
+    for match in IMPORTTIME_LINE.finditer(stderr):
+        self_us, cumulative_us, indent, module = match.groups()
+        rows.append({'module': module, 'depth': (len(indent) - 1) // 2,
+                     'self_ms': int(self_us) / 1000, 'cumulative_ms': int(cumulative_us) / 1000})
+    return rows
+
+
+def _import_once(module: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module}"], cwd=REPO_DIR,
+                          capture_output=True, text=True, stdin=subprocess.DEVNULL)
+
+
+def measure(module: str, repeats: int = REPEATS, raw_dir: Optional[Path] = None) -> Dict:
+    """Startup wall time and slowest imports of one entry point"""
+    warm = _import_once(module)
+    if warm.returncode != 0:
+        missing = MISSING_MODULE.search(warm.stderr)
+        error = warm.stderr.strip().splitlines()[-1] if warm.stderr.strip() else f"exit code {warm.returncode}"
+        return {'status': 'unavailable' if missing else 'error', 'error': error,
+                'missing': missing.group(1) if missing else None}
+
+    seconds, stderr = [], ""
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run = _import_once(module)
+        seconds.append(time.perf_counter() - start)
+        stderr = run.stderr
+    if raw_dir is not None:
+        raw_dir.mkdir(parents=True, exist_ok=True)
+        (raw_dir / f"{module}.importtime.txt").write_text(stderr)
+
+    rows = parse_importtime(stderr)
+    # A module's imports are listed just before it, one level deeper (site-startup imports come first)
+    end = max((i for i, row in enumerate(rows) if row['depth'] == 0 and row['module'] == module), default=None)
+    direct = []
+    if end is not None:
+        for row in reversed(rows[:end]):
+            if row['depth'] == 0:
+                break
+            if row['depth'] == 1:
+                direct.append(row)
+    direct.sort(key=lambda row: -row['cumulative_ms'])
+    total = rows[end]['cumulative_ms'] if end is not None else None
+    return {
+        'status': 'ok',
+        'seconds': statistics.median(seconds),
+        'runs': seconds,
+        'import_ms': total,
+        'modules_imported': len(rows),
+        'top_imports': [{'module': row['module'], 'cumulative_ms': round(row['cumulative_ms'], 1)}
+                        for row in direct[:TOP_IMPORTS]]
+    }
+
+
+def run_benchmark(modules: List[str], repeats: int = REPEATS, raw_dir: Optional[Path] = None) -> Dict:
+    from benchmark_training import git_commit
+
+    results = []
+    for module in modules:
+        budget = BUDGETS.get(module)
+        metrics = measure(module, repeats, raw_dir)
+        if metrics['status'] == 'ok':
+            metrics['within_budget'] = budget is None or metrics['seconds'] <= budget
+            top = ", ".join(f"{row['module']} {row['cumulative_ms']:.0f}ms" for row in metrics['top_imports'][:3])
+            icon = "✅" if metrics['within_budget'] else "❌"
+            logger.info(f"{icon} {module}: {metrics['seconds']:.2f}s (budget {budget}s) - slowest: {top}")
+        else:
+            logger.warning(f"⚠️ {module}: {metrics['status']} ({metrics['error']})")
+        results.append({'entry_point': module, 'budget_seconds': budget, **metrics})
+
+    return {
+        'metadata': {
+            'timestamp': datetime.now().isoformat(),
+            'git_commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeats': repeats,
+        },
+        'results': results
+    }
+
+
+def save_report(report: Dict, output_dir: Path = REPORT_DIR) -> Path:
+    """Write the report as JSON and CSV; returns the JSON path"""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    stem = output_dir / f"startup_{report['metadata']['git_commit']}_{stamp}"
+
+    with open(f"{stem}.json", 'w') as f:
+        json.dump(report, f, indent=2)
+
+    fields = ['entry_point', 'status', 'seconds', 'budget_seconds', 'within_budget', 'import_ms',
+              'modules_imported', 'slowest_import', 'slowest_import_ms', 'error']
+    with open(f"{stem}.csv", 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction='ignore')
+        writer.writeheader()
+        for result in report['results']:
+            row = dict(result)
+            if result.get('top_imports'):
+                row['slowest_import'] = result['top_imports'][0]['module']
+                row['slowest_import_ms'] = result['top_imports'][0]['cumulative_ms']
+            writer.writerow(row)
+
+    logger.info(f"📁 Report written to {stem}.json / .csv")
+    return Path(f"{stem}.json")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure entry-point startup time against per-CLI budgets")
+    parser.add_argument('--modules', nargs='+', default=list(BUDGETS))
+    parser.add_argument('--repeats', type=int, default=REPEATS)
+    parser.add_argument('--output-dir', default=str(REPORT_DIR))
+    parser.add_argument('--no-enforce', action='store_true', help="report only, exit 0 even when over budget")
+    args = parser.parse_args()
+
+    output_dir = Path(args.output_dir)
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    report = run_benchmark(args.modules, args.repeats, raw_dir=output_dir / f"importtime_{stamp}")
+    save_report(report, output_dir)
+
+    over = [r['entry_point'] for r in report['results'] if r['status'] == 'error' or r.get('within_budget') is False]
+    if over and not args.no_enforce:
+        logger.error(f"❌ Over budget or failing: {', '.join(over)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
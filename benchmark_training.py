@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Training Benchmark - Fit/predict cost of every model family on bundled LEAN data
+- Trains RF, XGBoost, LightGBM, GB, LR, SVC, MLP, the nested VotingClassifier and the lgb.train booster
+- Sweeps sample counts and feature widths
+- Records fit time, predict latency, peak memory, artifact size and holdout AUC
+- Each run is isolated in its own process so peak RSS covers native allocations too
+- Writes JSON + CSV reports stamped with the git commit; --compare diffs two reports
+"""
+
+import argparse
+import csv
+import io
+import json
+import logging
+import platform
+import resource
+import subprocess
+import sys
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+import joblib
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+import sklearn
+import xgboost as xgb
+from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier, VotingClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import roc_auc_score
+from sklearn.neural_network import MLPClassifier
+from sklearn.svm import SVC
+
+from lean_data import available_equity_symbols, load_equity_daily
+from research.scripts.train_lightgbm import LGB_PARAMS, NUM_BOOST_ROUND
+
+warnings.filterwarnings('ignore')
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+REPORT_DIR = Path("reports/benchmarks")
+FAMILIES = ['rf', 'xgb', 'lgb', 'gb', 'lr', 'svm', 'mlp', 'voting', 'lgb_booster']
+# Families whose fit time grows too quickly to benchmark at every size (override with --no-caps)
+MAX_SAMPLES = {'svm': 8000, 'gb': 32000, 'mlp': 32000}
+SINGLE_ROW_REPEATS = 200
+HOLDOUT = 0.2
+# ru_maxrss is reported in bytes on macOS and kilobytes on Linux
+RSS_UNIT = 1 if sys.platform == 'darwin' else 1024
+
+
+class _BoosterModel:
+    """Wrap lgb.train (research/scripts/train_lightgbm.py) in the fit/predict_proba interface"""
+
+    def fit(self, X, y):
+        self.booster = lgb.train(LGB_PARAMS, lgb.Dataset(X, label=y), num_boost_round=NUM_BOOST_ROUND)
+        return self
+
+    def predict_proba(self, X):
+        p = self.booster.predict(X)
+        return np.column_stack([1 - p, p])
+
+
+def make_model(family: str):
+    """Estimators configured as the training paths configure them"""
+    if family == 'rf':
+        return RandomForestClassifier(n_estimators=100, random_state=42)
+    if family == 'xgb':
+        return xgb.XGBClassifier(n_estimators=100, random_state=42)
+    if family == 'lgb':
+        return lgb.LGBMClassifier(n_estimators=100, random_state=42, verbose=-1)
+    if family == 'gb':
+        return GradientBoostingClassifier(n_estimators=100, random_state=42)
+    if family == 'lr':
+        return LogisticRegression(random_state=42)
+    if family == 'svm':
+        return SVC(probability=True, random_state=42)
+    if family == 'mlp':
+        return MLPClassifier(hidden_layer_sizes=(100, 50), random_state=42)
+    if family == 'voting':
+        # Nested XGBoost + LightGBM ensemble from SmartTradingSystem.create_smart_model
+        # (soft voting so predict_proba is available)
+        return VotingClassifier([
+            ('rf1', xgb.XGBClassifier(n_estimators=50, random_state=42)),
+            ('rf2', lgb.LGBMClassifier(n_estimators=50, random_state=42, verbose=-1))
+        ], voting='soft')
+    if family == 'lgb_booster':
+        return _BoosterModel()
+    raise ValueError(f"Unknown model family: {family}")
+
+
+def base_features(df: pd.DataFrame) -> pd.DataFrame:
+    """Price/volume features in the spirit of the traders' feature builders"""
+    close, volume = df['Close'], df['Volume']
+    returns = close.pct_change()
+    f = {}
+    for lag in range(1, 11):
+        f[f'ret_lag_{lag}'] = returns.shift(lag - 1)
+    for w in [5, 10, 20, 60, 120]:
+        f[f'mom_{w}'] = close.pct_change(w)
+        f[f'vol_{w}'] = returns.rolling(w).std()
+        f[f'sma_ratio_{w}'] = close / close.rolling(w).mean() - 1
+        f[f'volume_ratio_{w}'] = volume / volume.rolling(w).mean()
+    delta = close.diff()
+    for w in [14, 28]:
+        gain = delta.clip(lower=0).rolling(w).mean()
+        loss = (-delta.clip(upper=0)).rolling(w).mean()
+        f[f'rsi_{w}'] = 100 - 100 / (1 + gain / loss)
+    f['range'] = (df['High'] - df['Low']) / close
+    f['skew_30'] = returns.rolling(30).skew()
+    return pd.DataFrame(f, index=df.index)
+
+
+def widen(features: pd.DataFrame, width: int) -> pd.DataFrame:
+    """Exactly `width` columns: the base set, then lagged copies of it"""
+    columns, lag = [features], 1
+    while sum(c.shape[1] for c in columns) < width:
+        columns.append(features.shift(lag).add_suffix(f'_l{lag}'))
+        lag += 1
+    return pd.concat(columns, axis=1).iloc[:, :width]
+
+
+def build_dataset(symbols: List[str], width: int) -> pd.DataFrame:
+    """Stack every symbol's features and 5-day direction target in time order"""
+    frames = []
+    for symbol in symbols:
+        bars = load_equity_daily(symbol)
+        data = widen(base_features(bars), width)
+        data['target'] = (bars['Close'].shift(-5) > bars['Close']).astype(int)
+        data = data.iloc[:-5].replace([np.inf, -np.inf], np.nan).dropna()
+        frames.append(data)
+    return pd.concat(frames).sort_index(kind='stable')
+
+
+def _peak_rss_bytes() -> int:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * RSS_UNIT
+
+
+def run_one(family: str, X: np.ndarray, y: np.ndarray) -> Dict:
+    """Fit, score and measure one model (runs in a fresh worker process)"""
+    split = int(len(X) * (1 - HOLDOUT))
+    X_train, X_test, y_train, y_test = X[:split], X[split:], y[:split], y[split:]
+    model = make_model(family)
+
+    rss_before = _peak_rss_bytes()
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+    peak_mb = max(0, _peak_rss_bytes() - rss_before) / 1e6
+
+    start = time.perf_counter()
+    proba = model.predict_proba(X_test)[:, 1]
+    batch_seconds = time.perf_counter() - start
+
+    row = X_test[-1:]
+    timings = []
+    for _ in range(SINGLE_ROW_REPEATS):
+        start = time.perf_counter()
+        model.predict_proba(row)
+        timings.append(time.perf_counter() - start)
+
+    buffer = io.BytesIO()
+    joblib.dump(model, buffer)
+
+    return {
+        'fit_seconds': fit_seconds,
+        'predict_row_ms': float(np.median(timings)) * 1000,
+        'predict_batch_us_per_row': batch_seconds / len(X_test) * 1e6,
+        'peak_mb': peak_mb,
+        'artifact_bytes': buffer.getbuffer().nbytes,
+        'auc': roc_auc_score(y_test, proba) if len(np.unique(y_test)) > 1 else None,
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return 'unknown'
+
+
+def run_benchmark(families: List[str], samples: List[int], widths: List[int], caps: bool = True) -> Dict:
+    """Run the full sweep and return the report"""
+    symbols = available_equity_symbols()
+    logger.info(f"📊 Benchmarking {len(families)} model families on {len(symbols)} LEAN symbols")
+
+    results = []
+    for width in widths:
+        data = build_dataset(symbols, width)
+        X_all = data.drop(columns='target').values.astype(np.float64)
+        y_all = data['target'].values
+        for n in samples:
+            if n > len(X_all):
+                logger.warning(f"⚠️ Only {len(X_all)} rows available, skipping n={n}")
+                continue
+            # Most recent n rows keep the holdout strictly after the training block
+            X, y = X_all[-n:], y_all[-n:]
+            for family in families:
+                key = {'model': family, 'n_samples': n, 'n_features': width}
+                if caps and n > MAX_SAMPLES.get(family, n):
+                    logger.info(f"⏭️ {family} n={n} w={width}: above the {MAX_SAMPLES[family]} sample cap")
+                    results.append({**key, 'status': 'skipped'})
+                    continue
+                try:
+                    with ProcessPoolExecutor(max_workers=1) as pool:
+                        metrics = pool.submit(run_one, family, X, y).result()
+                    results.append({**key, 'status': 'ok', **metrics})
+                    auc = f"{metrics['auc']:.4f}" if metrics['auc'] is not None else "n/a"
+                    logger.info(f"⏱️ {family} n={n} w={width}: fit {metrics['fit_seconds']:.2f}s, "
+                                f"row {metrics['predict_row_ms']:.2f}ms, {metrics['peak_mb']:.0f}MB, "
+                                f"{metrics['artifact_bytes'] / 1024:.0f}KB, AUC {auc}")
+                except Exception as e:
+                    logger.error(f"❌ {family} n={n} w={width}: {e}")
+                    results.append({**key, 'status': 'error', 'error': str(e)})
+
+    return {
+        'metadata': {
+            'timestamp': datetime.now().isoformat(),
+            'git_commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'versions': {'numpy': np.__version__, 'pandas': pd.__version__, 'sklearn': sklearn.__version__,
+                         'xgboost': xgb.__version__, 'lightgbm': lgb.__version__},
+            'symbols': symbols,
+            'holdout': HOLDOUT,
+        },
+        'results': results
+    }
+
+
+def save_report(report: Dict, output_dir: Path = REPORT_DIR) -> Path:
+    """Write the report as JSON and CSV; returns the JSON path"""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    stem = output_dir / f"training_{report['metadata']['git_commit']}_{stamp}"
+
+    with open(f"{stem}.json", 'w') as f:
+        json.dump(report, f, indent=2)
+
+    fields = ['model', 'n_samples', 'n_features', 'status', 'fit_seconds', 'predict_row_ms',
+              'predict_batch_us_per_row', 'peak_mb', 'artifact_bytes', 'auc', 'error']
+    with open(f"{stem}.csv", 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(report['results'])
+
+    logger.info(f"📁 Report written to {stem}.json / .csv")
+    return Path(f"{stem}.json")
+
+
+def compare_reports(baseline_path: str, candidate_path: str) -> List[Dict]:
+    """Per-run ratios (candidate / baseline) for runs present and successful in both reports"""
+    def load(path):
+        with open(path, 'r') as f:
+            report = json.load(f)
+        return report['metadata'], {(r['model'], r['n_samples'], r['n_features']): r
+                                    for r in report['results'] if r['status'] == 'ok'}
+
+    base_meta, base = load(baseline_path)
+    cand_meta, cand = load(candidate_path)
+    print(f"Baseline {base_meta['git_commit']} vs candidate {cand_meta['git_commit']}")
+    print(f"{'model':<12}{'n':>7}{'w':>5}{'fit x':>9}{'row x':>9}{'mem x':>9}{'size x':>9}{'AUC Δ':>9}")
+
+    rows = []
+    for key in sorted(base.keys() & cand.keys()):
+        b, c = base[key], cand[key]
+        ratio = lambda field: c[field] / b[field] if b[field] else float('nan')
+        auc_delta = c['auc'] - b['auc'] if c['auc'] is not None and b['auc'] is not None else float('nan')
+        row = {'model': key[0], 'n_samples': key[1], 'n_features': key[2],
+               'fit_ratio': ratio('fit_seconds'), 'predict_row_ratio': ratio('predict_row_ms'),
+               'peak_mb_ratio': ratio('peak_mb'), 'artifact_ratio': ratio('artifact_bytes'),
+               'auc_delta': auc_delta}
+        rows.append(row)
+        print(f"{key[0]:<12}{key[1]:>7}{key[2]:>5}{row['fit_ratio']:>9.2f}{row['predict_row_ratio']:>9.2f}"
+              f"{row['peak_mb_ratio']:>9.2f}{row['artifact_ratio']:>9.2f}{auc_delta:>+9.4f}")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark model training on bundled LEAN data")
+    parser.add_argument('--models', nargs='+', default=FAMILIES, choices=FAMILIES)
+    parser.add_argument('--samples', nargs='+', type=int, default=[500, 2000, 8000, 32000])
+    parser.add_argument('--widths', nargs='+', type=int, default=[6, 24, 96])
+    parser.add_argument('--no-caps', action='store_true', help="Ignore per-family sample caps")
+    parser.add_argument('--output-dir', default=str(REPORT_DIR))
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CANDIDATE'),
+                        help="Compare two JSON reports instead of running")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare_reports(*args.compare)
+        return
+
+    report = run_benchmark(args.models, args.samples, args.widths, caps=not args.no_caps)
+    save_report(report, Path(args.output_dir))
+
+
+if __name__ == "__main__":
+    main()
@@ -13,14 +13,10 @@ import logging
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List
-import yfinance as yf
 import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from strategy_host import run_strategy, sma_crossover
+from signal_bus import SignalBus, SignalConsumer
+from supervisor import Heartbeat
 
 class BrowserAutoTrader:
     """Browser automation for automatic trading"""
@@ -34,6 +30,12 @@ class BrowserAutoTrader:
         self.positions = {}
         self.driver = None
         
+        # Heartbeats to supervisor.py when started by it (no-op otherwise)
+        self.heartbeat = Heartbeat()
+        
+        # Master Orchestrator trade instructions not yet acted on
+        self.signal_consumer = SignalConsumer(SignalBus(), 'browser_auto_trader')
+        
         # Risk management
         self.max_position_size = 0.25  # 25% max per position
         self.stop_loss_pct = 0.05  # 5% stop loss
@@ -64,6 +66,10 @@ class BrowserAutoTrader:
     def setup_browser(self):
         """Setup Chrome browser for automation"""
         try:
+            # Selenium is imported only when a browser is actually set up
+            from selenium import webdriver
+            from selenium.webdriver.chrome.options import Options
+            
             chrome_options = Options()
             chrome_options.add_argument("--headless")  # Run in background
             chrome_options.add_argument("--no-sandbox")
@@ -91,13 +97,13 @@ class BrowserAutoTrader:
         
         try:
             # Try to read signals from Master Orchestrator
-            signals_file = Path("signals/manual_trades.json")
-            if signals_file.exists():
-                with open(signals_file, 'r') as f:
-                    manual_trades = json.load(f)
+            if self.signal_consumer.bus.exists():
+                # Only instructions appended since the last cycle; committed now so none is executed twice
+                manual_trades = self.signal_consumer.poll()
+                self.signal_consumer.commit()
                 
-                # Convert to signals format
-                for trade in manual_trades[-5:]:  # Get last 5 trades
+                # Convert to signals format (latest per symbol)
+                for trade in manual_trades:
                     symbol = trade['symbol']
                     signals[symbol] = {
                         'action': trade['action'],
@@ -119,46 +125,26 @@ class BrowserAutoTrader:
         return signals
     
     def generate_simple_signals(self) -> Dict[str, Dict]:
-        """Generate simple trading signals as fallback"""
+        """Generate simple trading signals as fallback (sma_crossover over one shared snapshot)"""
         
         signals = {}
         
-        for symbol in self.symbols:
-            try:
-                # Get current price
-                data = yf.download(symbol, period='5d', interval='1d')
-                if data.empty:
-                    continue
-                
-                current_price = data['Close'].iloc[-1]
-                
-                # Simple SMA crossover strategy
-                sma_5 = data['Close'].rolling(5).mean().iloc[-1]
-                sma_20 = data['Close'].rolling(20).mean().iloc[-1]
-                
-                if sma_5 > sma_20 and current_price > sma_5:
-                    action = "BUY"
-                    confidence = 0.7
-                elif sma_5 < sma_20 and current_price < sma_5:
-                    action = "SELL"
-                    confidence = 0.7
-                else:
-                    action = "HOLD"
-                    confidence = 0.5
-                
-                signals[symbol] = {
-                    'action': action,
-                    'price': float(current_price),
-                    'quantity': 1,  # Default quantity
-                    'confidence': confidence,
-                    'stop_loss': float(current_price * (1 - self.stop_loss_pct)) if action == "BUY" else 0,
-                    'take_profit': float(current_price * (1 + self.take_profit_pct)) if action == "BUY" else 0
-                }
-                
-                self.logger.info(f"📊 {symbol}: {action} at ${current_price:.2f} (Confidence: {confidence:.2f})")
-                
-            except Exception as e:
-                self.logger.error(f"Error generating signal for {symbol}: {e}")
+        try:
+            results = run_strategy(sma_crossover, self.symbols)
+        except Exception as e:
+            self.logger.error(f"Error generating signals: {e}")
+            return signals
+        
+        for symbol, signal in results.items():
+            action, current_price = signal['action'], signal['price']
+            signals[symbol] = {
+                **signal,
+                'quantity': 1,  # Default quantity
+                'stop_loss': float(current_price * (1 - self.stop_loss_pct)) if action == "BUY" else 0,
+                'take_profit': float(current_price * (1 + self.take_profit_pct)) if action == "BUY" else 0
+            }
+            
+            self.logger.info(f"📊 {symbol}: {action} at ${current_price:.2f} (Confidence: {signal['confidence']:.2f})")
         
         return signals
     
@@ -317,6 +303,7 @@ class BrowserAutoTrader:
             self.logger.error("❌ Browser setup failed - falling back to manual trading")
             return
         
+        self.heartbeat.start()
         try:
             cycle_count = 0
             while True:
@@ -324,7 +311,8 @@ class BrowserAutoTrader:
                 self.logger.info(f"🔄 Starting cycle #{cycle_count}")
                 
                 # Run trading cycle
-                self.run_trading_cycle()
+                with self.heartbeat.cycle():
+                    self.run_trading_cycle()
                 
                 # Wait before next cycle (5 minutes during market hours)
                 current_hour = datetime.now().hour
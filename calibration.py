@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Probability Calibration - Isotonic or Platt maps fitted once from out-of-fold predictions
+- Fitted at training time on walk-forward out-of-fold probabilities, never on in-sample ones
+- Stored as a small (x, y) lookup table in the model's registry entry
+- Applied at inference with one np.interp, so thresholds mean the same thing across retrains
+"""
+
+import logging
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+MIN_ROWS = 100
+PLATT_GRID = 101
+
+logger = logging.getLogger(__name__)
+
+
+class Calibrator:
+    """Piecewise-linear map from raw to calibrated positive-class probability"""
+
+    def __init__(self, x, y, method: str = "isotonic"):
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        self.method = method
+
+    def __call__(self, probability):
+        calibrated = np.interp(probability, self.x, self.y)
+        return float(calibrated) if np.ndim(calibrated) == 0 else calibrated
+
+    def to_dict(self) -> Dict:
+        return {'method': self.method, 'x': np.round(self.x, 6).tolist(), 'y': np.round(self.y, 6).tolist()}
+
+    @classmethod
+    def from_dict(cls, table: Optional[Dict]) -> Optional['Calibrator']:
+        if not table:
+            return None
+        return cls(table['x'], table['y'], table.get('method', 'isotonic'))
+
+
+def fit_calibrator(oof_pred, y, method: str = "isotonic") -> Optional[Calibrator]:
+    """Calibration table from out-of-fold probabilities (NaN rows, never predicted, are skipped)"""
+    oof_pred = np.asarray(oof_pred, dtype=np.float64)
+    y = np.asarray(y)
+    scored = ~np.isnan(oof_pred)
+    p, y = oof_pred[scored], y[scored].astype(int)
+    if len(p) < MIN_ROWS or len(np.unique(y)) < 2:
+        logger.warning(f"⚠️ Not enough out-of-fold rows to calibrate ({len(p)})")
+        return None
+
+    # Fitting needs sklearn; applying a stored table does not
+    if method == "isotonic":
+        from sklearn.isotonic import IsotonicRegression
+        iso = IsotonicRegression(y_min=0, y_max=1, out_of_bounds='clip').fit(p, y)
+        x_table, y_table = iso.X_thresholds_, iso.y_thresholds_
+        if len(x_table) < 2:
+            x_table, y_table = np.array([0.0, 1.0]), np.repeat(y_table, 2)
+    elif method == "platt":
+        logit = np.log(np.clip(p, 1e-6, 1 - 1e-6) / (1 - np.clip(p, 1e-6, 1 - 1e-6)))
+        from sklearn.linear_model import LogisticRegression
+        platt = LogisticRegression().fit(logit.reshape(-1, 1), y)
+        x_table = np.linspace(0, 1, PLATT_GRID)
+        grid = np.clip(x_table, 1e-6, 1 - 1e-6)
+        y_table = platt.predict_proba(np.log(grid / (1 - grid)).reshape(-1, 1))[:, 1]
+    else:
+        raise ValueError(f"Unknown calibration method: {method}")
+    return Calibrator(x_table, y_table, method)
+
+
+def calibrate_signals(table: pd.DataFrame, calibrators: Dict[str, Calibrator]) -> pd.DataFrame:
+    """Recompute prediction/confidence/probability of a predict_batch table from calibrated probabilities"""
+    table = table.copy()
+    for symbol in table.index:
+        calibrator = calibrators.get(symbol)
+        if calibrator is None or pd.isna(table.at[symbol, 'probability']):
+            continue
+        probability = calibrator(table.at[symbol, 'probability'])
+        table.at[symbol, 'probability'] = probability
+        table.at[symbol, 'prediction'] = int(probability > 0.5)
+        table.at[symbol, 'confidence'] = max(probability, 1 - probability)
+    return table
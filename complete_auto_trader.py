@@ -12,16 +12,15 @@ This is the ultimate automatic trading system that combines:
 Usage: python complete_auto_trader.py
 """
 
+import sys
 import time
 import json
 import logging
-import subprocess
 import threading
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List
-import yfinance as yf
-import pandas as pd
+from supervisor import Component, Supervisor
 
 class CompleteAutoTrader:
     """Complete automatic trading system with multiple execution methods"""
@@ -30,9 +29,9 @@ class CompleteAutoTrader:
         self.setup_logging()
         self.setup_directories()
         
-        # System components
-        self.master_orchestrator_running = False
-        self.browser_trader_running = False
+        # System components, run by supervisor.py (heartbeats, restart with backoff)
+        self.supervisor = None
+        self.supervisor_thread = None
         self.api_trading_enabled = False
         
         # Trading configuration
@@ -73,14 +72,10 @@ class CompleteAutoTrader:
         }
         
         try:
-            # Check if Master Orchestrator is running
-            result = subprocess.run(['ps', 'aux'], capture_output=True, text=True)
-            if 'master_orchestrator.py' in result.stdout:
-                status['master_orchestrator'] = True
-            
-            # Check if Browser Trader is running
-            if 'browser_auto_trader.py' in result.stdout:
-                status['browser_trader'] = True
+            # Component health from the supervisor's heartbeat view
+            components = self.supervisor.status() if self.supervisor else {}
+            status['master_orchestrator'] = components.get('master_orchestrator', {}).get('healthy', False)
+            status['browser_trader'] = components.get('browser_auto_trader', {}).get('healthy', False)
             
             # Check API trading capability
             config_file = Path("config/alpaca_config.json")
@@ -90,9 +85,9 @@ class CompleteAutoTrader:
                 if config['alpaca']['api_key'] != 'YOUR_NEW_24_CHAR_API_KEY_HERE':
                     status['api_trading'] = True
             
-            # Check data collection
-            data = yf.download('SPY', period='1d')
-            status['data_collection'] = not data.empty
+            # Check data collection (the orchestrator reports its last data health check)
+            master_stats = components.get('master_orchestrator', {}).get('stats', {})
+            status['data_collection'] = bool(master_stats.get('data_collection', False))
             
             # Check models
             models_dir = Path("models")
@@ -104,63 +99,22 @@ class CompleteAutoTrader:
         
         return status
     
-    def start_master_orchestrator(self):
-        """Start the Master Orchestrator"""
+    def start_components(self, api_working: bool):
+        """Start the Master Orchestrator (and the Browser Trader when API trading is down) under the supervisor"""
         
-        try:
-            self.logger.info("🚀 Starting Master Orchestrator...")
-            
-            # Start Master Orchestrator in background
-            process = subprocess.Popen(
-                ['python', 'master_orchestrator.py'],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
-            )
-            
-            # Give it time to start
-            time.sleep(5)
-            
-            # Check if it's running
-            if process.poll() is None:
-                self.master_orchestrator_running = True
-                self.logger.info("✅ Master Orchestrator started successfully")
-                return True
-            else:
-                self.logger.error("❌ Master Orchestrator failed to start")
-                return False
-                
-        except Exception as e:
-            self.logger.error(f"❌ Error starting Master Orchestrator: {e}")
-            return False
-    
-    def start_browser_trader(self):
-        """Start the Browser Auto Trader"""
+        # Output goes to logs/<component>.log; a hung or crashed component is restarted with backoff
+        components = [Component('master_orchestrator', [sys.executable, 'master_orchestrator.py'])]
+        if not api_working:
+            # Browser cycles include 3s waits per order
+            components.append(Component('browser_auto_trader', [sys.executable, 'browser_auto_trader.py'],
+                                        cycle_timeout=1800))
+        else:
+            self.logger.info("✅ API trading is working - Browser Trader not needed")
         
-        try:
-            self.logger.info("🌐 Starting Browser Auto Trader...")
-            
-            # Start Browser Trader in background
-            process = subprocess.Popen(
-                ['python', 'browser_auto_trader.py'],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
-            )
-            
-            # Give it time to start
-            time.sleep(5)
-            
-            # Check if it's running
-            if process.poll() is None:
-                self.browser_trader_running = True
-                self.logger.info("✅ Browser Auto Trader started successfully")
-                return True
-            else:
-                self.logger.error("❌ Browser Auto Trader failed to start")
-                return False
-                
-        except Exception as e:
-            self.logger.error(f"❌ Error starting Browser Auto Trader: {e}")
-            return False
+        self.supervisor = Supervisor(components)
+        self.supervisor_thread = threading.Thread(target=self.supervisor.run, name="supervisor", daemon=True)
+        self.supervisor_thread.start()
+        self.logger.info(f"🚀 Started {', '.join(c.name for c in components)} under supervision")
     
     def test_api_trading(self) -> bool:
         """Test if API trading is working"""
@@ -284,40 +238,25 @@ class CompleteAutoTrader:
         # Test API trading
         api_working = self.test_api_trading()
         
-        # Start Master Orchestrator (always start this - it's the brain)
-        orchestrator_started = self.start_master_orchestrator()
-        
-        # Start Browser Trader if API is not working
-        if not api_working:
-            browser_started = self.start_browser_trader()
-        else:
-            self.logger.info("✅ API trading is working - Browser Trader not needed")
-            browser_started = True
+        # Start Master Orchestrator (always - it's the brain) and Browser Trader if API is not working
+        self.start_components(api_working)
         
         # Monitor system
         self.monitor_system()
     
     def monitor_system(self):
-        """Monitor system health and restart components if needed"""
+        """Periodic reports; restarts are handled by the supervisor as soon as heartbeats stop"""
         
         self.logger.info("🔍 Starting system monitoring...")
         
         try:
             while True:
-                # Check system status every 10 minutes
-                time.sleep(600)
-                
-                status = self.check_system_status()
-                
-                # Restart Master Orchestrator if it's down
-                if not status['master_orchestrator'] and not self.master_orchestrator_running:
-                    self.logger.warning("⚠️ Master Orchestrator is down - restarting...")
-                    self.start_master_orchestrator()
+                time.sleep(300)
                 
-                # Restart Browser Trader if needed
-                if not status['browser_trader'] and not status['api_trading'] and not self.browser_trader_running:
-                    self.logger.warning("⚠️ Browser Trader is down - restarting...")
-                    self.start_browser_trader()
+                for name, info in self.supervisor.status().items():
+                    if not info['healthy']:
+                        self.logger.warning(f"⚠️ {name} unhealthy (restarts: {info['restarts']}, "
+                                            f"last exit: {info['last_exit']})")
                 
                 # Generate periodic reports
                 if datetime.now().hour == 16 and datetime.now().minute < 5:  # 4 PM
@@ -327,6 +266,10 @@ class CompleteAutoTrader:
             self.logger.info("🛑 System monitoring stopped by user")
         except Exception as e:
             self.logger.error(f"❌ Error in system monitoring: {e}")
+        finally:
+            # Children run in their own session, so Ctrl-C does not reach them: the supervisor terminates them
+            self.supervisor.stop()
+            self.supervisor_thread.join()
 
 def main():
     """Main entry point"""
@@ -8,8 +8,11 @@ cd /Users/admin/Developer/AutoTrader
 # Activate virtual environment
 source .venv/bin/activate
 
-# Run the trading signal generator
-python simple_signals.py >> logs/cron_trading.log 2>&1
+# Ask the resident signal daemon (warm imports, cached bars); run the script directly if it is not up
+python signal_daemon.py run signals >> logs/cron_trading.log 2>&1
+if [ $? -eq 2 ]; then
+    python simple_signals.py >> logs/cron_trading.log 2>&1
+fi
 
 # Log the run
 echo "$(date): AutoTrader cron job executed" >> logs/cron_execution.log
@@ -5,7 +5,10 @@ export PATH="/usr/local/bin:/usr/bin:/bin"
 cd /Users/admin/Developer/AutoTrader
 source .venv/bin/activate
 
-# Run model training
-python research/scripts/train_lightgbm.py >> logs/daily_training.log 2>&1
+# Run model training in the signal daemon; run the script directly if it is not up
+python signal_daemon.py run train >> logs/daily_training.log 2>&1
+if [ $? -eq 2 ]; then
+    python research/scripts/train_lightgbm.py >> logs/daily_training.log 2>&1
+fi
 
 echo "$(date): Daily model training completed" >> logs/cron_execution.log
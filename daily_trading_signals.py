@@ -5,12 +5,10 @@ Daily Trading Signals Generator
 Generates buy/sell signals based on your profitable algorithm
 """
 
-import pandas as pd
-import numpy as np
-import yfinance as yf
-from datetime import datetime, timedelta
+from datetime import datetime
 import json
 from pathlib import Path
+from strategy_host import StrategyHost, trend_macd
 
 class DailyTradingSignals:
     def __init__(self):
@@ -23,96 +21,36 @@ class DailyTradingSignals:
         print(f"🛑 Stop Loss: {self.stop_loss_pct*100}%")
         print(f"🎯 Take Profit: {self.take_profit_pct*100}%")
     
-    def get_market_data(self, symbol, days=300):
-        """Get market data from Yahoo Finance (FREE)"""
+    def get_trading_signal(self):
+        """Get today's trading signal (trend_macd in strategy_host.py, on one downloaded snapshot)"""
+        print(f"\n🔄 Generating trading signal for {datetime.now().strftime('%Y-%m-%d')}")
+        
+        host = StrategyHost().register('trend_macd', trend_macd, [self.symbol])
         try:
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=days)
-            
-            ticker = yf.Ticker(symbol)
-            data = ticker.history(start=start_date, end=end_date)
-            
-            if data.empty:
-                print(f"❌ No data for {symbol}")
-                return None
-            
-            return data
+            signal = host.run_cycle()['trend_macd'].get(self.symbol)
         except Exception as e:
             print(f"❌ Error getting data: {e}")
             return None
-    
-    def calculate_indicators(self, data):
-        """Calculate technical indicators"""
-        df = data.copy()
-        
-        # Moving averages
-        df['sma_50'] = df['Close'].rolling(50).mean()
-        df['sma_200'] = df['Close'].rolling(200).mean()
-        
-        # RSI calculation
-        delta = df['Close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
-        rs = gain / loss
-        df['rsi'] = 100 - (100 / (1 + rs))
-        
-        # MACD
-        exp1 = df['Close'].ewm(span=12).mean()
-        exp2 = df['Close'].ewm(span=26).mean()
-        df['macd'] = exp1 - exp2
-        df['macd_signal'] = df['macd'].ewm(span=9).mean()
-        
-        return df
-    
-    def generate_signals(self, df):
-        """Generate buy/sell signals using your profitable strategy"""
-        latest = df.iloc[-1]
-        
-        # Your profitable strategy logic
-        sma_bullish = latest['sma_50'] > latest['sma_200']
-        rsi_oversold = latest['rsi'] < 30
-        rsi_overbought = latest['rsi'] > 70
-        macd_bullish = latest['macd'] > latest['macd_signal']
-        
-        # Buy signal: SMA bullish and MACD bullish, or SMA bullish and RSI oversold
-        should_buy = (sma_bullish and macd_bullish) or (sma_bullish and rsi_oversold)
-        
-        # Sell signal: SMA bearish or RSI overbought
-        should_sell = not sma_bullish or rsi_overbought
+        if signal is None:
+            print(f"❌ No data for {self.symbol}")
+            return None
         
         return {
-            'current_price': latest['Close'],
-            'sma_50': latest['sma_50'],
-            'sma_200': latest['sma_200'],
-            'rsi': latest['rsi'],
-            'macd': latest['macd'],
-            'macd_signal': latest['macd_signal'],
-            'sma_bullish': sma_bullish,
-            'rsi_oversold': rsi_oversold,
-            'rsi_overbought': rsi_overbought,
-            'macd_bullish': macd_bullish,
-            'should_buy': should_buy,
-            'should_sell': should_sell,
-            'timestamp': latest.name
+            'current_price': signal['price'],
+            'sma_50': signal['sma_50'],
+            'sma_200': signal['sma_200'],
+            'rsi': signal['rsi'],
+            'macd': signal['macd'],
+            'macd_signal': signal['macd_signal'],
+            'sma_bullish': signal['sma_bullish'],
+            'rsi_oversold': signal['rsi_oversold'],
+            'rsi_overbought': signal['rsi_overbought'],
+            'macd_bullish': signal['macd_bullish'],
+            'should_buy': signal['action'] == "BUY",
+            'should_sell': signal['action'] == "SELL",
+            'timestamp': host.panel[self.symbol].index[-1]
         }
     
-    def get_trading_signal(self):
-        """Get today's trading signal"""
-        print(f"\n🔄 Generating trading signal for {datetime.now().strftime('%Y-%m-%d')}")
-        
-        # Get market data
-        data = self.get_market_data(self.symbol)
-        if data is None:
-            return None
-        
-        # Calculate indicators
-        df = self.calculate_indicators(data)
-        
-        # Generate signals
-        signals = self.generate_signals(df)
-        
-        return signals
-    
     def print_signal_report(self, signals):
         """Print a detailed signal report"""
         if not signals:
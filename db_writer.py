@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+DB Writer - One writer thread per SQLite database, batching every component's writes into grouped transactions
+- execute/executemany queue a statement and return at once; the writer commits what arrived within flush_ms
+  (or max_batch statements) in one transaction, in submission order
+- The database runs in WAL mode: readers keep their own connections and read a consistent snapshot while
+  the writer commits, so nobody waits on "database is locked"
+- A failing statement is retried on its own so it cannot take the rest of its batch down with it; nothing a
+  statement raises stops the writer thread
+- flush() waits until everything submitted so far is committed (for read-after-write); writers flush at exit
+- Connection-like: helpers that take a connection for writing (store_fold_metrics) accept a writer
+"""
+
+import atexit
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Sequence
+
+FLUSH_MS = 50
+MAX_BATCH = 5000
+BUSY_TIMEOUT_SECONDS = 30
+FLUSH_TIMEOUT_SECONDS = 30
+
+_writers = {}  # resolved path -> DBWriter
+_writers_lock = threading.Lock()
+
+
+class _Statement:
+    __slots__ = ('sql', 'params', 'many')
+
+    def __init__(self, sql: str, params, many: bool):
+        self.sql = sql
+        self.params = params
+        self.many = many
+
+
+class DBWriter:
+    """Single writer for one database file; use get_writer() to share it within a process"""
+
+    def __init__(self, db_path, flush_ms: float = FLUSH_MS, max_batch: int = MAX_BATCH):
+        self.logger = logging.getLogger(__name__)
+        self.db_path = str(db_path)
+        self.flush_ms = flush_ms
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._closed = False
+        self.counters = {'statements': 0, 'rows': 0, 'transactions': 0, 'errors': 0, 'last_batch_ms': None}
+
+        # WAL is a property of the database file: set it before anyone reads or writes through the writer
+        with sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT_SECONDS) as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+        self._thread = threading.Thread(target=self._run, name=f"db-writer-{Path(self.db_path).stem}", daemon=True)
+        self._thread.start()
+
+    # --- producer side ------------------------------------------------------------
+
+    def execute(self, sql: str, params: Sequence = ()):
+        self._submit(_Statement(sql, tuple(params), many=False))
+
+    def executemany(self, sql: str, rows: Iterable[Sequence]):
+        rows = [tuple(row) for row in rows]
+        if rows:
+            self._submit(_Statement(sql, rows, many=True))
+
+    def _submit(self, item):
+        if self._closed:
+            raise RuntimeError(f"DB writer for {self.db_path} is closed")
+        self._queue.put(item)
+
+    def flush(self, timeout: Optional[float] = FLUSH_TIMEOUT_SECONDS) -> bool:
+        """Wait until everything submitted before this call is committed; False on timeout"""
+        if self._closed:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        if done.wait(timeout):
+            return True
+        self.logger.warning(f"⚠️ Flush of {self.db_path} timed out after {timeout}s "
+                            f"({self._queue.qsize()} writes pending)")
+        return False
+
+    def stats(self) -> Dict:
+        return {**self.counters, 'pending': self._queue.qsize()}
+
+    def close(self, timeout: Optional[float] = BUSY_TIMEOUT_SECONDS):
+        if self._closed:
+            return
+        self.flush(timeout)
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    # Connection-like use: `with writer:` groups nothing, every statement is committed by the writer
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    # --- writer thread ------------------------------------------------------------
+
+    def _run(self):
+        conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT_SECONDS, isolation_level=None)
+        conn.execute('PRAGMA synchronous=NORMAL')  # durable at each WAL checkpoint, safe against corruption
+        try:
+            while True:
+                batch = [self._queue.get()]
+                deadline = time.monotonic() + self.flush_ms / 1000
+                # Gather until the window closes, the batch is full, or someone waits on a flush
+                while isinstance(batch[-1], _Statement) and len(batch) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(self._queue.get(timeout=remaining))
+                    except queue.Empty:
+                        break
+
+                statements = [item for item in batch if isinstance(item, _Statement)]
+                try:
+                    if statements:
+                        self._write(conn, statements)
+                except Exception as e:
+                    self.counters['errors'] += len(statements)
+                    self.logger.error(f"❌ Dropped a batch of {len(statements)} writes to {self.db_path}: {e}")
+                finally:
+                    for item in batch:
+                        if isinstance(item, threading.Event):
+                            item.set()
+                if batch[-1] is None:
+                    return
+        finally:
+            conn.close()
+
+    def _apply(self, conn, statement: _Statement):
+        if statement.many:
+            conn.executemany(statement.sql, statement.params)
+        else:
+            conn.execute(statement.sql, statement.params)
+
+    def _rollback(self, conn):
+        try:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+        except sqlite3.Error as e:
+            self.logger.error(f"❌ Rollback on {self.db_path} failed: {e}")
+
+    def _write(self, conn, statements):
+        start = time.perf_counter()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            for statement in statements:
+                self._apply(conn, statement)
+            conn.execute('COMMIT')
+            self.counters['transactions'] += 1
+        except Exception:
+            # Bad SQL and unbindable parameters (OverflowError, TypeError) alike
+            self._rollback(conn)
+            # Replay one statement per transaction so only the bad ones are lost
+            for statement in statements:
+                try:
+                    conn.execute('BEGIN IMMEDIATE')
+                    self._apply(conn, statement)
+                    conn.execute('COMMIT')
+                    self.counters['transactions'] += 1
+                except Exception as e:
+                    self._rollback(conn)
+                    self.counters['errors'] += 1
+                    self.logger.error(f"❌ Dropped write to {self.db_path}: {e} ({' '.join(statement.sql.split()[:3])} ...)")
+        self.counters['statements'] += len(statements)
+        self.counters['rows'] += sum(len(s.params) if s.many else 1 for s in statements)
+        self.counters['last_batch_ms'] = round((time.perf_counter() - start) * 1000, 2)
+
+
+def get_writer(db_path, flush_ms: float = FLUSH_MS) -> DBWriter:
+    """The process-wide writer for a database file (created on first use)"""
+    key = str(Path(db_path).resolve())
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None or writer._closed:
+            writer = _writers[key] = DBWriter(db_path, flush_ms)
+        return writer
+
+
+@atexit.register
+def close_all():
+    """Commit whatever is still queued (registered at exit)"""
+    with _writers_lock:
+        writers = list(_writers.values())
+    for writer in writers:
+        writer.close()
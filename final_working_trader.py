@@ -6,10 +6,11 @@
 This version works perfectly with zero costs.
 """
 
-import yfinance as yf
 import pandas as pd
 from datetime import datetime
 import json
+from strategy_host import run_strategy, trend_rsi
+from signal_bus import SignalBus
 
 def generate_trading_signals():
     """Generate trading signals for all symbols"""
@@ -20,76 +21,29 @@ def generate_trading_signals():
     print("🎯 GENERATING TRADING SIGNALS")
     print("=" * 50)
     
-    for symbol in symbols:
-        try:
-            # Get data
-            data = yf.download(symbol, period='1y', interval='1d')
-            if data.empty:
-                continue
-            
-            current_price = data['Close'].iloc[-1]
-            
-            # Calculate indicators
-            sma_5 = data['Close'].rolling(5).mean().iloc[-1]
-            sma_20 = data['Close'].rolling(20).mean().iloc[-1]
-            sma_50 = data['Close'].rolling(50).mean().iloc[-1]
-            
-            # RSI calculation
-            delta = data['Close'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
-            rs = gain / loss
-            rsi = (100 - (100 / (1 + rs))).iloc[-1]
-            
-            # Convert to float values
-            sma_5_val = float(sma_5)
-            sma_20_val = float(sma_20)
-            sma_50_val = float(sma_50)
-            rsi_val = float(rsi)
-            
-            # Signal logic
-            bullish_trend = sma_5_val > sma_20_val > sma_50_val
-            bearish_trend = sma_5_val < sma_20_val < sma_50_val
-            rsi_oversold = rsi_val < 30
-            rsi_overbought = rsi_val > 70
-            
-            if bullish_trend and rsi_val < 70 and current_price > sma_5_val:
-                action = "BUY"
-                confidence = 0.8
-            elif bearish_trend and rsi_val > 30 and current_price < sma_5_val:
-                action = "SELL"
-                confidence = 0.8
-            elif rsi_overbought and current_price < sma_20_val:
-                action = "SELL"
-                confidence = 0.7
-            elif rsi_oversold and current_price > sma_20_val:
-                action = "BUY"
-                confidence = 0.7
-            else:
-                action = "HOLD"
-                confidence = 0.5
-            
-            # Position sizing
-            position_value = 10000 * 0.25  # 25% of $10k
-            quantity = max(1, int(position_value / current_price))
-            
-            signals[symbol] = {
-                'action': action,
-                'price': float(current_price),
-                'quantity': quantity,
-                'confidence': confidence,
-                'timestamp': datetime.now().isoformat(),
-                'stop_loss': float(current_price * 0.95) if action == "BUY" else 0,
-                'take_profit': float(current_price * 1.15) if action == "BUY" else 0,
-                'rsi': rsi_val,
-                'sma_5': sma_5_val,
-                'sma_20': sma_20_val
-            }
-            
-            print(f"📊 {symbol}: {action} at ${current_price:.2f} (Confidence: {confidence:.2f}, RSI: {rsi_val:.1f})")
-            
-        except Exception as e:
-            print(f"❌ Error with {symbol}: {e}")
+    # One batched download and one indicator pass for all symbols
+    try:
+        results = run_strategy(trend_rsi, symbols)
+    except Exception as e:
+        print(f"❌ Error generating signals: {e}")
+        return signals
+    
+    for symbol, signal in results.items():
+        action, current_price = signal['action'], signal['price']
+        
+        # Position sizing
+        position_value = 10000 * 0.25  # 25% of $10k
+        quantity = max(1, int(position_value / current_price))
+        
+        signals[symbol] = {
+            **signal,
+            'quantity': quantity,
+            'timestamp': datetime.now().isoformat(),
+            'stop_loss': float(current_price * 0.95) if action == "BUY" else 0,
+            'take_profit': float(current_price * 1.15) if action == "BUY" else 0
+        }
+        
+        print(f"📊 {symbol}: {action} at ${current_price:.2f} (Confidence: {signal['confidence']:.2f}, RSI: {signal['rsi']:.1f})")
     
     return signals
 
@@ -111,11 +65,12 @@ def save_signals(signals):
                 'take_profit': signal['take_profit']
             })
     
-    # Save to file
-    with open('signals/manual_trades.json', 'w') as f:
-        json.dump(manual_trades, f, indent=2)
+    # Append to the signal bus read by the browser traders
+    bus = SignalBus()
+    for trade in manual_trades:
+        bus.append(trade)
     
-    print(f"\n💾 Saved {len(manual_trades)} trade signals to signals/manual_trades.json")
+    print(f"\n💾 Saved {len(manual_trades)} trade signals to {bus.path} (python signal_bus.py tail)")
 
 def print_trading_instructions(signals):
     """Print detailed trading instructions"""
@@ -168,7 +123,7 @@ def main():
         print(f"✅ Ready for execution on free brokers")
         
         print(f"\n💡 NEXT STEPS:")
-        print(f"1. Open signals/manual_trades.json to see all signals")
+        print(f"1. Run `python signal_bus.py tail` to see all signals")
         print(f"2. Execute trades on Robinhood, Webull, or any free broker")
         print(f"3. Set stop-losses and take-profits as indicated")
         print(f"4. Run this script again for updated signals")
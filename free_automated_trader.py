@@ -16,7 +16,7 @@ import time
 import sqlite3
 from datetime import datetime, timedelta
 from pathlib import Path
-import schedule
+from market_scheduler import MarketScheduler, asset_class
 import logging
 from sklearn.ensemble import RandomForestClassifier
 import joblib
@@ -40,6 +40,9 @@ class FreeAutomatedTrader:
         self.trade_history = []
         self.virtual_portfolio = 10000  # Start with $10,000 virtual portfolio
         
+        # Session-aware scheduling from the market-hours database
+        self.scheduler = MarketScheduler()
+        
         self.logger.info("🚀 Free Automated Trader initialized")
         self.logger.info(f"📊 Trading symbols: {self.symbols}")
         self.logger.info(f"💰 Virtual portfolio: ${self.virtual_portfolio:,.2f}")
@@ -321,9 +324,9 @@ class FreeAutomatedTrader:
         """Execute the trading strategy"""
         self.logger.info("🔄 Executing trading strategy...")
         
-        # Generate signals for all symbols
+        # Generate signals for symbols whose market is in session
         signals = []
-        for symbol in self.symbols:
+        for symbol in self.scheduler.open_symbols(self.symbols):
             signal = self.generate_signal(symbol)
             if signal:
                 signals.append(signal)
@@ -374,7 +377,9 @@ class FreeAutomatedTrader:
     def generate_daily_report(self):
         """Generate daily trading report"""
         try:
-            cursor = self.conn.cursor()
+            # Runs in the scheduler's background lane, so it reads through its own connection
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
             
             # Get today's signals
             cursor.execute('''
@@ -391,6 +396,7 @@ class FreeAutomatedTrader:
                 ORDER BY timestamp DESC
             ''')
             today_trades = cursor.fetchall()
+            conn.close()
             
             # Generate report
             report = {
@@ -449,17 +455,18 @@ class FreeAutomatedTrader:
             self.collect_market_data(symbol)
             time.sleep(1)  # Rate limiting
         
-        # Schedule tasks
-        schedule.every(5).minutes.do(self.execute_trading_strategy)
-        schedule.every().day.at("09:30").do(self.execute_trading_strategy)
-        schedule.every().day.at("16:00").do(self.execute_trading_strategy)
-        schedule.every().day.at("17:00").do(self.generate_daily_report)
+        # Schedule tasks on the sessions of the markets being traded; a strategy run that takes longer than
+        # a bar stretches the cadence and skips the missed bars, and the report runs in the background lane
+        assets = sorted({asset_class(symbol) for symbol in self.symbols})
+        self.scheduler.every(5, self.execute_trading_strategy, assets=assets, adaptive=True)
+        self.scheduler.at_open(self.execute_trading_strategy, 'equity')
+        self.scheduler.at_close(self.execute_trading_strategy, 'equity')
+        self.scheduler.at_close(self.generate_daily_report, 'equity', offset_minutes=60, lane='background')
         
         self.logger.info("⏰ Scheduled tasks:")
-        self.logger.info("   - Trading strategy: Every 5 minutes")
-        self.logger.info("   - Market open: 9:30 AM daily")
-        self.logger.info("   - Market close: 4:00 PM daily")
-        self.logger.info("   - Daily report: 5:00 PM daily")
+        self.logger.info(f"   - Trading strategy: every 5-minute bar close while {', '.join(assets)} trade")
+        self.logger.info("   - Market open and close: equity session open/close (early closes included)")
+        self.logger.info("   - Daily report: 1 hour after the equity close")
         
         # Run initial strategy
         self.execute_trading_strategy()
@@ -467,9 +474,7 @@ class FreeAutomatedTrader:
         # Main loop
         self.logger.info("🔄 Starting main trading loop...")
         try:
-            while True:
-                schedule.run_pending()
-                time.sleep(60)  # Check every minute
+            self.scheduler.run_forever()
         except KeyboardInterrupt:
             self.logger.info("🛑 Automated trader stopped by user")
         except Exception as e:
@@ -16,7 +16,7 @@ import time
 import sqlite3
 from datetime import datetime, timedelta
 from pathlib import Path
-import schedule
+from market_scheduler import MarketScheduler
 import logging
 from sklearn.ensemble import RandomForestClassifier
 import joblib
@@ -464,15 +464,16 @@ class FullyAutomatedTrader:
             self.collect_market_data(symbol)
             time.sleep(1)  # Rate limiting
         
-        # Schedule tasks
-        schedule.every(5).minutes.do(self.execute_trading_strategy)
-        schedule.every().day.at("09:30").do(self.execute_trading_strategy)
-        schedule.every().day.at("16:00").do(self.execute_trading_strategy)
+        # Schedule tasks on equity sessions; a strategy run that takes longer than a bar stretches the
+        # cadence and skips the missed bars instead of replaying them
+        scheduler = MarketScheduler()
+        scheduler.every(5, self.execute_trading_strategy, assets=('equity',), adaptive=True)
+        scheduler.at_open(self.execute_trading_strategy, 'equity')
+        scheduler.at_close(self.execute_trading_strategy, 'equity')
         
         self.logger.info("⏰ Scheduled tasks:")
-        self.logger.info("   - Trading strategy: Every 5 minutes")
-        self.logger.info("   - Market open: 9:30 AM daily")
-        self.logger.info("   - Market close: 4:00 PM daily")
+        self.logger.info("   - Trading strategy: every 5-minute bar close while equities trade")
+        self.logger.info("   - Market open and close: equity session open/close (early closes included)")
         
         # Run initial strategy
         self.execute_trading_strategy()
@@ -480,9 +481,7 @@ class FullyAutomatedTrader:
         # Main loop
         self.logger.info("🔄 Starting main trading loop...")
         try:
-            while True:
-                schedule.run_pending()
-                time.sleep(60)  # Check every minute
+            scheduler.run_forever()
         except KeyboardInterrupt:
             self.logger.info("🛑 Automated trader stopped by user")
         except Exception as e:
@@ -16,18 +16,13 @@ import time
 import sqlite3
 from datetime import datetime, timedelta
 from pathlib import Path
-import schedule
 import logging
 from sklearn.ensemble import RandomForestClassifier
 import joblib
+from latency_tracer import LatencyTracer
+from market_scheduler import MarketScheduler, asset_class
 import warnings
 import webbrowser
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-import pyautogui
 warnings.filterwarnings('ignore')
 
 class FullyAutomaticTrader:
@@ -36,6 +31,9 @@ class FullyAutomaticTrader:
         self.setup_database()
         self.setup_directories()
         
+        # Per-stage cycle timings, flushed to the database every few minutes
+        self.tracer = LatencyTracer(self.db_path, "fully_automatic_trader")
+        
         # Trading parameters
         self.symbols = ['SPY', 'QQQ', 'IWM', 'VTI', 'BTC-USD', 'ETH-USD']
         self.position_size = 0.95  # 95% of available cash
@@ -47,6 +45,9 @@ class FullyAutomaticTrader:
         self.trade_history = []
         self.virtual_portfolio = 10000  # Start with $10,000 virtual portfolio
         
+        # Session-aware scheduling from the market-hours database
+        self.scheduler = MarketScheduler()
+        
         # Browser automation setup
         self.driver = None
         self.setup_browser()
@@ -141,6 +142,10 @@ class FullyAutomaticTrader:
     def setup_browser(self):
         """Setup Chrome browser for automation"""
         try:
+            # Selenium is imported only when a browser is actually set up
+            from selenium import webdriver
+            from selenium.webdriver.chrome.options import Options
+            
             chrome_options = Options()
             chrome_options.add_argument("--no-sandbox")
             chrome_options.add_argument("--disable-dev-shm-usage")
@@ -241,12 +246,14 @@ class FullyAutomaticTrader:
         """Generate trading signal using technical analysis"""
         try:
             # Get market data
-            data = self.collect_market_data(symbol)
+            with self.tracer.stage("market_data"):
+                data = self.collect_market_data(symbol)
             if data is None or len(data) < 200:
                 return None
             
             # Calculate features
-            df = self.calculate_features(data)
+            with self.tracer.stage("features"):
+                df = self.calculate_features(data)
             latest = df.iloc[-1]
             
             # Technical analysis signals
@@ -287,14 +294,15 @@ class FullyAutomaticTrader:
             }
             
             # Store signal
-            cursor = self.conn.cursor()
-            cursor.execute('''
-                INSERT INTO trading_signals 
-                (symbol, timestamp, signal, confidence, price, executed)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (symbol, signal_data['timestamp'], signal, confidence, 
-                  latest['Close'], False))
-            self.conn.commit()
+            with self.tracer.stage("db_write"):
+                cursor = self.conn.cursor()
+                cursor.execute('''
+                    INSERT INTO trading_signals 
+                    (symbol, timestamp, signal, confidence, price, executed)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', (symbol, signal_data['timestamp'], signal, confidence, 
+                      latest['Close'], False))
+                self.conn.commit()
             
             return signal_data
             
@@ -309,6 +317,10 @@ class FullyAutomaticTrader:
                 self.logger.error("❌ Browser not available")
                 return False
             
+            from selenium.webdriver.common.by import By
+            from selenium.webdriver.support.ui import WebDriverWait
+            from selenium.webdriver.support import expected_conditions as EC
+            
             # Navigate to Webull
             self.driver.get("https://app.webull.com")
             time.sleep(3)
@@ -445,61 +457,71 @@ class FullyAutomaticTrader:
     
     def execute_trading_strategy(self):
         """Execute the fully automatic trading strategy"""
-        self.logger.info("🔄 Executing automatic trading strategy...")
-        
-        # Generate signals for all symbols
-        signals = []
-        for symbol in self.symbols:
-            signal = self.generate_signal(symbol)
-            if signal:
-                signals.append(signal)
-        
-        # Execute trades based on signals
-        for signal in signals:
-            symbol = signal['symbol']
-            signal_type = signal['signal']
-            confidence = signal['confidence']
-            price = signal['price']
-            
-            self.logger.info(f"📊 {symbol}: {signal_type} (Confidence: {confidence:.3f}, Price: ${price:.2f})")
-            
-            # Only execute high-confidence signals automatically
-            if confidence > 0.7:
-                if signal_type == 'BUY':
-                    # Calculate quantity (use 10% of portfolio per trade)
-                    quantity = int((self.virtual_portfolio * 0.1) / price)
-                    if quantity > 0:
-                        self.logger.info(f"🤖 EXECUTING AUTOMATIC BUY: {quantity} shares of {symbol}")
-                        
-                        # Execute automatic trade
-                        success = self.execute_automatic_trade(symbol, 'BUY', quantity, price)
-                        
-                        if success:
-                            self.logger.info(f"✅ Automatic BUY executed successfully for {symbol}")
-                        else:
-                            self.logger.error(f"❌ Automatic BUY failed for {symbol}")
-                
-                elif signal_type == 'SELL':
-                    # For sell signals, we'd need to track current positions
-                    # For now, just log the signal
-                    self.logger.info(f"🤖 SELL signal detected for {symbol} (would need position tracking)")
+        with self.tracer.cycle():
+            self.logger.info("🔄 Executing automatic trading strategy...")
+            
+            # Generate signals for symbols whose market is in session
+            signals = []
+            with self.tracer.stage("signals"):
+                for symbol in self.scheduler.open_symbols(self.symbols):
+                    signal = self.generate_signal(symbol)
+                    if signal:
+                        signals.append(signal)
+            
+            # Execute trades based on signals
+            with self.tracer.stage("orders"):
+                for signal in signals:
+                    self.execute_signal(signal)
+            
+            # Record portfolio performance
+            with self.tracer.stage("db_write"):
+                cursor = self.conn.cursor()
+                cursor.execute('''
+                    INSERT INTO portfolio 
+                    (timestamp, total_value, cash, positions_value, daily_pnl)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (datetime.now().isoformat(), self.virtual_portfolio, 
+                      self.virtual_portfolio, 0, 0))
+                self.conn.commit()
+            
+            self.logger.info("✅ Automatic trading strategy execution complete")
+    
+    def execute_signal(self, signal):
+        """Act on one signal: high-confidence buys are executed automatically"""
+        symbol = signal['symbol']
+        signal_type = signal['signal']
+        confidence = signal['confidence']
+        price = signal['price']
         
-        # Record portfolio performance
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            INSERT INTO portfolio 
-            (timestamp, total_value, cash, positions_value, daily_pnl)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (datetime.now().isoformat(), self.virtual_portfolio, 
-              self.virtual_portfolio, 0, 0))
-        self.conn.commit()
+        self.logger.info(f"📊 {symbol}: {signal_type} (Confidence: {confidence:.3f}, Price: ${price:.2f})")
         
-        self.logger.info("✅ Automatic trading strategy execution complete")
+        # Only execute high-confidence signals automatically
+        if confidence > 0.7:
+            if signal_type == 'BUY':
+                # Calculate quantity (use 10% of portfolio per trade)
+                quantity = int((self.virtual_portfolio * 0.1) / price)
+                if quantity > 0:
+                    self.logger.info(f"🤖 EXECUTING AUTOMATIC BUY: {quantity} shares of {symbol}")
+                    
+                    # Execute automatic trade
+                    success = self.execute_automatic_trade(symbol, 'BUY', quantity, price)
+                    
+                    if success:
+                        self.logger.info(f"✅ Automatic BUY executed successfully for {symbol}")
+                    else:
+                        self.logger.error(f"❌ Automatic BUY failed for {symbol}")
+            
+            elif signal_type == 'SELL':
+                # For sell signals, we'd need to track current positions
+                # For now, just log the signal
+                self.logger.info(f"🤖 SELL signal detected for {symbol} (would need position tracking)")
     
     def generate_daily_report(self):
         """Generate daily trading report"""
         try:
-            cursor = self.conn.cursor()
+            # Runs in the scheduler's background lane, so it reads through its own connection
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
             
             # Get today's signals
             cursor.execute('''
@@ -516,6 +538,7 @@ class FullyAutomaticTrader:
                 ORDER BY timestamp DESC
             ''')
             today_trades = cursor.fetchall()
+            conn.close()
             
             # Generate report
             report = {
@@ -542,7 +565,8 @@ class FullyAutomaticTrader:
                         'timestamp': t[5],
                         'broker': t[8]
                     } for t in today_trades
-                ]
+                ],
+                'latency': self.tracer.daily_report()
             }
             
             # Save report
@@ -558,6 +582,7 @@ class FullyAutomaticTrader:
             self.logger.info(f"📊 Total Signals: {len(today_signals)}")
             self.logger.info(f"🎯 High Confidence Signals: {len([s for s in today_signals if s[4] > 0.7])}")
             self.logger.info(f"🤖 Automatic Trades Executed: {len(today_trades)}")
+            self.tracer.log_report(report['latency'])
             
         except Exception as e:
             self.logger.error(f"❌ Error generating report: {e}")
@@ -575,17 +600,17 @@ class FullyAutomaticTrader:
             self.collect_market_data(symbol)
             time.sleep(1)  # Rate limiting
         
-        # Schedule tasks
-        schedule.every(5).minutes.do(self.execute_trading_strategy)
-        schedule.every().day.at("09:30").do(self.execute_trading_strategy)
-        schedule.every().day.at("16:00").do(self.execute_trading_strategy)
-        schedule.every().day.at("17:00").do(self.generate_daily_report)
+        # Schedule tasks on the sessions of the markets being traded
+        assets = sorted({asset_class(symbol) for symbol in self.symbols})
+        self.scheduler.every(5, self.execute_trading_strategy, assets=assets, adaptive=True)
+        self.scheduler.at_open(self.execute_trading_strategy, 'equity')
+        self.scheduler.at_close(self.execute_trading_strategy, 'equity')
+        self.scheduler.at_close(self.generate_daily_report, 'equity', offset_minutes=60, lane='background')
         
         self.logger.info("⏰ Scheduled tasks:")
-        self.logger.info("   - Automatic trading: Every 5 minutes")
-        self.logger.info("   - Market open: 9:30 AM daily")
-        self.logger.info("   - Market close: 4:00 PM daily")
-        self.logger.info("   - Daily report: 5:00 PM daily")
+        self.logger.info(f"   - Automatic trading: every 5-minute bar close while {', '.join(assets)} trade")
+        self.logger.info("   - Market open and close: equity session open/close (early closes included)")
+        self.logger.info("   - Daily report: 1 hour after the equity close")
         
         # Run initial strategy
         self.execute_trading_strategy()
@@ -593,9 +618,7 @@ class FullyAutomaticTrader:
         # Main loop
         self.logger.info("🔄 Starting automatic trading loop...")
         try:
-            while True:
-                schedule.run_pending()
-                time.sleep(60)  # Check every minute
+            self.scheduler.run_forever()
         except KeyboardInterrupt:
             self.logger.info("🛑 Automatic trader stopped by user")
         except Exception as e:
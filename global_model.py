@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Global Cross-Symbol Model - One LightGBM model for the whole universe
+- Stacks every symbol's feature rows into a single training set
+- Symbol and asset class are categorical features
+- One artifact to train, store, load and evaluate regardless of universe size
+"""
+
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import joblib
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+
+CATEGORICAL_COLS = ['symbol', 'asset_class']
+
+
+def asset_class_for(symbol: str) -> str:
+    """Map a ticker to the asset class naming used by the traders"""
+    return 'crypto' if symbol.endswith('-USD') else 'stocks'
+
+
+class GlobalModel:
+    """Single LightGBM classifier trained on the stacked feature rows of every symbol"""
+
+    def __init__(self, feature_cols: List[str], model_path: str = "models/global_model.pkl", params: Optional[Dict] = None):
+        self.logger = logging.getLogger(__name__)
+        self.feature_cols = list(feature_cols)
+        self.model_path = Path(model_path)
+        self.params = params or {
+            'n_estimators': 200,
+            'learning_rate': 0.05,
+            'num_leaves': 31,
+            'random_state': 42,
+            'verbose': -1
+        }
+
+        self.model = None
+        self.symbols = []
+        self.asset_classes = ['crypto', 'stocks']
+        self.version = None
+        self.metrics = {}
+
+    def _frame(self, features: pd.DataFrame, symbols: List[str]) -> pd.DataFrame:
+        """Attach the categorical columns with the categories fixed at training time"""
+        X = features[self.feature_cols].reset_index(drop=True).copy()
+        X['symbol'] = pd.Categorical(symbols, categories=self.symbols)
+        X['asset_class'] = pd.Categorical([asset_class_for(s) for s in symbols], categories=self.asset_classes)
+        return X
+
+    def stack(self, frames: Dict[str, pd.DataFrame], target_col: str, holdout: float = 0.2):
+        """Stack per-symbol frames into one dataset with a per-symbol time-ordered holdout"""
+        self.symbols = sorted(frames)
+
+        train_parts, test_parts = [], []
+        for symbol in self.symbols:
+            df = frames[symbol].dropna(subset=self.feature_cols + [target_col])
+            split_idx = int(len(df) * (1 - holdout))
+            train_parts.append((symbol, df.iloc[:split_idx]))
+            test_parts.append((symbol, df.iloc[split_idx:]))
+
+        def build(parts):
+            parts = [(symbol, df) for symbol, df in parts if len(df)]
+            if not parts:
+                return None, None
+            features = pd.concat([df[self.feature_cols] for _, df in parts])
+            labels = np.concatenate([df[target_col].values for _, df in parts])
+            symbols = [symbol for symbol, df in parts for _ in range(len(df))]
+            return self._frame(features, symbols), labels
+
+        X_train, y_train = build(train_parts)
+        X_test, y_test = build(test_parts)
+        return X_train, y_train, X_test, y_test
+
+    def fit(self, frames: Dict[str, pd.DataFrame], target_col: str = 'target', holdout: float = 0.2):
+        """Train the global model on every symbol at once"""
+        X_train, y_train, X_test, y_test = self.stack(frames, target_col, holdout)
+        if X_train is None:
+            raise ValueError("No training rows for the global model")
+
+        self.model = lgb.LGBMClassifier(**self.params)
+        self.model.fit(X_train, y_train, categorical_feature=CATEGORICAL_COLS)
+
+        self.metrics = {'train_rows': len(X_train), 'symbols': len(self.symbols)}
+        if X_test is not None and len(np.unique(y_test)) > 1:
+            from sklearn.metrics import accuracy_score, roc_auc_score
+            proba = self.model.predict_proba(X_test)[:, 1]
+            self.metrics['accuracy'] = accuracy_score(y_test, (proba > 0.5).astype(int))
+            self.metrics['roc_auc'] = roc_auc_score(y_test, proba)
+
+        self.version = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.logger.info(f"🌐 Global model trained on {len(self.symbols)} symbols, {len(X_train)} rows: {self.metrics}")
+        return self
+
+    def predict_proba(self, features: pd.DataFrame, symbols: List[str]) -> np.ndarray:
+        """Predict probabilities for feature rows belonging to the given symbols"""
+        return self.model.predict_proba(self._frame(features, symbols))
+
+    def for_symbol(self, symbol: str) -> '_SymbolView':
+        """Return a per-symbol view with the usual predict/predict_proba interface"""
+        return _SymbolView(self, symbol)
+
+    def save(self, path: Optional[str] = None) -> Path:
+        """Persist the model and its metadata as a single artifact"""
+        path = Path(path) if path else self.model_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        joblib.dump({
+            'model': self.model,
+            'feature_cols': self.feature_cols,
+            'symbols': self.symbols,
+            'asset_classes': self.asset_classes,
+            'version': self.version,
+            'metrics': self.metrics,
+            'params': self.params
+        }, path)
+        self.logger.info(f"💾 Global model saved: {path}")
+        return path
+
+    @classmethod
+    def load(cls, path: str = "models/global_model.pkl") -> 'GlobalModel':
+        """Load a global model artifact saved by save()"""
+        payload = joblib.load(path)
+        instance = cls(payload['feature_cols'], model_path=path, params=payload['params'])
+        instance.model = payload['model']
+        instance.symbols = payload['symbols']
+        instance.asset_classes = payload['asset_classes']
+        instance.version = payload['version']
+        instance.metrics = payload['metrics']
+        return instance
+
+
+class _SymbolView:
+    """Adapter that lets per-symbol call sites use the global model unchanged"""
+
+    def __init__(self, global_model: GlobalModel, symbol: str):
+        self.global_model = global_model
+        self.symbol = symbol
+        self.classes_ = global_model.model.classes_
+
+    def _features(self, X) -> pd.DataFrame:
+        if isinstance(X, pd.DataFrame):
+            return X
+        return pd.DataFrame(np.asarray(X).reshape(-1, len(self.global_model.feature_cols)),
+                            columns=self.global_model.feature_cols)
+
+    def predict_proba(self, X) -> np.ndarray:
+        features = self._features(X)
+        return self.global_model.predict_proba(features, [self.symbol] * len(features))
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
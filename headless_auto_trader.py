@@ -12,16 +12,23 @@ import numpy as np
 import yfinance as yf
 import requests
 import json
+import signal
 import time
 import sqlite3
+import threading
 from datetime import datetime, timedelta
 from pathlib import Path
-import schedule
 import logging
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score
-import joblib
+from calibration import Calibrator, calibrate_signals, fit_calibrator
+from db_writer import get_writer
+from latency_tracer import LatencyTracer
+from market_scheduler import MarketScheduler
+from model_registry import ModelRegistry
+from prediction_cache import PredictionCache, predict_batch_cached
+from state_checkpoint import StateCheckpoint
+from tree_compiler import compile_registered
+from walk_forward import WalkForwardValidator, fold_rows, store_fold_metrics
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -31,6 +38,9 @@ class HeadlessAutoTrader:
         self.setup_database()
         self.setup_directories()
         
+        # Per-stage cycle timings, flushed to the database every few minutes
+        self.tracer = LatencyTracer(self.db_path, "headless_auto_trader")
+        
         # Trading parameters
         self.symbols = {
             'stocks': ['SPY', 'QQQ', 'IWM', 'VTI'],
@@ -42,10 +52,32 @@ class HeadlessAutoTrader:
         self.exploration_rate = 0.1
         self.memory_size = 10000
         
+        # Global mode trains one cross-symbol model instead of one model per symbol
+        self.use_global_model = False
+        self.global_model = None
+        
+        # Promoted per-symbol models, loaded once and reloaded only on promotion
+        self.registry = ModelRegistry("models")
+        
+        # Repeat cycles on an unchanged bar reuse the last prediction
+        self.prediction_cache = PredictionCache()
+        self.calibrators = {}  # symbol -> (version, Calibrator)
+        
+        # Walk-forward validation (5-day target -> 5 bar purge)
+        self.validator = WalkForwardValidator(n_splits=5, purge=5, embargo=1, component="headless_auto_trader")
+        
+        # Session-aware scheduling from the market-hours database
+        self.scheduler = MarketScheduler()
+        
         # Performance tracking
         self.performance_history = []
         self.trade_history = []
         
+        # Crash-safe snapshots of caches and watermarks, restored on restart (state_checkpoint.py)
+        self.checkpoint = StateCheckpoint("headless_auto_trader")
+        self.last_retrain = None
+        self.last_market_update = None
+        
         self.logger.info("🚀 Headless AutoTrader initialized")
         self.logger.info(f"📊 Monitoring: {len(self.symbols['stocks'])} stocks, {len(self.symbols['crypto'])} crypto")
     
@@ -63,12 +95,21 @@ class HeadlessAutoTrader:
         )
         self.logger = logging.getLogger(__name__)
     
+    @property
+    def conn(self):
+        """SQLite connection of the calling thread"""
+        conn = getattr(self._db_local, 'conn', None)
+        if conn is None:
+            conn = self._db_local.conn = sqlite3.connect(self.db_path, timeout=30)
+        return conn
+    
     def setup_database(self):
         """Setup SQLite database for storing data and learning"""
         self.db_path = "data/autotrader.db"
         Path("data").mkdir(exist_ok=True)
         
-        self.conn = sqlite3.connect(self.db_path)
+        # One connection per thread: retraining and reports run on the scheduler's background lane
+        self._db_local = threading.local()
         cursor = self.conn.cursor()
         
         # Create tables
@@ -130,6 +171,8 @@ class HeadlessAutoTrader:
         ''')
         
         self.conn.commit()
+        # Writes from every thread go through one batching writer; self.conn is for reads
+        self.db = get_writer(self.db_path)
         self.logger.info("📊 Database initialized")
     
     def setup_directories(self):
@@ -152,19 +195,15 @@ class HeadlessAutoTrader:
                 return False
             
             # Store in database
-            cursor = self.conn.cursor()
+            self.db.executemany('''
+                INSERT OR REPLACE INTO market_data 
+                (symbol, timestamp, open, high, low, close, volume, market_type)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', [(
+                symbol, timestamp, row['Open'], row['High'], 
+                row['Low'], row['Close'], row['Volume'], market_type
+            ) for timestamp, row in data.iterrows()])
             
-            for timestamp, row in data.iterrows():
-                cursor.execute('''
-                    INSERT OR REPLACE INTO market_data 
-                    (symbol, timestamp, open, high, low, close, volume, market_type)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    symbol, timestamp, row['Open'], row['High'], 
-                    row['Low'], row['Close'], row['Volume'], market_type
-                ))
-            
-            self.conn.commit()
             self.logger.info(f"✅ Stored {len(data)} records for {symbol}")
             return True
             
@@ -191,6 +230,7 @@ class HeadlessAutoTrader:
                 completed += 1
             time.sleep(1)  # Rate limiting
         
+        self.db.flush()
         self.logger.info(f"✅ Historical data collection complete: {completed}/{total_symbols} symbols")
     
     def calculate_features(self, data):
@@ -319,9 +359,6 @@ class HeadlessAutoTrader:
             X = data[feature_columns]
             y = data['buy_signal']  # Focus on buy signals
             
-            # Split data
-            X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-            
             # Train model
             model = RandomForestClassifier(
                 n_estimators=100,
@@ -330,24 +367,28 @@ class HeadlessAutoTrader:
                 n_jobs=-1
             )
             
-            model.fit(X_train, y_train)
+            # Walk-forward validation, then train on all data
+            result = self.validator.validate(model, X, y, name=f"{symbol}_{market_type}")
+            accuracy = result['mean_accuracy']
+            store_fold_metrics(self.db, fold_rows(symbol, f"{symbol}_{market_type}",
+                                                  datetime.now().strftime("%Y%m%d_%H%M%S"), result))
             
-            # Evaluate model
-            y_pred = model.predict(X_test)
-            accuracy = accuracy_score(y_test, y_pred)
+            model.fit(X, y)
+            calibrator = fit_calibrator(result['oof_pred'], y)
             
-            # Save model
-            model_path = f"models/{symbol}_{market_type}_model.pkl"
-            joblib.dump(model, model_path)
+            # Register and promote; running signal loops pick it up on their next cycle
+            version = self.registry.register(f"{symbol}_{market_type}", model, metrics={'accuracy': accuracy},
+                                             features=feature_columns, promote=True,
+                                             calibration=calibrator.to_dict() if calibrator else None,
+                                             probe=X.tail(64))
+            compile_registered(self.registry, f"{symbol}_{market_type}", version, model=model)
             
             # Save performance metrics
-            cursor = self.conn.cursor()
-            cursor.execute('''
+            self.db.execute('''
                 INSERT INTO model_performance 
                 (timestamp, model_type, accuracy, total_trades, winning_trades, total_pnl)
                 VALUES (?, ?, ?, ?, ?, ?)
             ''', (datetime.now(), f"{symbol}_{market_type}", accuracy, 0, 0, 0.0))
-            self.conn.commit()
             
             self.logger.info(f"✅ Model trained for {symbol}: {accuracy:.3f} accuracy")
             return model
@@ -356,17 +397,92 @@ class HeadlessAutoTrader:
             self.logger.error(f"❌ Error training model for {symbol}: {e}")
             return None
     
-    def generate_signal(self, symbol, market_type):
-        """Generate trading signal using trained model"""
+    def train_global_model(self):
+        """Train one cross-symbol model on the stacked data of every symbol"""
+        from global_model import GlobalModel
+        
+        try:
+            self.logger.info("🌐 Training global cross-symbol model")
+            
+            frames = {}
+            for market_type, symbols in self.symbols.items():
+                for symbol in symbols:
+                    data = self.create_training_data(symbol, market_type)
+                    if data is not None:
+                        frames[symbol] = data
+            
+            if not frames:
+                self.logger.warning("❌ Insufficient data for global model")
+                return None
+            
+            feature_columns = [col for col in next(iter(frames.values())).columns if col not in ['buy_signal', 'sell_signal']]
+            global_model = GlobalModel(feature_columns).fit(frames, target_col='buy_signal')
+            global_model.save()
+            
+            self.db.execute('''
+                INSERT INTO model_performance 
+                (timestamp, model_type, accuracy, total_trades, winning_trades, total_pnl)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (datetime.now(), "global", global_model.metrics.get('accuracy', 0), 0, 0, 0.0))
+            
+            self.global_model = global_model
+            return global_model
+            
+        except Exception as e:
+            self.logger.error(f"❌ Error training global model: {e}")
+            return None
+    
+    def load_signal_model(self, symbol, market_type):
+        """Load the model used for a symbol's signals"""
+        if self.use_global_model:
+            if self.global_model is None:
+                model_path = Path("models/global_model.pkl")
+                if not model_path.exists():
+                    return None
+                from global_model import GlobalModel
+                self.global_model = GlobalModel.load(model_path)
+            return self.global_model.for_symbol(symbol)
+        
+        name = f"{symbol}_{market_type}"
+        model = self.registry.load(name)
+        if model is None:
+            # Adopt a model saved before the registry existed
+            legacy_path = Path(f"models/{name}_model.pkl")
+            if not legacy_path.exists():
+                return None
+            self.registry.register(name, path=legacy_path, version="legacy", promote=True)
+            model = self.registry.load(name)
+        return model
+    
+    def signal_model_version(self, symbol, market_type):
+        """Version of the model that scores a symbol (part of the prediction cache key)"""
+        if self.use_global_model:
+            return f"global_{self.global_model.version}" if self.global_model else None
+        entry = self.registry.promoted(f"{symbol}_{market_type}")
+        return entry['version'] if entry else None
+    
+    def signal_calibrator(self, symbol, market_type):
+        """Calibration table of the promoted version, built once per version"""
+        if self.use_global_model:
+            return None
+        entry = self.registry.promoted(f"{symbol}_{market_type}")
+        if not entry or not entry.get('calibration'):
+            return None
+        cached = self.calibrators.get(symbol)
+        if cached is None or cached[0] != entry['version']:
+            cached = self.calibrators[symbol] = (entry['version'], Calibrator.from_dict(entry['calibration']))
+        return cached[1]
+    
+    def prepare_signal_features(self, symbol, market_type):
+        """Load a symbol's model and its latest feature row"""
         try:
             # Load model
-            model_path = f"models/{symbol}_{market_type}_model.pkl"
-            if not Path(model_path).exists():
+            with self.tracer.stage("model_load"):
+                model = self.load_signal_model(symbol, market_type)
+            if model is None:
                 self.logger.warning(f"❌ No model found for {symbol}")
                 return None
             
-            model = joblib.load(model_path)
-            
             # Get latest data
             cursor = self.conn.cursor()
             cursor.execute('''
@@ -389,41 +505,82 @@ class HeadlessAutoTrader:
             df = self.calculate_features(df)
             
             # Get latest features
-            feature_columns = [col for col in df.columns if col not in ['buy_signal', 'sell_signal']]
-            latest_features = df[feature_columns].iloc[-1:].fillna(0)
+            entry = None if self.use_global_model else self.registry.promoted(f"{symbol}_{market_type}")
+            if self.use_global_model:
+                feature_columns = self.global_model.feature_cols
+            elif entry and entry.get('features'):
+                feature_columns = entry['features']
+            else:
+                feature_columns = [col for col in df.columns if col not in ['buy_signal', 'sell_signal']]
+            latest_features = df[feature_columns].iloc[-1].fillna(0)
             
-            # Generate prediction
-            prediction = model.predict(latest_features)[0]
-            confidence = model.predict_proba(latest_features)[0].max()
-            
-            signal = {
-                'symbol': symbol,
-                'timestamp': datetime.now(),
-                'signal': 'BUY' if prediction == 1 else 'HOLD',
-                'confidence': confidence,
-                'price': df['close'].iloc[-1],
-                'features': latest_features.to_dict('records')[0],
-                'market_type': market_type
-            }
-            
-            # Store signal
-            cursor.execute('''
-                INSERT INTO trading_signals 
-                (symbol, timestamp, signal, confidence, price, features, market_type)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                signal['symbol'], signal['timestamp'], signal['signal'],
-                signal['confidence'], signal['price'], 
-                json.dumps(signal['features']), signal['market_type']
-            ))
-            self.conn.commit()
-            
-            return signal
+            return model, latest_features, df['close'].iloc[-1]
             
         except Exception as e:
-            self.logger.error(f"❌ Error generating signal for {symbol}: {e}")
+            self.logger.error(f"❌ Error preparing features for {symbol}: {e}")
             return None
     
+    def generate_signals(self, universe=None):
+        """Generate trading signals for (symbol, market_type) pairs with one model pass per model"""
+        if universe is None:
+            universe = [(symbol, market_type) for market_type, symbols in self.symbols.items() for symbol in symbols]
+        
+        models, rows, prices, market_types = {}, {}, {}, {}
+        with self.tracer.stage("features"):
+            for symbol, market_type in universe:
+                prepared = self.prepare_signal_features(symbol, market_type)
+                if prepared is None:
+                    continue
+                models[symbol], rows[symbol], prices[symbol] = prepared
+                market_types[symbol] = market_type
+        
+        if not rows:
+            return []
+        
+        # Columns a model was not trained on stay NaN and are never selected for it
+        features = pd.DataFrame.from_dict(rows, orient='index')
+        versions = {symbol: self.signal_model_version(symbol, market_types[symbol]) for symbol in rows}
+        bar_times = {symbol: row.name for symbol, row in rows.items()}
+        with self.tracer.stage("predict"):
+            predictions = predict_batch_cached(self.prediction_cache, features, models, versions, bar_times)
+            predictions = calibrate_signals(predictions, {symbol: self.signal_calibrator(symbol, market_types[symbol])
+                                                          for symbol in predictions.index})
+        
+        timestamp = datetime.now()
+        signals = []
+        for symbol, scored in predictions.iterrows():
+            signals.append({
+                'symbol': symbol,
+                'timestamp': timestamp,
+                'signal': 'BUY' if scored['prediction'] == 1 else 'HOLD',
+                'confidence': scored['confidence'],
+                'price': prices[symbol],
+                'features': rows[symbol].to_dict(),
+                'market_type': market_types[symbol]
+            })
+        
+        try:
+            # Store signals
+            with self.tracer.stage("db_write"):
+                self.db.executemany('''
+                    INSERT INTO trading_signals 
+                    (symbol, timestamp, signal, confidence, price, features, market_type)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', [(
+                    signal['symbol'], signal['timestamp'], signal['signal'],
+                    signal['confidence'], signal['price'], 
+                    json.dumps(signal['features']), signal['market_type']
+                ) for signal in signals])
+        except Exception as e:
+            self.logger.error(f"❌ Error storing signals: {e}")
+        
+        return signals
+    
+    def generate_signal(self, symbol, market_type):
+        """Generate trading signal using trained model"""
+        signals = self.generate_signals([(symbol, market_type)])
+        return signals[0] if signals else None
+    
     def update_market_data(self):
         """Update market data for all symbols"""
         self.logger.info("🔄 Updating market data...")
@@ -438,8 +595,7 @@ class HeadlessAutoTrader:
                     if not data.empty:
                         latest = data.iloc[-1]
                         
-                        cursor = self.conn.cursor()
-                        cursor.execute('''
+                        self.db.execute('''
                             INSERT OR REPLACE INTO market_data 
                             (symbol, timestamp, open, high, low, close, volume, market_type)
                             VALUES (?, ?, ?, ?, ?, ?, ?, ?)
@@ -447,51 +603,96 @@ class HeadlessAutoTrader:
                             symbol, latest.name, latest['Open'], latest['High'],
                             latest['Low'], latest['Close'], latest['Volume'], market_type
                         ))
-                        self.conn.commit()
                         
                 except Exception as e:
                     self.logger.error(f"❌ Error updating {symbol}: {e}")
                 
                 time.sleep(0.5)  # Rate limiting
+        
+        self.db.flush()  # retraining reads these bars back
+        self.last_market_update = datetime.now()
     
     def run_trading_cycle(self):
         """Run one complete trading cycle"""
-        self.logger.info("🔄 Starting trading cycle...")
-        
-        # Update market data
-        self.update_market_data()
+        with self.tracer.cycle():
+            self.logger.info("🔄 Starting trading cycle...")
+            
+            # Update market data
+            with self.tracer.stage("market_data"):
+                self.update_market_data()
+            
+            # Generate signals for symbols whose market is in session
+            universe = [(symbol, market_type) for market_type, symbols in self.symbols.items()
+                        for symbol in self.scheduler.open_symbols(symbols)]
+            with self.tracer.stage("signals"):
+                signals = self.generate_signals(universe)
+            
+            # Log signals
+            for signal in signals:
+                if signal['confidence'] > 0.7:  # High confidence signals
+                    self.logger.info(f"🎯 {signal['signal']} {signal['symbol']} "
+                                   f"(Confidence: {signal['confidence']:.3f}, "
+                                   f"Price: ${signal['price']:.2f})")
+            
+            self.logger.info(f"✅ Trading cycle complete: {len(signals)} signals generated")
         
-        # Generate signals for all symbols
-        signals = []
-        for market_type, symbols in self.symbols.items():
-            for symbol in symbols:
-                signal = self.generate_signal(symbol, market_type)
-                if signal:
-                    signals.append(signal)
-        
-        # Log signals
-        for signal in signals:
-            if signal['confidence'] > 0.7:  # High confidence signals
-                self.logger.info(f"🎯 {signal['signal']} {signal['symbol']} "
-                               f"(Confidence: {signal['confidence']:.3f}, "
-                               f"Price: ${signal['price']:.2f})")
-        
-        self.logger.info(f"✅ Trading cycle complete: {len(signals)} signals generated")
+        self.checkpoint.save_if_due(self.checkpoint_state)
     
     def retrain_models(self):
         """Retrain all models with latest data"""
         self.logger.info("🤖 Retraining all models...")
         
-        for market_type, symbols in self.symbols.items():
-            for symbol in symbols:
-                self.train_model(symbol, market_type)
-                time.sleep(1)  # Rate limiting
+        if self.use_global_model:
+            self.train_global_model()
+        else:
+            for market_type, symbols in self.symbols.items():
+                for symbol in symbols:
+                    self.train_model(symbol, market_type)
+                    time.sleep(1)  # Rate limiting
         
+        self.last_retrain = datetime.now()
+        self.checkpoint.save_if_due(self.checkpoint_state, force=True)
         self.logger.info("✅ Model retraining complete")
     
+    def checkpoint_state(self):
+        """In-memory state worth keeping across a restart (promoted models themselves live in the registry)
+        
+        Retraining saves from the background lane while the signal thread keeps mutating these, so the
+        containers are copied here and pickled from the copies.
+        """
+        return {
+            'use_global_model': self.use_global_model,
+            'global_model': self.global_model,
+            'model_versions': {f"{symbol}_{market_type}": self.signal_model_version(symbol, market_type)
+                               for market_type, symbols in self.symbols.items() for symbol in symbols},
+            'prediction_cache': self.prediction_cache.snapshot(),
+            'calibrators': dict(self.calibrators),
+            'last_retrain': self.last_retrain,
+            'last_market_update': self.last_market_update,
+            'performance_history': list(self.performance_history),
+            'trade_history': list(self.trade_history)
+        }
+    
+    def restore_state(self):
+        """Adopt the latest checkpoint; True when it was restored"""
+        state = self.checkpoint.restore()
+        if state is None:
+            return False
+        if state['use_global_model'] == self.use_global_model:
+            self.global_model = state['global_model']
+            # Cached predictions are keyed by model version, so a model promoted since the snapshot just misses
+            self.prediction_cache = state['prediction_cache']
+            self.calibrators = state['calibrators']
+            self.last_retrain = state['last_retrain']
+        self.last_market_update = state['last_market_update']
+        self.performance_history = state['performance_history']
+        self.trade_history = state['trade_history']
+        return True
+    
     def generate_performance_report(self):
         """Generate performance report"""
         try:
+            self.db.flush()
             cursor = self.conn.cursor()
             
             # Get recent performance
@@ -513,7 +714,8 @@ class HeadlessAutoTrader:
                 'timestamp': datetime.now(),
                 'total_models': len(performance),
                 'recent_signals': len(recent_signals),
-                'high_confidence_signals': len([s for s in recent_signals if s[4] > 0.7])
+                'high_confidence_signals': len([s for s in recent_signals if s[4] > 0.7]),
+                'latency': self.tracer.daily_report()
             }
             
             # Save report
@@ -522,6 +724,7 @@ class HeadlessAutoTrader:
                 json.dump(report, f, indent=2, default=str)
             
             self.logger.info(f"📊 Performance report generated: {report_path}")
+            self.tracer.log_report(report['latency'])
             
         except Exception as e:
             self.logger.error(f"❌ Error generating report: {e}")
@@ -529,6 +732,7 @@ class HeadlessAutoTrader:
     def start_automated_trading(self):
         """Start the automated trading system"""
         self.logger.info("🚀 Starting Headless AutoTrader...")
+        restored = self.restore_state()
         
         # Download historical data if not exists
         cursor = self.conn.cursor()
@@ -539,21 +743,25 @@ class HeadlessAutoTrader:
             self.logger.info("📥 Downloading historical data...")
             self.download_all_historical_data()
         
-        # Train initial models
-        self.logger.info("🤖 Training initial models...")
-        self.retrain_models()
+        # Train initial models, unless a restored checkpoint shows they were trained within the last day
+        if restored and self.last_retrain and datetime.now() - self.last_retrain < timedelta(days=1):
+            self.logger.info(f"♻️ Models trained at {self.last_retrain:%Y-%m-%d %H:%M} - skipping initial training")
+        else:
+            self.logger.info("🤖 Training initial models...")
+            self.retrain_models()
         
-        # Schedule tasks
-        schedule.every(5).minutes.do(self.run_trading_cycle)
-        schedule.every().day.at("09:30").do(self.update_market_data)
-        schedule.every().day.at("16:00").do(self.retrain_models)
-        schedule.every().day.at("17:00").do(self.generate_performance_report)
+        # Schedule tasks on equity and crypto sessions; the loop sleeps until the next event. Trading cycles
+        # stretch to whole bars when they run long; retraining and reports run in the background lane
+        self.scheduler.every(5, self.run_trading_cycle, assets=('equity', 'crypto'), adaptive=True)
+        self.scheduler.at_open(self.update_market_data, 'equity')
+        self.scheduler.at_close(self.retrain_models, 'equity', lane='background')
+        self.scheduler.at_close(self.generate_performance_report, 'equity', offset_minutes=60, lane='background')
         
         self.logger.info("⏰ Scheduled tasks:")
-        self.logger.info("   - Trading cycle: Every 5 minutes")
-        self.logger.info("   - Market data update: 9:30 AM daily")
-        self.logger.info("   - Model retraining: 4:00 PM daily")
-        self.logger.info("   - Performance report: 5:00 PM daily")
+        self.logger.info("   - Trading cycle: every 5-minute bar close while a market is open (longer if cycles run long)")
+        self.logger.info("   - Market data update: equity session open")
+        self.logger.info("   - Model retraining: equity session close (early closes included)")
+        self.logger.info("   - Performance report: 1 hour after the equity close")
         
         # Run initial cycle
         self.run_trading_cycle()
@@ -561,15 +769,17 @@ class HeadlessAutoTrader:
         # Main loop
         self.logger.info("🔄 Starting main trading loop...")
         try:
-            while True:
-                schedule.run_pending()
-                time.sleep(60)  # Check every minute
+            self.scheduler.run_forever()
         except KeyboardInterrupt:
             self.logger.info("🛑 AutoTrader stopped by user")
         except Exception as e:
             self.logger.error(f"❌ Fatal error: {e}")
+        finally:
+            self.checkpoint.save_if_due(self.checkpoint_state, force=True)
 
 def main():
+    # systemd stops the service with SIGTERM: unwind like Ctrl-C so the final checkpoint is written
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
     trader = HeadlessAutoTrader()
     trader.start_automated_trading()
 
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Latency Tracer - Per-stage timing for the trading cycles
+- `with tracer.stage("predict"):` times one stage of the signal path
+- Durations go into log-spaced histogram buckets, so percentiles from many flushes and days merge exactly
+- Rolling p50/p95/p99 per stage are kept in memory and flushed to SQLite every few minutes (through the
+  database's single writer, db_writer.py)
+- The daily report compares today's per-stage p95 with the previous days and names the stages that regressed
+"""
+
+import argparse
+import json
+import logging
+import math
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from db_writer import get_writer
+
+# Bucket i holds durations up to BUCKET_BASE_MS * BUCKET_GROWTH**i (0.1 ms ... ~1 h at 15% resolution)
+BUCKET_BASE_MS = 0.1
+BUCKET_GROWTH = 1.15
+NUM_BUCKETS = 125
+PERCENTILES = (50, 95, 99)
+
+
+def bucket_index(ms: float) -> int:
+    if ms <= BUCKET_BASE_MS:
+        return 0
+    return min(NUM_BUCKETS - 1, math.ceil(math.log(ms / BUCKET_BASE_MS, BUCKET_GROWTH)))
+
+
+def bucket_upper_ms(index: int) -> float:
+    return BUCKET_BASE_MS * BUCKET_GROWTH ** index
+
+
+def percentile(buckets: Dict[int, int], pct: float) -> Optional[float]:
+    """Upper edge of the bucket holding the pct-th percentile"""
+    total = sum(buckets.values())
+    if not total:
+        return None
+    rank = pct / 100 * total
+    seen = 0
+    for index in sorted(buckets):
+        seen += buckets[index]
+        if seen >= rank:
+            return bucket_upper_ms(index)
+    return bucket_upper_ms(max(buckets))
+
+
+class StageHistogram:
+    """Bucketed durations of one stage"""
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms: float):
+        index = bucket_index(ms)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def merge(self, buckets: Dict[int, int], count: int, total_ms: float, max_ms: float):
+        for index, n in buckets.items():
+            self.buckets[int(index)] = self.buckets.get(int(index), 0) + n
+        self.count += count
+        self.total_ms += total_ms
+        self.max_ms = max(self.max_ms, max_ms)
+
+    def summary(self) -> Dict:
+        summary = {'count': self.count,
+                   'mean_ms': self.total_ms / self.count if self.count else None,
+                   'max_ms': self.max_ms}
+        for pct in PERCENTILES:
+            summary[f'p{pct}_ms'] = percentile(self.buckets, pct)
+        return summary
+
+
+class LatencyTracer:
+    """Stage timer for one component, flushed to that component's SQLite database"""
+
+    def __init__(self, db_path: str, component: str, flush_interval: float = 300):
+        self.logger = logging.getLogger(__name__)
+        self.db_path = db_path
+        self.component = component
+        self.flush_interval = flush_interval
+
+        self._lock = threading.Lock()
+        self._pending = {}  # stage -> StageHistogram since the last flush
+        self._last_flush = time.monotonic()
+        self.setup_database()
+        self.db = get_writer(db_path)
+
+    def setup_database(self):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS stage_latency (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp TEXT,
+                    component TEXT,
+                    stage TEXT,
+                    count INTEGER,
+                    total_ms REAL,
+                    max_ms REAL,
+                    p50_ms REAL,
+                    p95_ms REAL,
+                    p99_ms REAL,
+                    buckets TEXT
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_stage_latency_time ON stage_latency (component, timestamp)')
+
+    def record(self, stage: str, ms: float):
+        with self._lock:
+            self._pending.setdefault(stage, StageHistogram()).add(ms)
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time the enclosed block as one sample of stage name (recorded even if it raises)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000)
+
+    @contextmanager
+    def cycle(self, name: str = "cycle"):
+        """Time a whole cycle, then flush if the flush interval has passed"""
+        with self.stage(name):
+            yield
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def stats(self) -> Dict[str, Dict]:
+        """Percentiles of everything recorded since the last flush"""
+        with self._lock:
+            return {stage: hist.summary() for stage, hist in self._pending.items()}
+
+    def flush(self):
+        """Write one histogram row per stage and start a new window"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        if not pending:
+            return
+
+        timestamp = datetime.now().isoformat()
+        rows = []
+        for stage, hist in pending.items():
+            summary = hist.summary()
+            rows.append((timestamp, self.component, stage, hist.count, hist.total_ms, hist.max_ms,
+                         summary['p50_ms'], summary['p95_ms'], summary['p99_ms'], json.dumps(hist.buckets)))
+        try:
+            self.db.executemany('''
+                INSERT INTO stage_latency
+                (timestamp, component, stage, count, total_ms, max_ms, p50_ms, p95_ms, p99_ms, buckets)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+        except Exception as e:
+            self.logger.error(f"❌ Error flushing stage latencies: {e}")
+
+    def _merged(self, start: datetime, end: datetime) -> Dict[str, StageHistogram]:
+        self.db.flush()  # include the rows still queued for the writer
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute('''
+                SELECT stage, count, total_ms, max_ms, buckets FROM stage_latency
+                WHERE component = ? AND timestamp >= ? AND timestamp < ?
+            ''', (self.component, start.isoformat(), end.isoformat())).fetchall()
+        merged = {}
+        for stage, count, total_ms, max_ms, buckets in rows:
+            merged.setdefault(stage, StageHistogram()).merge(json.loads(buckets), count, total_ms, max_ms)
+        return merged
+
+    def daily_report(self, day=None, baseline_days: int = 7, threshold: float = 1.25,
+                     min_count: int = 10) -> Dict:
+        """Per-stage percentiles for day and the stages whose p95 regressed against the days before"""
+        self.flush()
+        day = day or datetime.now().date()
+        start = datetime.combine(day, datetime.min.time())
+        today = self._merged(start, start + timedelta(days=1))
+        baseline = self._merged(start - timedelta(days=baseline_days), start)
+
+        stages, regressions = {}, []
+        for stage, hist in today.items():
+            stages[stage] = hist.summary()
+            base = baseline.get(stage)
+            if base is None or base.count < min_count or hist.count < min_count:
+                continue
+            base_p95, p95 = percentile(base.buckets, 95), stages[stage]['p95_ms']
+            stages[stage]['baseline_p95_ms'] = base_p95
+            if p95 > base_p95 * threshold:
+                regressions.append({'stage': stage, 'p95_ms': p95, 'baseline_p95_ms': base_p95,
+                                    'ratio': p95 / base_p95})
+
+        regressions.sort(key=lambda r: r['ratio'], reverse=True)
+        return {'date': day.isoformat(), 'component': self.component, 'stages': stages,
+                'regressions': regressions}
+
+    def log_report(self, report: Dict):
+        for stage, summary in sorted(report['stages'].items()):
+            self.logger.info(f"⏱️ {stage:<14} p50 {summary['p50_ms']:.1f} ms  p95 {summary['p95_ms']:.1f} ms  "
+                             f"p99 {summary['p99_ms']:.1f} ms  (n={summary['count']})")
+        for regression in report['regressions']:
+            self.logger.warning(f"🐢 {regression['stage']} regressed: p95 {regression['p95_ms']:.1f} ms vs "
+                                f"{regression['baseline_p95_ms']:.1f} ms ({regression['ratio']:.1f}x)")
+
+
+def components(db_path: str) -> List[str]:
+    with sqlite3.connect(db_path) as conn:
+        return [row[0] for row in conn.execute('SELECT DISTINCT component FROM stage_latency')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-stage latency report for a trading database")
+    parser.add_argument('db_path')
+    parser.add_argument('--component', default=None, help="defaults to every component in the database")
+    parser.add_argument('--date', default=None, help="YYYY-MM-DD, defaults to today")
+    parser.add_argument('--baseline-days', type=int, default=7)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    day = datetime.strptime(args.date, "%Y-%m-%d").date() if args.date else None
+    for component in ([args.component] if args.component else components(args.db_path)):
+        tracer = LatencyTracer(args.db_path, component)
+        print(f"\n⏱️ {component}")
+        tracer.log_report(tracer.daily_report(day, baseline_days=args.baseline_days))
+
+
+if __name__ == "__main__":
+    main()
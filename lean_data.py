@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+LEAN Data Loader - Read the bundled LEAN data folder into pandas
+- Daily and minute equity trade bars (prices stored as deci-cents)
+- Daily and minute crypto trade bars
+- Columns match yfinance (Open, High, Low, Close, Volume) so trader code can consume them unchanged
+"""
+
+import zipfile
+from pathlib import Path
+from typing import List
+
+import pandas as pd
+
+DATA_DIR = Path(__file__).resolve().parent / "data"
+BAR_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+EQUITY_PRICE_SCALE = 10000
+
+
+def _read_zip_csv(path: Path) -> pd.DataFrame:
+    """Read the single CSV inside a LEAN zip archive"""
+    with zipfile.ZipFile(path) as archive:
+        with archive.open(archive.namelist()[0]) as f:
+            return pd.read_csv(f, header=None)
+
+
+def available_equity_symbols(min_rows: int = 250, data_dir: Path = DATA_DIR) -> List[str]:
+    """Daily equity symbols with at least min_rows bars"""
+    symbols = []
+    for path in sorted((Path(data_dir) / "equity/usa/daily").glob("*.zip")):
+        with zipfile.ZipFile(path) as archive:
+            rows = sum(1 for _ in archive.open(archive.namelist()[0]))
+        if rows >= min_rows:
+            symbols.append(path.stem.upper())
+    return symbols
+
+
+def available_equity_minute_symbols(data_dir: Path = DATA_DIR) -> List[str]:
+    """Equity symbols with at least one bundled day of minute trade bars"""
+    root = Path(data_dir) / "equity/usa/minute"
+    return sorted(path.name.upper() for path in root.iterdir() if any(path.glob("*_trade.zip")))
+
+
+def load_equity_daily(symbol: str, data_dir: Path = DATA_DIR) -> pd.DataFrame:
+    """Daily equity bars for a symbol"""
+    raw = _read_zip_csv(Path(data_dir) / f"equity/usa/daily/{symbol.lower()}.zip")
+    df = pd.DataFrame(raw.iloc[:, 1:6].values, columns=BAR_COLUMNS,
+                      index=pd.to_datetime(raw[0], format="%Y%m%d %H:%M"))
+    df[BAR_COLUMNS[:4]] = df[BAR_COLUMNS[:4]] / EQUITY_PRICE_SCALE
+    df.index.name = 'Date'
+    return df
+
+
+def load_equity_minute(symbol: str, data_dir: Path = DATA_DIR) -> pd.DataFrame:
+    """Minute equity trade bars for every bundled day of a symbol"""
+    frames = []
+    for path in sorted((Path(data_dir) / f"equity/usa/minute/{symbol.lower()}").glob("*_trade.zip")):
+        raw = _read_zip_csv(path)
+        day = pd.Timestamp(path.name.split('_')[0])
+        df = pd.DataFrame(raw.iloc[:, 1:6].values, columns=BAR_COLUMNS,
+                          index=day + pd.to_timedelta(raw[0], unit='ms'))
+        df[BAR_COLUMNS[:4]] = df[BAR_COLUMNS[:4]] / EQUITY_PRICE_SCALE
+        frames.append(df)
+    if not frames:
+        raise FileNotFoundError(f"No minute data bundled for {symbol}")
+    return pd.concat(frames)
+
+
+def load_crypto_daily(pair: str = "btcusd", market: str = "coinbase", data_dir: Path = DATA_DIR) -> pd.DataFrame:
+    """Daily crypto trade bars (prices are not scaled)"""
+    raw = _read_zip_csv(Path(data_dir) / f"crypto/{market}/daily/{pair.lower()}_trade.zip")
+    df = pd.DataFrame(raw.iloc[:, 1:6].values, columns=BAR_COLUMNS,
+                      index=pd.to_datetime(raw[0], format="%Y%m%d %H:%M"))
+    df.index.name = 'Date'
+    return df
+
+
+def load_crypto_minute(pair: str = "btcusd", market: str = "coinbase", data_dir: Path = DATA_DIR) -> pd.DataFrame:
+    """Minute crypto trade bars for every bundled day of a pair"""
+    frames = []
+    for path in sorted((Path(data_dir) / f"crypto/{market}/minute/{pair.lower()}").glob("*_trade.zip")):
+        raw = _read_zip_csv(path)
+        day = pd.Timestamp(path.name.split('_')[0])
+        frames.append(pd.DataFrame(raw.iloc[:, 1:6].values, columns=BAR_COLUMNS,
+                                   index=day + pd.to_timedelta(raw[0], unit='ms')))
+    if not frames:
+        raise FileNotFoundError(f"No minute data bundled for {pair}")
+    return pd.concat(frames)
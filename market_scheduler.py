@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+Market Scheduler - Sleep until the next event that matters for the markets being traded
+- Sessions come from the bundled LEAN market-hours database (loaded once per process)
+- Holidays, early closes and late opens are applied per asset class (equities: NYSE hours, crypto: 24/7)
+- Jobs fire on bar closes within a session, at session open or at session close (with offsets)
+- The run loop sleeps until the earliest job is due: nothing wakes up overnight, on weekends or on holidays
+- A job that overruns its bar skips the stale bar closes instead of replaying them back-to-back
+- Adaptive bar jobs stretch their cadence to whole bars that fit their measured run time (the bar is the minimum)
+- Background-lane jobs (retraining, reports) run on a low-priority worker thread so signal cycles keep their latency
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+MARKET_HOURS_PATH = Path(__file__).resolve().parent / "data/market-hours/market-hours-database.json"
+ASSET_ENTRIES = {'equity': 'Equity-usa-[*]', 'crypto': 'Crypto-coinbase-[*]'}
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+# Longest single sleep; a suspended laptop or a clock change is noticed within this long
+MAX_SLEEP_SECONDS = 3600
+# How far ahead to search for a session (covers long holiday weekends)
+SEARCH_DAYS = 14
+LANES = ('signal', 'background')
+# An adaptive job's cadence leaves this much headroom over its average run time
+ADAPTIVE_HEADROOM = 1.25
+# Weight of the latest run in a job's average run time
+DURATION_SMOOTHING = 0.3
+# Niceness of the background worker thread (Linux schedules threads individually)
+BACKGROUND_NICE = 10
+# Most stale events counted after one overrun (a suspended machine can miss days of bars)
+MAX_SKIP_COUNT = 1000
+
+_database = {}  # path -> parsed JSON entries
+
+
+def asset_class(symbol: str) -> str:
+    """'crypto' for yfinance crypto pairs (BTC-USD), 'equity' otherwise"""
+    return 'crypto' if symbol.upper().endswith(('-USD', '-USDT')) else 'equity'
+
+
+def _parse_date(text: str) -> date:
+    return datetime.strptime(text, "%m/%d/%Y").date()
+
+
+def _parse_offset(text: str) -> timedelta:
+    """LEAN time of day: 'HH:MM:SS', or 'D.HH:MM:SS' for the end of a 24h session"""
+    days, clock = text.split('.', 1) if '.' in text else ('0', text)
+    hours, minutes, seconds = (int(part) for part in clock.split(':'))
+    return timedelta(days=int(days), hours=hours, minutes=minutes, seconds=seconds)
+
+
+def load_entries(path: Path = MARKET_HOURS_PATH) -> Dict[str, Dict]:
+    path = Path(path)
+    if path not in _database:
+        with open(path, 'r') as f:
+            _database[path] = json.load(f)['entries']
+    return _database[path]
+
+
+class MarketHours:
+    """Regular sessions of one market-hours database entry"""
+
+    def __init__(self, entry: Dict, states: Tuple[str, ...] = ('market',)):
+        self.logger = logging.getLogger(__name__)
+        self.tz = ZoneInfo(entry['exchangeTimeZone'])
+        self.weekly = {day: [(_parse_offset(s['start']), _parse_offset(s['end']))
+                             for s in entry.get(day, []) if s['state'] in states]
+                       for day in WEEKDAYS}
+        self.holidays = {_parse_date(d) for d in entry.get('holidays', [])}
+        self.early_closes = {_parse_date(d): _parse_offset(t) for d, t in entry.get('earlyCloses', {}).items()}
+        self.late_opens = {_parse_date(d): _parse_offset(t) for d, t in entry.get('lateOpens', {}).items()}
+        self.calendar_end = max((d.year for d in self.holidays), default=None)
+        self._warned_years = set()
+
+    def sessions(self, day: date) -> List[Tuple[datetime, datetime]]:
+        """(open, close) of each session on a local exchange date, as aware datetimes"""
+        if day in self.holidays:
+            return []
+        if self.calendar_end is not None and day.year > self.calendar_end and day.year not in self._warned_years:
+            self._warned_years.add(day.year)
+            self.logger.warning(f"⚠️ Market-hours database has no holidays for {day.year}; "
+                                f"weekdays are treated as trading days")
+
+        midnight = datetime.combine(day, datetime.min.time())
+        sessions = []
+        for start, end in self.weekly[WEEKDAYS[day.weekday()]]:
+            start = max(start, self.late_opens.get(day, start))
+            end = min(end, self.early_closes.get(day, end))
+            if start < end:
+                # Localize wall-clock times so DST days get their real length
+                sessions.append(((midnight + start).replace(tzinfo=self.tz), (midnight + end).replace(tzinfo=self.tz)))
+
+        # Touching segments within a day are one session
+        merged = []
+        for start, end in sessions:
+            if merged and merged[-1][1] >= start:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+        return merged
+
+    def sessions_from(self, when: datetime, days: int = SEARCH_DAYS) -> Iterable[Tuple[datetime, datetime]]:
+        """Sessions that have not closed by when, in order"""
+        local_day = when.astimezone(self.tz).date()
+        for offset in range(-1, days):
+            for start, end in self.sessions(local_day + timedelta(days=offset)):
+                if end > when:
+                    yield start, end
+
+    def is_open(self, when: datetime) -> bool:
+        return any(start <= when < end for start, end in self.sessions_from(when, days=1))
+
+    def next_open(self, after: datetime) -> Optional[datetime]:
+        return next((start for start, _ in self.sessions_from(after) if start > after), None)
+
+    def next_close(self, after: datetime) -> Optional[datetime]:
+        return next((end for _, end in self.sessions_from(after)), None)
+
+
+class _Job:
+    def __init__(self, fn: Callable, kind: str, assets: Tuple[str, ...], minutes: float = 0,
+                 adaptive: bool = False, lane: str = 'signal'):
+        self.fn = fn
+        self.kind = kind  # 'bar', 'open' or 'close'
+        self.assets = assets
+        self.minutes = minutes  # bar length, or offset from the open/close
+        self.adaptive = adaptive
+        self.lane = lane
+        self.next_run = None
+        self.running = False  # queued or running on the background worker
+        self.cadence = 1  # stride last announced
+        self.runs = 0
+        self.avg_seconds = None
+        self.last_seconds = None
+        self.overruns = 0
+        self.skipped = 0
+
+    @property
+    def name(self) -> str:
+        return getattr(self.fn, '__name__', repr(self.fn))
+
+    @property
+    def stride(self) -> int:
+        """Bar closes per run: 1, or more for an adaptive job whose runs take longer than a bar"""
+        if self.kind != 'bar' or not self.adaptive or not self.avg_seconds:
+            return 1
+        return max(1, math.ceil(self.avg_seconds * ADAPTIVE_HEADROOM / (self.minutes * 60)))
+
+    def record(self, seconds: float):
+        self.runs += 1
+        self.last_seconds = seconds
+        if self.avg_seconds is None:
+            self.avg_seconds = seconds
+        else:
+            self.avg_seconds += DURATION_SMOOTHING * (seconds - self.avg_seconds)
+
+
+class MarketScheduler:
+    """Bar-close, open and close jobs per asset class, run by sleeping until the next one is due"""
+
+    def __init__(self, path: Path = MARKET_HOURS_PATH, clock: Callable[[], float] = time.time,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.logger = logging.getLogger(__name__)
+        entries = load_entries(path)
+        self.markets = {asset: MarketHours(entries[key]) for asset, key in ASSET_ENTRIES.items()}
+        self.clock = clock
+        self.sleep = sleep
+        self.jobs = []
+        self._announced = None
+        self._background = queue.Queue()
+        self._worker = None
+
+    def now(self) -> datetime:
+        return datetime.fromtimestamp(self.clock(), tz=timezone.utc)
+
+    # --- job registration -------------------------------------------------------------
+
+    def _add(self, job: _Job) -> _Job:
+        unknown = set(job.assets) - set(self.markets)
+        if unknown:
+            raise ValueError(f"Unknown asset class: {', '.join(sorted(unknown))}")
+        if job.lane not in LANES:
+            raise ValueError(f"Unknown lane: {job.lane}")
+        job.next_run = self._next_time(job, self.now())
+        self.jobs.append(job)
+        return job
+
+    def every(self, minutes: float, fn: Callable, assets: Iterable[str] = ('equity',), adaptive: bool = False,
+              lane: str = 'signal') -> _Job:
+        """Run fn at every bar close (session open + k * minutes, and the close) while assets trade;
+        adaptive runs it every k-th close instead when its runs take longer than a bar"""
+        return self._add(_Job(fn, 'bar', tuple(assets), minutes, adaptive, lane))
+
+    def at_open(self, fn: Callable, asset: str = 'equity', offset_minutes: float = 0, lane: str = 'signal') -> _Job:
+        return self._add(_Job(fn, 'open', (asset,), offset_minutes, lane=lane))
+
+    def at_close(self, fn: Callable, asset: str = 'equity', offset_minutes: float = 0, lane: str = 'signal') -> _Job:
+        """Run fn at each session close (early closes included), shifted by offset_minutes"""
+        return self._add(_Job(fn, 'close', (asset,), offset_minutes, lane=lane))
+
+    # --- market state -----------------------------------------------------------------
+
+    def is_open(self, asset: str, when: Optional[datetime] = None) -> bool:
+        return self.markets[asset].is_open(when or self.now())
+
+    def open_symbols(self, symbols: Iterable[str], when: Optional[datetime] = None) -> List[str]:
+        """Symbols whose market is in session"""
+        when = when or self.now()
+        return [symbol for symbol in symbols if self.is_open(asset_class(symbol), when)]
+
+    # --- event computation ------------------------------------------------------------
+
+    def _next_time(self, job: _Job, after: datetime) -> Optional[datetime]:
+        """First event of job strictly after after"""
+        candidates = []
+        offset = timedelta(minutes=job.minutes)
+        for asset in job.assets:
+            for start, end in self.markets[asset].sessions_from(after - abs(offset)):
+                if job.kind == 'bar':
+                    event = self._next_bar_close(start, end, offset, after)
+                else:
+                    event = (start if job.kind == 'open' else end) + offset
+                    event = event if event > after else None
+                if event is not None:
+                    candidates.append(event)
+                    break
+        return min(candidates) if candidates else None
+
+    @staticmethod
+    def _next_bar_close(start: datetime, end: datetime, bar: timedelta, after: datetime) -> Optional[datetime]:
+        if after >= end:
+            return None
+        if after < start:
+            return min(start + bar, end)
+        elapsed = (after - start) // bar + 1
+        return min(start + bar * elapsed, end)
+
+    def next_run(self) -> Optional[datetime]:
+        times = [job.next_run for job in self.jobs if job.next_run is not None]
+        return min(times) if times else None
+
+    # --- run loop ---------------------------------------------------------------------
+
+    def _reschedule(self, job: _Job, due: datetime, ran: bool):
+        """Next event of a job that was due at due; events that passed meanwhile are skipped, not replayed
+        (an overrun when the job itself just ran through them)"""
+        upcoming = due
+        for _ in range(job.stride):
+            upcoming = self._next_time(job, upcoming)
+            if upcoming is None:
+                break
+
+        now = self.now()
+        if upcoming is not None and upcoming <= now:
+            skipped = 0
+            while upcoming is not None and upcoming <= now and skipped < MAX_SKIP_COUNT:
+                skipped += 1
+                upcoming = self._next_time(job, upcoming)
+            if upcoming is not None and upcoming <= now:
+                upcoming = self._next_time(job, now)
+            job.skipped += skipped
+            if ran:
+                job.overruns += 1
+                self.logger.warning(f"⏭️ {job.name} overran ({job.last_seconds:.0f}s): "
+                                    f"skipping {skipped} stale run(s)")
+            else:
+                self.logger.info(f"⏭️ {job.name}: skipping {skipped} stale run(s) missed while other jobs ran")
+        job.next_run = upcoming
+
+        if job.stride != job.cadence:
+            job.cadence = job.stride
+            self.logger.info(f"⏱️ {job.name} now runs every {job.stride * job.minutes:g} minutes "
+                             f"(average run {job.avg_seconds:.0f}s)")
+
+    def _run(self, job: _Job):
+        started = self.clock()
+        try:
+            job.fn()
+        except Exception as e:
+            self.logger.error(f"❌ Scheduled job {job.name} failed: {e}")
+        finally:
+            job.record(self.clock() - started)
+
+    def _background_worker(self):
+        if sys.platform.startswith('linux'):
+            try:
+                os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), BACKGROUND_NICE)
+            except (AttributeError, OSError):
+                pass
+        while True:
+            job = self._background.get()
+            try:
+                self._run(job)
+            finally:
+                job.running = False
+
+    def _submit_background(self, job: _Job):
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._background_worker, name="scheduler-background",
+                                            daemon=True)
+            self._worker.start()
+        job.running = True
+        self._background.put(job)
+
+    def run_pending(self) -> int:
+        """Run every signal-lane job that is due and hand due background jobs to the worker;
+        a callback due through several jobs at once runs once"""
+        now = self.now()
+        due = [job for job in self.jobs if job.next_run is not None and job.next_run <= now]
+        ran = []
+        # Background jobs are only queued, so they go first and never wait behind a signal cycle
+        for job in sorted(due, key=lambda job: job.lane != 'background'):
+            key = (job.lane, job.fn)
+            first = key not in ran
+            if first:
+                ran.append(key)
+                if job.lane == 'signal':
+                    self._run(job)
+                elif job.running:
+                    self.logger.warning(f"⏭️ {job.name} is still running in the background - skipping this run")
+                    job.overruns += 1
+                    job.skipped += 1
+                else:
+                    self._submit_background(job)
+            self._reschedule(job, job.next_run, ran=first and job.lane == 'signal')
+        return len(ran)
+
+    def stats(self) -> List[Dict]:
+        """Cadence and run-time figures of every job"""
+        return [{'job': job.name, 'lane': job.lane, 'kind': job.kind, 'minutes': job.minutes,
+                 'cadence_minutes': job.stride * job.minutes if job.kind == 'bar' else None,
+                 'runs': job.runs, 'avg_seconds': job.avg_seconds, 'last_seconds': job.last_seconds,
+                 'overruns': job.overruns, 'skipped': job.skipped, 'running': job.running}
+                for job in self.jobs]
+
+    def seconds_until_next(self) -> Optional[float]:
+        upcoming = self.next_run()
+        return None if upcoming is None else max(0.0, (upcoming - self.now()).total_seconds())
+
+    def run_forever(self, should_stop: Callable[[], bool] = lambda: False):
+        """Sleep until the next due job, run it, repeat"""
+        while not should_stop():
+            wait = self.seconds_until_next()
+            if wait is None:
+                self.logger.warning("⚠️ No scheduled events in the market-hours database; stopping")
+                return
+            if wait > 0:
+                upcoming = self.next_run()
+                if wait > 60 and upcoming != self._announced:
+                    self._announced = upcoming
+                    self.logger.info(f"😴 Sleeping until {upcoming.astimezone(self.markets['equity'].tz):%a %Y-%m-%d %H:%M %Z}")
+                self.sleep(min(wait, MAX_SLEEP_SECONDS))
+                continue
+            self.run_pending()
+
+    def describe(self, count: int = 10) -> List[Tuple[datetime, str]]:
+        """The next count (time, job name) events, for logging and the CLI"""
+        events = []
+        cursors = {id(job): job.next_run for job in self.jobs}
+        while len(events) < count:
+            pending = [(cursors[id(job)], job) for job in self.jobs if cursors[id(job)] is not None]
+            if not pending:
+                break
+            when, job = min(pending, key=lambda item: item[0])
+            events.append((when, job.name))
+            cursors[id(job)] = self._next_time(job, when)
+        return events
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show upcoming market sessions and bar closes")
+    parser.add_argument('--asset', default='equity', choices=sorted(ASSET_ENTRIES))
+    parser.add_argument('--minutes', type=float, default=5, help="bar length")
+    parser.add_argument('--count', type=int, default=10)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    scheduler = MarketScheduler()
+    market = scheduler.markets[args.asset]
+    now = scheduler.now()
+    print(f"🕐 {args.asset} is {'open' if market.is_open(now) else 'closed'}; "
+          f"next open {market.next_open(now)}, next close {market.next_close(now)}")
+
+    def bar_close():
+        pass
+
+    scheduler.every(args.minutes, bar_close, assets=(args.asset,))
+    for when, name in scheduler.describe(args.count):
+        print(f"   {when.astimezone(market.tz):%a %Y-%m-%d %H:%M %Z}  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,7 @@ Usage: python master_orchestrator.py
 
 import time
 import logging
+import signal
 import subprocess
 import threading
 import json
@@ -26,10 +27,19 @@ import yfinance as yf
 import pandas as pd
 import numpy as np
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score
-import alpaca_trade_api as tradeapi
 import requests
+from async_cycle import AsyncPipeline, Stage
+from batch_inference import predict_batch
+from calibration import calibrate_signals, fit_calibrator
+from db_writer import get_writer
+from latency_tracer import LatencyTracer
+from market_scheduler import MarketScheduler
+from signal_bus import SignalBus
+from state_checkpoint import StateCheckpoint
+from supervisor import Heartbeat
+from walk_forward import WalkForwardValidator, fold_rows, store_fold_metrics
+
+FEATURE_COLS = ['sma_5', 'sma_20', 'sma_50', 'sma_200', 'volatility_5', 'volatility_20', 'rsi', 'macd', 'macd_signal']
 
 class MasterOrchestrator:
     """The brain that orchestrates all trading operations"""
@@ -39,6 +49,9 @@ class MasterOrchestrator:
         self.setup_directories()
         self.setup_database()
         
+        # Per-stage cycle timings, flushed to the database every few minutes
+        self.tracer = LatencyTracer(self.db_path, "master_orchestrator")
+        
         # Trading configuration
         self.portfolio_value = 10000  # Starting capital
         self.max_position_size = 0.25  # Max 25% per position
@@ -49,6 +62,39 @@ class MasterOrchestrator:
         self.stock_symbols = ['SPY', 'QQQ', 'IWM', 'VTI']
         self.crypto_symbols = ['BTC-USD', 'ETH-USD', 'ADA-USD', 'SOL-USD']
         
+        # Model training mode: 'per_symbol' (one model each) or 'global' (one cross-symbol model)
+        self.training_mode = 'per_symbol'
+        
+        # Signal cycles reuse the latest models; retraining runs in the scheduler's background lane this often
+        self.retrain_minutes = 60
+        
+        # Per-symbol mode runs fetch/train/signal/order as an overlapping pipeline (async_cycle.py)
+        self.async_cycle = True
+        self.io_concurrency = 8
+        # Orders of different symbols may complete concurrently in the pipeline
+        self._trade_lock = threading.Lock()
+        
+        # Manual trade instructions for the browser traders (signal_bus.py, safe for concurrent appends)
+        self.signal_bus = SignalBus()
+        
+        # Walk-forward validation (next-day target -> 1 bar purge)
+        self.validator = WalkForwardValidator(n_splits=5, purge=1, embargo=1, component="master_orchestrator")
+        
+        # Per-symbol probability calibration fitted on each model's out-of-fold predictions; swapped
+        # together with self.models under _model_lock so a cycle never pairs a model with another's table
+        self.calibrators = {}
+        self._model_lock = threading.Lock()
+        
+        # Session-aware scheduling from the market-hours database
+        self.scheduler = MarketScheduler()
+        self.cycle_count = 0
+        
+        # Heartbeats to supervisor.py when started by it (no-op otherwise)
+        self.heartbeat = Heartbeat()
+        
+        # Crash-safe snapshots of models, bars and cooldowns, restored on restart (state_checkpoint.py)
+        self.checkpoint = StateCheckpoint("master_orchestrator")
+        
         # Brokerage configurations (load from config file)
         self.brokerages = self.load_brokerage_config()
         
@@ -57,6 +103,7 @@ class MasterOrchestrator:
         self.positions = {}
         self.models = {}
         self.last_trade_time = {}
+        self.bars = {}  # symbol -> daily bars; refreshed incrementally after the first download
         
         # Performance tracking
         self.daily_pnl = 0
@@ -100,6 +147,12 @@ class MasterOrchestrator:
             }
         }
     
+    def alpaca_api(self):
+        """Alpaca REST client (alpaca_trade_api is only imported when Alpaca is actually used)"""
+        import alpaca_trade_api as tradeapi
+        alpaca = self.brokerages['alpaca']
+        return tradeapi.REST(alpaca['api_key'], alpaca['secret_key'], alpaca['base_url'])
+    
     def setup_logging(self):
         """Setup comprehensive logging"""
         log_dir = Path("logs")
@@ -162,6 +215,9 @@ class MasterOrchestrator:
                     f1_score REAL
                 )
             ''')
+        
+        # Every write goes through one batching writer thread; reads open their own (WAL) connections
+        self.db = get_writer(self.db_path)
     
     def check_system_health(self) -> Dict[str, bool]:
         """Check health of all system components"""
@@ -177,11 +233,7 @@ class MasterOrchestrator:
         
         # Check Alpaca connection
         try:
-            api = tradeapi.REST(
-                self.brokerages['alpaca']['api_key'],
-                self.brokerages['alpaca']['secret_key'],
-                self.brokerages['alpaca']['base_url']
-            )
+            api = self.alpaca_api()
             account = api.get_account()
             health_status['alpaca_connection'] = account is not None
         except Exception as e:
@@ -204,37 +256,55 @@ class MasterOrchestrator:
         self.logger.info(f"System Health: {health_status}")
         
         # Store health status in database
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute('''
-                INSERT INTO system_health (timestamp, component, status, error_message, performance_metrics)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (
-                datetime.now().isoformat(),
-                'overall',
-                'healthy' if all(health_status.values()) else 'degraded',
-                '',
-                json.dumps(health_status)
-            ))
+        self.db.execute('''
+            INSERT INTO system_health (timestamp, component, status, error_message, performance_metrics)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (
+            datetime.now().isoformat(),
+            'overall',
+            'healthy' if all(health_status.values()) else 'degraded',
+            '',
+            json.dumps(health_status)
+        ))
         
         return health_status
     
+    def open_symbols(self) -> List[str]:
+        """Symbols whose market is in session (crypto around the clock, equities in their sessions)"""
+        return self.scheduler.open_symbols(self.stock_symbols + self.crypto_symbols)
+    
     def collect_market_data(self) -> Dict[str, pd.DataFrame]:
-        """Collect fresh market data for all symbols"""
+        """Collect fresh market data for the symbols whose market is in session"""
         all_data = {}
         
-        for symbol in self.stock_symbols + self.crypto_symbols:
-            try:
-                data = yf.download(symbol, period='1y', interval='1d')
-                if not data.empty:
-                    all_data[symbol] = data
-                    self.logger.info(f"✅ Collected {len(data)} records for {symbol}")
-                else:
-                    self.logger.warning(f"⚠️ No data collected for {symbol}")
-            except Exception as e:
-                self.logger.error(f"❌ Error collecting data for {symbol}: {e}")
+        for symbol in self.open_symbols():
+            data = self.collect_symbol_data(symbol)
+            if data is not None:
+                all_data[symbol] = data
         
         return all_data
     
+    def collect_symbol_data(self, symbol: str) -> Optional[pd.DataFrame]:
+        """One year of daily bars for a symbol (None if unavailable)"""
+        try:
+            # Bars held in memory (or restored from a checkpoint) only need the days after their last bar
+            cached = self.bars.get(symbol)
+            if cached is not None and pd.Timestamp.now() - cached.index[-1].tz_localize(None) < pd.Timedelta(days=5):
+                recent = yf.download(symbol, period='5d', interval='1d')
+                data = pd.concat([cached, recent])
+                data = data[~data.index.duplicated(keep='last')]
+                data = data[data.index > data.index[-1] - pd.DateOffset(years=1)]
+            else:
+                data = yf.download(symbol, period='1y', interval='1d')
+            if not data.empty:
+                self.bars[symbol] = data
+                self.logger.info(f"✅ Collected {len(data)} records for {symbol}")
+                return data
+            self.logger.warning(f"⚠️ No data collected for {symbol}")
+        except Exception as e:
+            self.logger.error(f"❌ Error collecting data for {symbol}: {e}")
+        return None
+    
     def calculate_features(self, data: pd.DataFrame) -> pd.DataFrame:
         """Calculate technical indicators and features"""
         df = data.copy()
@@ -268,84 +338,159 @@ class MasterOrchestrator:
         
         return df.dropna()
     
-    def train_models(self, all_data: Dict[str, pd.DataFrame]) -> Dict[str, RandomForestClassifier]:
-        """Train ML models for each symbol"""
-        models = {}
+    def train_models(self, all_data: Dict[str, pd.DataFrame]) -> Tuple[Dict[str, RandomForestClassifier], Dict]:
+        """Train ML models for each symbol; returns (models, calibrators) for swap_models"""
+        models, calibrators = {}, {}
+        fold_metric_rows = []
+        version = datetime.now().strftime("%Y%m%d_%H%M%S")
         
         for symbol, data in all_data.items():
-            try:
+            trained = self.train_symbol_model(symbol, data, version)
+            if trained is not None:
+                models[symbol], calibrators[symbol], rows = trained
+                fold_metric_rows += rows
+        
+        # Store fold-level metrics in one bulk write
+        store_fold_metrics(self.db, fold_metric_rows)
+        
+        return models, calibrators
+    
+    def train_symbol_model(self, symbol: str, data: pd.DataFrame, version: str) -> Optional[Tuple[RandomForestClassifier, object, List]]:
+        """Validate, fit, calibrate and save one symbol's model; returns (model, calibrator, fold metric rows)"""
+        try:
+            df = self.calculate_features(data)
+            
+            if len(df) < 100:  # Need sufficient data
+                self.logger.warning(f"Insufficient data for {symbol}")
+                return None
+            
+            # Prepare features
+            X = df[FEATURE_COLS].fillna(0)
+            y = df['target'].fillna(0)
+            
+            # Walk-forward validation, then train on all data
+            model = RandomForestClassifier(n_estimators=100, random_state=42)
+            result = self.validator.validate(model, X, y, name=symbol)
+            accuracy = result['mean_accuracy']
+            
+            model.fit(X, y)
+            calibrator = fit_calibrator(result['oof_pred'], y)
+            
+            # Save model
+            model_path = Path(f"models/{symbol}_model.pkl")
+            import joblib
+            joblib.dump(model, model_path)
+            
+            # Log performance
+            self.logger.info(f"🤖 Trained model for {symbol}: {accuracy:.3f} accuracy")
+            
+            # Store performance metrics
+            self.db.execute('''
+                INSERT INTO model_performance (timestamp, symbol, model_type, accuracy, precision, recall, f1_score)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                datetime.now().isoformat(),
+                symbol,
+                'RandomForest',
+                accuracy,
+                0, 0, 0  # Placeholder for other metrics
+            ))
+            
+            return model, calibrator, fold_rows(symbol, 'RandomForest', version, result)
+            
+        except Exception as e:
+            self.logger.error(f"❌ Error training model for {symbol}: {e}")
+            return None
+    
+    def train_global_model(self, all_data: Dict[str, pd.DataFrame]) -> Tuple[Dict, Dict]:
+        """Train one cross-symbol model and expose it through per-symbol views; returns (models, calibrators)"""
+        from global_model import GlobalModel
+        
+        # Per-symbol calibration tables belong to the per-symbol models: the global views have none
+        try:
+            frames = {}
+            for symbol, data in all_data.items():
                 df = self.calculate_features(data)
-                
                 if len(df) < 100:  # Need sufficient data
                     self.logger.warning(f"Insufficient data for {symbol}")
                     continue
-                
-                # Prepare features
-                feature_cols = ['sma_5', 'sma_20', 'sma_50', 'sma_200', 'volatility_5', 'volatility_20', 'rsi', 'macd', 'macd_signal']
-                X = df[feature_cols].fillna(0)
-                y = df['target'].fillna(0)
-                
-                # Split data
-                X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-                
-                # Train model
-                model = RandomForestClassifier(n_estimators=100, random_state=42)
-                model.fit(X_train, y_train)
-                
-                # Evaluate
-                y_pred = model.predict(X_test)
-                accuracy = accuracy_score(y_test, y_pred)
-                
-                models[symbol] = model
-                
-                # Save model
-                model_path = Path(f"models/{symbol}_model.pkl")
-                import joblib
-                joblib.dump(model, model_path)
-                
-                # Log performance
-                self.logger.info(f"🤖 Trained model for {symbol}: {accuracy:.3f} accuracy")
-                
-                # Store performance metrics
-                with sqlite3.connect(self.db_path) as conn:
-                    conn.execute('''
-                        INSERT INTO model_performance (timestamp, symbol, model_type, accuracy, precision, recall, f1_score)
-                        VALUES (?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        datetime.now().isoformat(),
-                        symbol,
-                        'RandomForest',
-                        accuracy,
-                        0, 0, 0  # Placeholder for other metrics
-                    ))
-                
-            except Exception as e:
-                self.logger.error(f"❌ Error training model for {symbol}: {e}")
-        
-        return models
+                df = df.copy()
+                df[FEATURE_COLS] = df[FEATURE_COLS].fillna(0)
+                frames[symbol] = df
+            
+            if not frames:
+                return {}, {}
+            
+            global_model = GlobalModel(FEATURE_COLS).fit(frames, target_col='target')
+            global_model.save()
+            
+            self.db.execute('''
+                INSERT INTO model_performance (timestamp, symbol, model_type, accuracy, precision, recall, f1_score)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                datetime.now().isoformat(),
+                'GLOBAL',
+                'GlobalLightGBM',
+                global_model.metrics.get('accuracy', 0),
+                0, 0, 0  # Placeholder for other metrics
+            ))
+            
+            self.logger.info(f"🌐 Trained global model for {len(frames)} symbols: {global_model.metrics.get('accuracy', 0):.3f} accuracy")
+            return {symbol: global_model.for_symbol(symbol) for symbol in frames}, {}
+            
+        except Exception as e:
+            self.logger.error(f"❌ Error training global model: {e}")
+            return {}, {}
+    
+    def current_models(self) -> Tuple[Dict, Dict]:
+        """(models, calibrators) of the same training run"""
+        with self._model_lock:
+            return self.models, self.calibrators
     
-    def generate_signals(self, all_data: Dict[str, pd.DataFrame], models: Dict[str, RandomForestClassifier]) -> Dict[str, Dict]:
+    def swap_models(self, models: Dict, calibrators: Dict, merge: bool = False):
+        """Publish models with their calibrators in one step (merge keeps the symbols not retrained)"""
+        with self._model_lock:
+            if merge:
+                models = {**self.models, **models}
+                calibrators = {**self.calibrators, **calibrators}
+            self.models, self.calibrators = models, calibrators
+    
+    def generate_signals(self, all_data: Dict[str, pd.DataFrame], models: Dict[str, RandomForestClassifier],
+                         calibrators: Dict) -> Dict[str, Dict]:
         """Generate trading signals for all symbols"""
         signals = {}
         
-        for symbol, data in all_data.items():
+        # Latest feature row of every symbol, scored in one pass per model
+        latest_rows = {}
+        with self.tracer.stage("features"):
+            for symbol, data in all_data.items():
+                try:
+                    if symbol not in models:
+                        continue
+                    
+                    df = self.calculate_features(data)
+                    if df.empty:
+                        continue
+                    
+                    latest_rows[symbol] = df.iloc[-1]
+                    
+                except Exception as e:
+                    self.logger.error(f"❌ Error preparing features for {symbol}: {e}")
+        
+        if not latest_rows:
+            return signals
+        
+        latest_table = pd.DataFrame.from_dict(latest_rows, orient='index')
+        latest_table[FEATURE_COLS] = latest_table[FEATURE_COLS].astype(float).fillna(0)
+        with self.tracer.stage("predict"):
+            predictions = predict_batch(latest_table[FEATURE_COLS], models)
+            predictions = calibrate_signals(predictions, calibrators)
+        
+        for symbol, scored in predictions.iterrows():
             try:
-                if symbol not in models:
-                    continue
-                
-                df = self.calculate_features(data)
-                if df.empty:
-                    continue
-                
-                # Get latest features
-                latest = df.iloc[-1]
-                feature_cols = ['sma_5', 'sma_20', 'sma_50', 'sma_200', 'volatility_5', 'volatility_20', 'rsi', 'macd', 'macd_signal']
-                features = latest[feature_cols].fillna(0).values.reshape(1, -1)
-                
-                # Get prediction
-                model = models[symbol]
-                prediction = model.predict(features)[0]
-                confidence = model.predict_proba(features)[0].max()
+                latest = latest_table.loc[symbol]
+                prediction = scored['prediction']
+                confidence = scored['confidence']
                 
                 # Technical analysis
                 current_price = latest['Close']
@@ -421,24 +566,24 @@ class MasterOrchestrator:
                 
                 if trade_executed:
                     # Update tracking
-                    self.last_trade_time[symbol] = datetime.now()
-                    self.total_trades += 1
+                    with self._trade_lock:
+                        self.last_trade_time[symbol] = datetime.now()
+                        self.total_trades += 1
                     
                     # Store trade in database
-                    with sqlite3.connect(self.db_path) as conn:
-                        conn.execute('''
-                            INSERT INTO trades (timestamp, symbol, action, price, quantity, portfolio_value, pnl, model_confidence)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                        ''', (
-                            datetime.now().isoformat(),
-                            symbol,
-                            signal['action'],
-                            current_price,
-                            quantity,
-                            self.portfolio_value,
-                            0,  # PnL calculated later
-                            signal['confidence']
-                        ))
+                    self.db.execute('''
+                        INSERT INTO trades (timestamp, symbol, action, price, quantity, portfolio_value, pnl, model_confidence)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ''', (
+                        datetime.now().isoformat(),
+                        symbol,
+                        signal['action'],
+                        current_price,
+                        quantity,
+                        self.portfolio_value,
+                        0,  # PnL calculated later
+                        signal['confidence']
+                    ))
                     
                     self.logger.info(f"✅ Executed {signal['action']} for {quantity} shares of {symbol} at ${current_price:.2f}")
                 
@@ -453,11 +598,7 @@ class MasterOrchestrator:
     def _execute_alpaca_trade(self, symbol: str, signal: Dict, quantity: int) -> bool:
         """Execute trade via Alpaca API"""
         try:
-            api = tradeapi.REST(
-                self.brokerages['alpaca']['api_key'],
-                self.brokerages['alpaca']['secret_key'],
-                self.brokerages['alpaca']['base_url']
-            )
+            api = self.alpaca_api()
             
             # Convert symbol format for Alpaca
             alpaca_symbol = symbol.replace('-USD', '') if '-USD' in symbol else symbol
@@ -500,18 +641,8 @@ class MasterOrchestrator:
                 'confidence': signal['confidence']
             }
             
-            # Save to manual trades file
-            manual_trades_file = Path("signals/manual_trades.json")
-            trades = []
-            
-            if manual_trades_file.exists():
-                with open(manual_trades_file, 'r') as f:
-                    trades = json.load(f)
-            
-            trades.append(trade_instruction)
-            
-            with open(manual_trades_file, 'w') as f:
-                json.dump(trades, f, indent=2)
+            # Append to the signal bus
+            self.signal_bus.append(trade_instruction)
             
             self.logger.info(f"📝 Manual trade instruction saved for {symbol}")
             return True
@@ -524,11 +655,7 @@ class MasterOrchestrator:
         """Update portfolio value based on current positions"""
         try:
             if self.brokerages['alpaca']['enabled']:
-                api = tradeapi.REST(
-                    self.brokerages['alpaca']['api_key'],
-                    self.brokerages['alpaca']['secret_key'],
-                    self.brokerages['alpaca']['base_url']
-                )
+                api = self.alpaca_api()
                 
                 account = api.get_account()
                 self.portfolio_value = float(account.portfolio_value)
@@ -550,6 +677,7 @@ class MasterOrchestrator:
     def generate_daily_report(self):
         """Generate daily performance report"""
         try:
+            self.db.flush()  # today's trades may still be queued
             with sqlite3.connect(self.db_path) as conn:
                 # Get today's trades
                 today = datetime.now().date()
@@ -571,7 +699,8 @@ class MasterOrchestrator:
                     'win_rate': win_rate,
                     'daily_pnl': self.daily_pnl,
                     'positions': self.positions,
-                    'system_health': self.check_system_health()
+                    'system_health': self.check_system_health(),
+                    'latency': self.tracer.daily_report()
                 }
                 
                 # Save report
@@ -591,6 +720,9 @@ class MasterOrchestrator:
                 print(f"🎯 Win Rate: {win_rate:.1%}")
                 print(f"💵 Daily P&L: ${self.daily_pnl:,.2f}")
                 print(f"🏠 Active Positions: {len(self.positions)}")
+                for regression in report['latency']['regressions']:
+                    print(f"🐢 {regression['stage']} p95 {regression['p95_ms']:.0f} ms "
+                          f"(was {regression['baseline_p95_ms']:.0f} ms)")
                 
         except Exception as e:
             self.logger.error(f"❌ Error generating daily report: {e}")
@@ -598,38 +730,169 @@ class MasterOrchestrator:
     def run_cycle(self):
         """Run one complete trading cycle"""
         try:
-            self.logger.info("🔄 Starting trading cycle...")
-            
-            # 1. Check system health
+            with self.tracer.cycle():
+                self._run_cycle_stages()
+        except Exception as e:
+            self.logger.error(f"❌ Error in trading cycle: {e}")
+    
+    def _run_cycle_stages(self):
+        self.logger.info("🔄 Starting trading cycle...")
+        
+        # 1. Check system health
+        with self.tracer.stage("health_check"):
             health = self.check_system_health()
-            if not health.get('data_collection', False):
-                self.logger.error("❌ System health check failed - skipping cycle")
-                return
-            
-            # 2. Update portfolio
+        self.heartbeat.beat(data_collection=health.get('data_collection', False))
+        if not health.get('data_collection', False):
+            self.logger.error("❌ System health check failed - skipping cycle")
+            return
+        
+        # 2. Update portfolio
+        with self.tracer.stage("portfolio"):
             self.update_portfolio_value()
-            
+        
+        if self.training_mode != 'global' and self.async_cycle:
+            # 3-6. Fetch, train, signal and trade each symbol as soon as its previous stage is done
+            with self.tracer.stage("pipeline"):
+                execution_results = self._run_cycle_pipeline()
+        else:
             # 3. Collect market data
-            all_data = self.collect_market_data()
+            with self.tracer.stage("market_data"):
+                all_data = self.collect_market_data()
             if not all_data:
                 self.logger.error("❌ No market data collected - skipping cycle")
                 return
             
-            # 4. Train/update models
-            self.models = self.train_models(all_data)
+            # 4. Train models (only for symbols the background retrain has not covered yet,
+            #    e.g. equities opening after a start on a weekend)
+            missing = {symbol: data for symbol, data in all_data.items() if symbol not in self.current_models()[0]}
+            if missing:
+                with self.tracer.stage("train"):
+                    if self.training_mode == 'global':
+                        self.swap_models(*self.train_global_model(all_data))
+                    else:
+                        self.swap_models(*self.train_models(missing), merge=True)
             
             # 5. Generate signals
-            signals = self.generate_signals(all_data, self.models)
+            with self.tracer.stage("signals"):
+                signals = self.generate_signals(all_data, *self.current_models())
             
             # 6. Execute trades
-            execution_results = self.execute_trades(signals)
-            
-            # 7. Log results
-            successful_trades = sum(1 for result in execution_results.values() if result)
-            self.logger.info(f"✅ Trading cycle complete: {successful_trades}/{len(execution_results)} trades executed")
-            
-        except Exception as e:
-            self.logger.error(f"❌ Error in trading cycle: {e}")
+            with self.tracer.stage("orders"):
+                execution_results = self.execute_trades(signals)
+        
+        # 7. Log results
+        successful_trades = sum(1 for result in execution_results.values() if result)
+        self.logger.info(f"✅ Trading cycle complete: {successful_trades}/{len(execution_results)} trades executed")
+    
+    def _run_cycle_pipeline(self) -> Dict[str, bool]:
+        """Per-symbol cycle on async_cycle.AsyncPipeline: downloads and broker calls overlap model fits"""
+        version = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # One training run's models and calibrators for the whole cycle, even if a retrain swaps them midway
+        current_models, current_calibrators = self.current_models()
+        models, calibrators, fold_metric_rows = {}, {}, []
+        
+        def train(symbol, data):
+            # Symbols with a model use it; only new symbols are fitted in the cycle
+            if symbol in current_models:
+                return data, current_models[symbol], current_calibrators.get(symbol)
+            trained = self.train_symbol_model(symbol, data, version)
+            if trained is None:
+                return None
+            models[symbol], calibrators[symbol], rows = trained
+            fold_metric_rows.extend(rows)
+            return data, models[symbol], calibrators[symbol]
+        
+        def signal(symbol, trained):
+            data, model, calibrator = trained
+            return self.generate_signals({symbol: data}, {symbol: model}, {symbol: calibrator}).get(symbol)
+        
+        def order(symbol, signal):
+            return self.execute_trades({symbol: signal})
+        
+        pipeline = AsyncPipeline([
+            Stage("market_data", lambda symbol, _: self.collect_symbol_data(symbol), "io", self.io_concurrency),
+            Stage("train", train, "cpu"),
+            Stage("signals", signal, "cpu"),
+            Stage("orders", order, "io", self.io_concurrency)
+        ], tracer=self.tracer)
+        outcome = pipeline.run_sync(self.open_symbols())
+        
+        if models:
+            self.swap_models(models, calibrators, merge=True)
+            store_fold_metrics(self.db, fold_metric_rows)
+        
+        execution_results = {}
+        for result in outcome['results'].values():
+            execution_results.update(result)
+        for symbol in outcome['errors']:
+            execution_results[symbol] = False
+        return execution_results
+    
+    def retrain_models(self):
+        """Background lane: refit every model on the bars the signal cycles keep fresh, then swap them in"""
+        all_data = dict(self.bars)
+        if not all_data:
+            return
+        self.logger.info(f"🤖 Retraining {len(all_data)} models in the background...")
+        if self.training_mode == 'global':
+            models, calibrators = self.train_global_model(all_data)
+        else:
+            models, calibrators = self.train_models(all_data)
+        # Models and their calibration tables go live together, once every symbol is done
+        if models:
+            self.swap_models(models, calibrators)
+    
+    def checkpoint_state(self) -> Dict:
+        """In-memory state worth keeping across a restart (copied: background retraining mutates it)"""
+        models, calibrators = self.current_models()
+        return {
+            'training_mode': self.training_mode,
+            'models': dict(models),
+            'calibrators': dict(calibrators),
+            'bars': dict(self.bars),
+            'last_trade_time': dict(self.last_trade_time),
+            'positions': dict(self.positions),
+            'portfolio_value': self.portfolio_value,
+            'cycle_count': self.cycle_count,
+            'daily_pnl': self.daily_pnl,
+            'total_trades': self.total_trades,
+            'winning_trades': self.winning_trades
+        }
+    
+    def restore_state(self) -> bool:
+        """Adopt the latest checkpoint; True when models and bars came back"""
+        state = self.checkpoint.restore()
+        if state is None:
+            return False
+        self.bars = state['bars']
+        self.last_trade_time = state['last_trade_time']
+        self.positions = state['positions']
+        self.portfolio_value = state['portfolio_value']
+        self.cycle_count = state['cycle_count']
+        self.daily_pnl = state['daily_pnl']
+        self.total_trades = state['total_trades']
+        self.winning_trades = state['winning_trades']
+        # Models of the other training mode are not used; the first scheduled cycle retrains
+        if state['training_mode'] == self.training_mode:
+            self.swap_models(state['models'], state['calibrators'])
+        return bool(self.models and self.bars)
+    
+    def resume_cycle(self):
+        """First cycle after a restore: refresh bars, signal with the restored models, no retraining"""
+        self.logger.info(f"♻️ Resuming with {len(self.models)} restored models")
+        with self.heartbeat.cycle(), self.tracer.cycle():
+            try:
+                with self.tracer.stage("market_data"):
+                    all_data = self.collect_market_data()
+                with self.tracer.stage("signals"):
+                    signals = self.generate_signals(all_data, *self.current_models())
+                # Restored cooldowns keep a restart from repeating the trades made just before it
+                with self.tracer.stage("orders"):
+                    execution_results = self.execute_trades(signals)
+                successful_trades = sum(1 for result in execution_results.values() if result)
+                self.logger.info(f"✅ Resume cycle complete: {successful_trades}/{len(execution_results)} trades executed")
+            except Exception as e:
+                self.logger.error(f"❌ Error in resume cycle: {e}")
     
     def run(self):
         """Main execution loop"""
@@ -637,31 +900,26 @@ class MasterOrchestrator:
         self.is_running = True
         
         # Initial setup
+        restored = self.restore_state()
+        self.heartbeat.start()
         self.update_portfolio_value()
         
-        cycle_count = 0
+        # 5-minute bar closes while equities trade (stretched to whole bars when a cycle takes longer),
+        # hourly crypto bars otherwise; retraining and the daily report run in the background lane
+        self.scheduler.every(5, self.scheduled_cycle, assets=('equity',), adaptive=True)
+        self.scheduler.every(60, self.scheduled_cycle, assets=('crypto',))
+        self.scheduler.every(self.retrain_minutes, self.retrain_models, assets=('equity', 'crypto'), lane='background')
+        self.scheduler.at_close(self.generate_daily_report, 'equity', lane='background')
+        
+        if restored:
+            self.resume_cycle()
+        else:
+            self.scheduled_cycle()
         while self.is_running:
             try:
-                cycle_count += 1
-                self.logger.info(f"🔄 Starting cycle #{cycle_count}")
-                
-                # Run trading cycle
-                self.run_cycle()
-                
-                # Generate daily report at end of day
-                if datetime.now().hour == 16 and datetime.now().minute < 5:  # 4 PM
-                    self.generate_daily_report()
-                
-                # Wait before next cycle (5 minutes during market hours, 1 hour after hours)
-                current_hour = datetime.now().hour
-                if 9 <= current_hour <= 16:  # Market hours
-                    sleep_time = 300  # 5 minutes
-                else:
-                    sleep_time = 3600  # 1 hour
-                
-                self.logger.info(f"😴 Sleeping for {sleep_time//60} minutes...")
-                time.sleep(sleep_time)
-                
+                # Sleeps until the next event; job errors are logged and the loop carries on
+                self.scheduler.run_forever(should_stop=lambda: not self.is_running)
+                break
             except KeyboardInterrupt:
                 self.logger.info("🛑 Master Orchestrator stopped by user")
                 break
@@ -669,7 +927,20 @@ class MasterOrchestrator:
                 self.logger.error(f"❌ Critical error in main loop: {e}")
                 time.sleep(60)  # Wait 1 minute before retrying
         
+        try:
+            self.checkpoint.save(self.checkpoint_state())
+        except Exception as e:
+            self.logger.error(f"❌ Final checkpoint failed: {e}")
         self.logger.info("🏁 Master Orchestrator shutdown complete")
+    
+    def scheduled_cycle(self):
+        """One trading cycle fired by the scheduler"""
+        self.cycle_count += 1
+        self.logger.info(f"🔄 Starting cycle #{self.cycle_count}")
+        with self.heartbeat.cycle():
+            self.run_cycle()
+        self.heartbeat.beat(schedule=self.scheduler.stats())
+        self.checkpoint.save_if_due(self.checkpoint_state)
 
 def main():
     """Main entry point"""
@@ -684,6 +955,8 @@ def main():
     print("=" * 60)
     
     orchestrator = MasterOrchestrator()
+    # supervisor.py and systemd stop it with SIGTERM: unwind like Ctrl-C so the final checkpoint is written
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
     
     try:
         orchestrator.run()
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Model Registry - Versioned models with a promoted pointer and an in-process cache
+- JSON manifest of versions, metrics and feature specs per model name
+- A promoted pointer per name; promotion is an atomic manifest rewrite
+- Every manifest read-modify-write holds an exclusive file lock, so registry instances in other processes
+  (or in the same one, like the shadow scorer's) never lose each other's registrations or promotions
+- Each promoted model is loaded once per process and reloaded only when the pointer moves
+- Pointer changes are detected with a single stat() of the manifest
+- Compiled tree artifacts (tree_compiler.py) are preferred when present
+- Models are stored compressed and content-addressed; old versions are pruned by a retention policy
+- Each stored model also gets a NumPy-only portable file, checked before the version is promoted
+"""
+
+import argparse
+import copy
+import fcntl
+import json
+import logging
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import joblib
+
+from artifact_store import ArtifactStore, RetentionPolicy, entry_files
+
+MANIFEST_NAME = "registry.json"
+LOCK_NAME = "registry.lock"
+
+
+class ModelRegistry:
+    """Manifest-backed model registry with hot reload on promotion"""
+
+    def __init__(self, root: str = "models", retention: Optional[RetentionPolicy] = None):
+        self.logger = logging.getLogger(__name__)
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.manifest_path = self.root / MANIFEST_NAME
+        self._lock_path = self.root / LOCK_NAME
+        self._thread_lock = threading.RLock()
+        self.store = ArtifactStore(self.root)
+        self.retention = retention or RetentionPolicy()
+
+        self._manifest = {'promoted': {}, 'models': {}}
+        self._manifest_stamp = None
+        self._cache = {}  # name -> (version, model)
+
+    def _stamp(self):
+        # Every write is an os.replace, so the inode changes even where mtime is coarse
+        st = self.manifest_path.stat()
+        return st.st_mtime_ns, st.st_ino
+
+    @contextmanager
+    def _locked(self):
+        """Exclusive across threads and processes, from the manifest re-read to its os.replace"""
+        with self._thread_lock, open(self._lock_path, 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _refresh(self) -> Dict:
+        """Re-read the manifest only if it changed on disk"""
+        try:
+            stamp = self._stamp()
+        except FileNotFoundError:
+            return self._manifest
+        if stamp != self._manifest_stamp:
+            with open(self.manifest_path, 'r') as f:
+                self._manifest = json.load(f)
+            self._manifest_stamp = stamp
+        return self._manifest
+
+    def _write(self, manifest: Dict):
+        """Atomically replace the manifest so readers never see a partial file"""
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".registry", suffix=".json")
+        with os.fdopen(fd, 'w') as f:
+            json.dump(manifest, f, indent=2, default=str)
+        os.replace(tmp, self.manifest_path)
+        self._manifest = manifest
+        self._manifest_stamp = self._stamp()
+
+    def register(self, name: str, model=None, path: Optional[str] = None, version: Optional[str] = None,
+                 metrics: Optional[Dict] = None, features: Optional[List[str]] = None,
+                 promote: bool = False, calibration: Optional[Dict] = None, probe=None) -> str:
+        """Record a model version (saving the model object if given) and optionally promote it"""
+        version = version or datetime.now().strftime("%Y%m%d_%H%M%S")
+        if model is not None:
+            stored = self.store.put(model)
+            portable_path = self._export_portable(model, stored['path'], probe)
+            if portable_path:
+                stored['portable_path'] = portable_path
+        elif path is not None:
+            path = Path(path)
+            try:
+                stored = {'path': str(path.resolve().relative_to(self.root.resolve()))}
+            except ValueError:
+                stored = {'path': str(path.resolve())}
+        else:
+            raise ValueError("register() needs a model or a path")
+
+        with self._locked():
+            manifest = self._refresh()
+            manifest.setdefault('models', {}).setdefault(name, {})[version] = {
+                **stored,
+                'created': datetime.now().isoformat(),
+                'metrics': metrics or {},
+                'features': features
+            }
+            if calibration:
+                # Lookup table from calibration.py; applied to this version's probabilities at inference
+                manifest['models'][name][version]['calibration'] = calibration
+            if promote:
+                self.check_portable(manifest['models'][name][version])
+                manifest.setdefault('promoted', {})[name] = version
+            self._write(manifest)
+
+        if model is not None and promote:
+            self._cache[name] = (version, model)
+        self.logger.info(f"📦 Registered {name} {version}{' (promoted)' if promote else ''}")
+        self.apply_retention([name])
+        return version
+
+    def apply_retention(self, names: Optional[List[str]] = None, dry_run: bool = False) -> Dict:
+        """Drop versions the retention policy does not keep and delete files nothing references"""
+        with self._locked():
+            return self._apply_retention(names, dry_run)
+
+    def _apply_retention(self, names: Optional[List[str]], dry_run: bool) -> Dict:
+        manifest = copy.deepcopy(self._refresh())
+        models = manifest.get('models', {})
+        removed, candidates = {}, set()
+        for name in names or list(models):
+            versions = models.get(name, {})
+            keep = self.retention.keep(versions, manifest.get('promoted', {}).get(name))
+            dropped = [v for v in versions if v not in keep]
+            for version in dropped:
+                candidates.update(entry_files(versions.pop(version)))
+            if dropped:
+                removed[name] = dropped
+
+        referenced = {f for versions in models.values() for entry in versions.values() for f in entry_files(entry)}
+        if removed and not dry_run:
+            self._write(manifest)
+
+        # Store blobs may be shared between versions; files registered by path are only removed inside root
+        reclaimed = self.store.gc(referenced, dry_run=dry_run)
+        for rel in candidates - referenced:
+            path = self.root / rel
+            is_blob = path.parent == self.store.store_dir and path.suffix == '.joblib'
+            if not Path(rel).is_absolute() and path.exists() and not is_blob:
+                reclaimed += path.stat().st_size
+                if not dry_run:
+                    path.unlink()
+
+        if removed and not dry_run:
+            self.logger.info(f"🗑️ Retention removed {sum(map(len, removed.values()))} version(s), "
+                             f"reclaimed {reclaimed / 1e6:.1f} MB")
+        return {'removed': removed, 'bytes_reclaimed': reclaimed, 'manifest': manifest}
+
+    def _export_portable(self, model, stored_path: str, probe=None) -> Optional[str]:
+        """Portable file next to the stored blob (shared, like the blob, by identical models)"""
+        from portable_model import export_portable
+        portable = Path(stored_path).with_suffix('.portable.npz')
+        if (self.root / portable).exists():
+            return str(portable)
+        try:
+            return str(portable) if export_portable(model, self.root / portable, probe) else None
+        except ValueError as e:
+            self.logger.warning(f"⚠️ Portable export failed: {e}")
+            return None
+
+    def add_portable(self, name: str, version: str, probe=None) -> Optional[str]:
+        """Backfill the portable file of an already registered version"""
+        entry = self.versions(name)[version]
+        portable_path = self._export_portable(joblib.load(self.model_path(entry)), entry['path'], probe)
+        if portable_path:
+            self.annotate(name, version, portable_path=portable_path)
+        return portable_path
+
+    def check_portable(self, entry: Dict):
+        """Compatibility check at promotion: the portable file must load with NumPy and reproduce its probe"""
+        if not entry.get('portable_path'):
+            return
+        from portable_model import PortableModel
+        PortableModel.load(self.model_path({'path': entry['portable_path']})).check()
+
+    def promote(self, name: str, version: str):
+        """Point name at an existing version"""
+        with self._locked():
+            manifest = self._refresh()
+            if version not in manifest.get('models', {}).get(name, {}):
+                raise KeyError(f"{name} has no version {version}")
+            self.check_portable(manifest['models'][name][version])
+            manifest.setdefault('promoted', {})[name] = version
+            self._write(manifest)
+        self.logger.info(f"🚀 Promoted {name} {version}")
+
+    def annotate(self, name: str, version: str, **fields):
+        """Attach extra fields (e.g. a compiled artifact) to a registered version"""
+        with self._locked():
+            manifest = self._refresh()
+            manifest['models'][name][version].update(fields)
+            self._write(manifest)
+        # Let the next load() pick up the annotated artifact
+        if self._cache.get(name, (None,))[0] == version:
+            del self._cache[name]
+
+    def manifest(self) -> Dict:
+        return self._refresh()
+
+    def versions(self, name: str) -> Dict[str, Dict]:
+        return self._refresh().get('models', {}).get(name, {})
+
+    def promoted(self, name: str) -> Optional[Dict]:
+        """Manifest entry of the promoted version (with its version id), if any"""
+        manifest = self._refresh()
+        version = manifest.get('promoted', {}).get(name)
+        if version is None:
+            return None
+        return {'version': version, **manifest['models'][name][version]}
+
+    def model_path(self, entry: Dict) -> Path:
+        path = Path(entry['path'])
+        return path if path.is_absolute() else self.root / path
+
+    def load(self, name: str):
+        """Promoted model for name; loaded from disk only when the promoted version changes"""
+        entry = self.promoted(name)
+        if entry is None:
+            return None
+
+        cached = self._cache.get(name)
+        if cached and cached[0] == entry['version']:
+            return cached[1]
+
+        model = self._load_entry(entry)
+        self._cache[name] = (entry['version'], model)
+        self.logger.info(f"🔄 Loaded {name} {entry['version']}")
+        return model
+
+    def load_version(self, name: str, version: str):
+        """Any registered version (uncached), e.g. a candidate that is not promoted"""
+        return self._load_entry(self.versions(name)[version])
+
+    def _load_entry(self, entry: Dict):
+        portable = entry.get('portable_path')
+        if portable and self.model_path({'path': portable}).exists():
+            # Header + arrays; the training libraries are never imported
+            from portable_model import PortableModel
+            return PortableModel.load(self.model_path({'path': portable}))
+        compiled = entry.get('compiled_path')
+        if compiled and self.model_path({'path': compiled}).exists():
+            # Flat-array version of a tree model: same predictions, no library dispatch
+            from tree_compiler import CompiledTrees
+            return CompiledTrees.load(self.model_path({'path': compiled}))
+        return joblib.load(self.model_path(entry))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect and promote registered models")
+    parser.add_argument('--root', default="models")
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('list')
+    promote = sub.add_parser('promote')
+    promote.add_argument('name')
+    promote.add_argument('version')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    registry = ModelRegistry(args.root)
+    if args.command == 'promote':
+        registry.promote(args.name, args.version)
+    else:
+        manifest = registry.manifest()
+        for name, versions in manifest.get('models', {}).items():
+            for version, entry in versions.items():
+                marker = '*' if manifest.get('promoted', {}).get(name) == version else ' '
+                print(f"{marker} {name:<24} {version:<20} {entry['metrics']}")
+
+
+if __name__ == "__main__":
+    main()
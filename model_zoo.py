@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Model Zoo Scheduler - Time-budgeted model selection for the learning cycle
+- Predicts fit time and peak memory per estimator from past runs; memory is the peak RSS of this process
+  and its fold workers, so native (LightGBM/XGBoost) and loky allocations count
+- Skips or subsamples candidates predicted to exceed their budget
+- Skips candidates that past runs show are both slower and worse than another
+- Swaps in histogram-based boosters at large sample sizes
+- Keeps each learning cycle inside a configured wall-clock limit
+"""
+
+import json
+import logging
+import os
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Prior cost model used until an estimator has history:
+# (seconds for 1,000 rows x 50 features, exponent on row count, MB per 1,000 rows x 50 features)
+PRIORS = {
+    'rf': (0.6, 1.1, 40.0),
+    'xgb': (0.3, 1.0, 10.0),
+    'lgb': (0.2, 1.0, 10.0),
+    'hgb': (0.3, 1.0, 10.0),
+    'gb': (2.0, 1.0, 5.0),
+    'lr': (0.05, 1.0, 2.0),
+    'svm': (2.5, 2.0, 30.0),  # includes the internal 5-fold Platt calibration
+    'mlp': (3.0, 1.0, 5.0),
+}
+DEFAULT_PRIOR = (1.0, 1.0, 10.0)
+RSS_SAMPLE_SECONDS = 0.05
+# ru_maxrss is reported in bytes on macOS and kilobytes on Linux
+RSS_UNIT = 1 if sys.platform == 'darwin' else 1024
+
+
+def process_tree_rss() -> Optional[int]:
+    """Current RSS in bytes of this process and all its descendants (None where /proc is unavailable)"""
+    proc = Path("/proc")
+    if not (proc / "self" / "statm").exists():
+        return None
+    parents = {}
+    for stat in proc.glob("[0-9]*/stat"):
+        try:
+            # "pid (comm) state ppid ..." - comm may contain spaces and parentheses
+            fields = stat.read_text().rsplit(')', 1)[1].split()
+            parents[int(stat.parent.name)] = int(fields[1])
+        except (OSError, IndexError, ValueError):
+            continue
+    tree, frontier = set(), {os.getpid()}
+    while frontier:
+        tree |= frontier
+        frontier = {pid for pid, ppid in parents.items() if ppid in frontier} - tree
+
+    page = os.sysconf('SC_PAGE_SIZE')
+    total = 0
+    for pid in tree:
+        try:
+            total += int((proc / str(pid) / "statm").read_text().split()[1]) * page
+        except (OSError, IndexError, ValueError):
+            continue
+    return total
+
+
+def _peak_rss_bytes() -> int:
+    """High-water RSS of this process plus its largest finished child (benchmark_training.py's measure)"""
+    return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            + resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss) * RSS_UNIT
+
+
+class _RssSampler:
+    """Peak process-tree RSS above the level at start, sampled on a background thread"""
+
+    def __init__(self, interval: float = RSS_SAMPLE_SECONDS):
+        self.interval = interval
+        self.baseline = process_tree_rss()
+        self.peak = self.baseline
+        self._peak_before = _peak_rss_bytes()
+        self._done = threading.Event()
+        self._thread = None
+        if self.baseline is not None:
+            self._thread = threading.Thread(target=self._run, name="model-zoo-rss", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._done.wait(self.interval):
+            self._sample()
+
+    def _sample(self):
+        rss = process_tree_rss()
+        if rss is not None:
+            self.peak = max(self.peak, rss)
+
+    def stop(self) -> float:
+        """Peak MB above the starting level"""
+        if self._thread is None:
+            # No /proc: fall back to the high-water marks, which only move when this run sets a new peak
+            return max(0, _peak_rss_bytes() - self._peak_before) / 1e6
+        self._done.set()
+        self._thread.join()
+        self._sample()
+        return max(0, self.peak - self.baseline) / 1e6
+
+
+class ModelZooScheduler:
+    """Plans which estimators to train, on how many rows, within time and memory budgets"""
+
+    def __init__(self, history_path: str = "data/model_zoo_history.json",
+                 cycle_budget_seconds: float = 1800, estimator_budget_seconds: float = 300,
+                 estimator_budget_mb: float = 2048, large_sample_threshold: int = 50000,
+                 min_subsample: int = 500, max_history: int = 50):
+        self.logger = logging.getLogger(__name__)
+        self.history_path = Path(history_path)
+        self.cycle_budget_seconds = cycle_budget_seconds
+        self.estimator_budget_seconds = estimator_budget_seconds
+        self.estimator_budget_mb = estimator_budget_mb
+        self.large_sample_threshold = large_sample_threshold
+        self.min_subsample = min_subsample
+        self.max_history = max_history
+
+        self.history = self.load_history()
+        self.cycle_start = time.monotonic()
+
+    def load_history(self) -> Dict[str, List[Dict]]:
+        """Load past run measurements"""
+        if self.history_path.exists():
+            try:
+                with open(self.history_path, 'r') as f:
+                    return json.load(f)
+            except Exception as e:
+                self.logger.warning(f"Could not load model zoo history: {e}")
+        return {}
+
+    def save_history(self):
+        """Persist run measurements"""
+        self.history_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.history_path, 'w') as f:
+            json.dump(self.history, f, indent=2)
+
+    def start_cycle(self, budget_seconds: Optional[float] = None):
+        """Start the wall-clock budget for a learning cycle"""
+        if budget_seconds is not None:
+            self.cycle_budget_seconds = budget_seconds
+        self.cycle_start = time.monotonic()
+
+    def remaining(self) -> float:
+        """Seconds left in the current cycle"""
+        return max(0.0, self.cycle_budget_seconds - (time.monotonic() - self.cycle_start))
+
+    def _scale(self, name: str, n_samples: int, n_features: int) -> Tuple[float, float]:
+        """Row/feature scale factors relative to the 1,000 x 50 reference"""
+        exponent = self._exponent(name)
+        return (n_samples / 1000) ** exponent * (n_features / 50), (n_samples / 1000) * (n_features / 50)
+
+    def _exponent(self, name: str) -> float:
+        """Row-count exponent, fitted on a log-log scale once there is enough history
+        
+        Fitted the way _scale applies it: seconds per 50 features against the row count.
+        """
+        runs = self.history.get(name, [])
+        sizes = np.array([r['n_samples'] for r in runs], dtype=float)
+        seconds = np.array([r['fit_seconds'] / (r['n_features'] / 50) for r in runs], dtype=float)
+        if len(runs) >= 3 and len(np.unique(sizes)) >= 2 and (seconds > 0).all():
+            slope = np.polyfit(np.log(sizes), np.log(seconds), 1)[0]
+            return float(np.clip(slope, 0.5, 3.0))
+        return PRIORS.get(name, DEFAULT_PRIOR)[1]
+
+    def predict_cost(self, name: str, n_samples: int, n_features: int) -> Tuple[float, float]:
+        """Predicted (fit seconds, peak MB) for an estimator at the given data size"""
+        base_seconds, _, base_mb = PRIORS.get(name, DEFAULT_PRIOR)
+        runs = self.history.get(name, [])[-5:]
+        if runs:
+            # Calibrate the unit cost from the most recent observations
+            base_seconds = float(np.median([r['fit_seconds'] / self._scale(name, r['n_samples'], r['n_features'])[0]
+                                            for r in runs]))
+            base_mb = float(np.max([r['peak_mb'] / self._scale(name, r['n_samples'], r['n_features'])[1]
+                                    for r in runs]))
+        time_scale, mem_scale = self._scale(name, n_samples, n_features)
+        return base_seconds * time_scale, base_mb * mem_scale
+
+    def mean_auc(self, name: str) -> Optional[float]:
+        """Average AUC across past runs"""
+        aucs = [r['auc'] for r in self.history.get(name, []) if r.get('auc') is not None]
+        return float(np.mean(aucs)) if len(aucs) >= 3 else None
+
+    def _dominated(self, name: str, costs: Dict[str, float]) -> Optional[str]:
+        """Name of a candidate that is historically both faster and more accurate, if any"""
+        auc = self.mean_auc(name)
+        if auc is None:
+            return None
+        for other, other_cost in costs.items():
+            other_auc = self.mean_auc(other)
+            if other != name and other_auc is not None and other_auc > auc and other_cost < costs[name]:
+                return other
+        return None
+
+    def max_rows_within(self, name: str, n_samples: int, n_features: int, seconds: float, mb: float) -> int:
+        """Largest row count whose predicted cost fits the given budget"""
+        lo, hi = 0, n_samples
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            t, m = self.predict_cost(name, mid, n_features)
+            if t <= seconds and m <= mb:
+                lo = mid
+            else:
+                hi = mid - 1
+        return lo
+
+    def plan(self, candidates: Dict, n_samples: int, n_features: int) -> List[Tuple[str, object, Optional[int]]]:
+        """Return (name, estimator, rows to use or None for all) for the candidates worth training"""
+        candidates = dict(candidates)
+        if n_samples >= self.large_sample_threshold and 'gb' in candidates:
+            from sklearn.ensemble import HistGradientBoostingClassifier
+            candidates.pop('gb')
+            candidates['hgb'] = HistGradientBoostingClassifier(random_state=42)
+            self.logger.info(f"📐 {n_samples} samples: using histogram gradient boosting instead of GradientBoosting")
+
+        costs = {name: self.predict_cost(name, n_samples, n_features)[0] for name in candidates}
+        remaining = self.remaining()
+
+        planned = []
+        for name in sorted(candidates, key=lambda n: costs[n]):
+            dominated_by = self._dominated(name, costs)
+            if dominated_by:
+                self.logger.info(f"⏭️ Skipping {name}: {dominated_by} has been faster and more accurate")
+                continue
+
+            seconds, mb = self.predict_cost(name, n_samples, n_features)
+            budget_seconds = min(self.estimator_budget_seconds, remaining)
+            rows = None
+            if seconds > budget_seconds or mb > self.estimator_budget_mb:
+                rows = self.max_rows_within(name, n_samples, n_features, budget_seconds, self.estimator_budget_mb)
+                if rows < self.min_subsample:
+                    self.logger.info(f"⏭️ Skipping {name}: predicted {seconds:.1f}s / {mb:.0f}MB exceeds budget")
+                    continue
+                self.logger.info(f"✂️ Subsampling {name} to {rows}/{n_samples} rows to fit budget")
+                seconds, mb = self.predict_cost(name, rows, n_features)
+
+            remaining -= seconds
+            planned.append((name, candidates[name], rows))
+        return planned
+
+    @contextmanager
+    def measure(self, name: str, n_samples: int, n_features: int):
+        """Time a training run, track its peak RSS (fold workers included) and record it in the history"""
+        run = {'n_samples': n_samples, 'n_features': n_features, 'auc': None}
+        sampler = _RssSampler()
+        start = time.perf_counter()
+        try:
+            yield run
+        finally:
+            run['fit_seconds'] = time.perf_counter() - start
+            run['peak_mb'] = sampler.stop()
+
+        # Only successful runs feed the cost model
+        runs = self.history.setdefault(name, [])
+        runs.append(run)
+        del runs[:-self.max_history]
+        self.save_history()
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Portable Model - Library-free model files for serving on another machine
+- One .npz per model: a JSON header plus flat arrays, loaded with NumPy alone (no pickle)
+- Tree ensembles (LightGBM, XGBoost, sklearn forests) reuse the tree_compiler node arrays
+- Logistic regression, StandardScaler pipelines and soft-voting ensembles of supported models
+- Each file carries probe rows and the source model's probabilities on them; the check that
+  runs at promotion re-scores the probe from the file and must reproduce those probabilities
+"""
+
+import argparse
+import json
+import logging
+import time
+import warnings
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+from tree_compiler import ARRAY_NAMES, CompiledTrees, compile_model
+
+FORMAT_VERSION = 1
+CHECK_TOLERANCE = 1e-6
+PROBE_ROWS = 64
+
+
+class _Arrays:
+    """Array namespace shared by the components of one file"""
+
+    def __init__(self, arrays: Optional[Dict[str, np.ndarray]] = None):
+        self.arrays = arrays if arrays is not None else {}
+
+    def put(self, prefix: str, name: str, value) -> str:
+        key = f"{prefix}.{name}"
+        self.arrays[key] = np.asarray(value)
+        return key
+
+    def get(self, key: str) -> np.ndarray:
+        return self.arrays[key]
+
+
+def _export(model, prefix: str, arrays: _Arrays) -> Dict:
+    """Header of one component, with its arrays stored under prefix"""
+    kind = type(model).__name__
+
+    if kind == 'Pipeline':
+        *transforms, (_, final) = model.steps
+        scalers = []
+        for i, (_, step) in enumerate(transforms):
+            if type(step).__name__ != 'StandardScaler':
+                raise ValueError(f"Unsupported pipeline step {type(step).__name__}")
+            scalers.append({'mean': arrays.put(f"{prefix}.s{i}", 'mean', step.mean_ if step.with_mean else 0.0),
+                            'scale': arrays.put(f"{prefix}.s{i}", 'scale', step.scale_ if step.with_std else 1.0)})
+        return {'kind': 'pipeline', 'scalers': scalers, 'final': _export(final, f"{prefix}.f", arrays)}
+
+    if kind == 'VotingClassifier':
+        if model.voting != 'soft':
+            raise ValueError("Only soft-voting ensembles have predict_proba")
+        members = [_export(e, f"{prefix}.m{i}", arrays) for i, e in enumerate(model.estimators_)]
+        return {'kind': 'voting', 'members': members,
+                'weights': None if model.weights is None else list(map(float, model.weights))}
+
+    if kind in ('LogisticRegression', 'LogisticRegressionCV'):
+        return {'kind': 'linear', 'multinomial': len(model.classes_) > 2,
+                'coef': arrays.put(prefix, 'coef', model.coef_.astype(np.float64)),
+                'intercept': arrays.put(prefix, 'intercept', np.atleast_1d(model.intercept_).astype(np.float64))}
+
+    compiled = model if isinstance(model, CompiledTrees) else compile_model(model)
+    return {'kind': 'trees', 'header': compiled.header,
+            'arrays': {name: arrays.put(prefix, name, getattr(compiled, name)) for name in ARRAY_NAMES}}
+
+
+def _load_component(spec: Dict, arrays: _Arrays):
+    if spec['kind'] == 'trees':
+        return CompiledTrees(spec['header'], {name: arrays.get(key) for name, key in spec['arrays'].items()})
+    if spec['kind'] == 'pipeline':
+        return dict(spec, scalers=[(arrays.get(s['mean']), arrays.get(s['scale'])) for s in spec['scalers']],
+                    final=_load_component(spec['final'], arrays))
+    if spec['kind'] == 'voting':
+        return dict(spec, members=[_load_component(m, arrays) for m in spec['members']])
+    if spec['kind'] == 'linear':
+        return dict(spec, coef=arrays.get(spec['coef']), intercept=arrays.get(spec['intercept']))
+    raise ValueError(f"Unknown component kind {spec['kind']}")
+
+
+def _proba(component, X: np.ndarray) -> np.ndarray:
+    if isinstance(component, CompiledTrees):
+        return component.predict_proba(X)
+    kind = component['kind']
+    if kind == 'pipeline':
+        for mean, scale in component['scalers']:
+            X = (X - mean) / scale
+        return _proba(component['final'], X)
+    if kind == 'voting':
+        return np.average([_proba(m, X) for m in component['members']], axis=0, weights=component['weights'])
+    # Logistic regression: sigmoid of the margin (binary) or softmax over class margins
+    margin = X @ component['coef'].T + component['intercept']
+    if not component['multinomial']:
+        p = 1.0 / (1.0 + np.exp(-margin[:, 0]))
+        return np.vstack((1 - p, p)).T
+    margin = margin - margin.max(axis=1, keepdims=True)
+    e = np.exp(margin)
+    return e / e.sum(axis=1, keepdims=True)
+
+
+class PortableModel:
+    """predict/predict_proba over a portable file's components"""
+
+    def __init__(self, header: Dict, arrays: Dict[str, np.ndarray]):
+        if header.get('format', 0) > FORMAT_VERSION:
+            raise ValueError(f"Portable format {header['format']} is newer than supported ({FORMAT_VERSION})")
+        self.header = header
+        self.arrays = arrays
+        self.classes_ = np.asarray(header['classes'])
+        self.n_features_in_ = header['n_features']
+        self.booster_api = header.get('booster_api', False)
+        if header.get('feature_names') and not self.booster_api:
+            self.feature_names_in_ = np.asarray(header['feature_names'], dtype=object)
+        self.root = _load_component(header['model'], _Arrays(arrays))
+
+    def _prepare(self, X) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float64)
+        return X.reshape(1, -1) if X.ndim == 1 else X
+
+    def predict_proba(self, X) -> np.ndarray:
+        return _proba(self.root, self._prepare(X))
+
+    def predict(self, X) -> np.ndarray:
+        """Booster.predict returns probabilities; classifiers return labels"""
+        proba = self.predict_proba(X)
+        if self.booster_api:
+            return proba[:, 1]
+        return self.classes_[np.argmax(proba, axis=1)]
+
+    def check(self, tolerance: float = CHECK_TOLERANCE) -> float:
+        """Re-score the stored probe rows; raises if they no longer match the source model"""
+        expected = self.arrays['probe_proba']
+        diff = float(np.max(np.abs(self.predict_proba(self.arrays['probe_X']) - expected))) if len(expected) else 0.0
+        if not diff <= tolerance:
+            raise ValueError(f"Portable model disagrees with its source model (max diff {diff:.2e})")
+        return diff
+
+    def save(self, path) -> Path:
+        path = Path(path)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, 'wb') as f:
+            np.savez_compressed(f, header=np.array(json.dumps(self.header)), **self.arrays)
+        tmp.replace(path)
+        return path
+
+    @classmethod
+    def load(cls, path) -> 'PortableModel':
+        with np.load(path, allow_pickle=False) as data:
+            header = json.loads(str(data['header']))
+            return cls(header, {name: data[name] for name in data.files if name != 'header'})
+
+
+def _probe(model, n_features: int, probe=None) -> np.ndarray:
+    if probe is not None:
+        return np.asarray(probe, dtype=np.float64)[-PROBE_ROWS:]
+    rows = np.random.RandomState(0).normal(size=(PROBE_ROWS, n_features))
+    return np.vstack([np.zeros((1, n_features)), rows])
+
+
+def to_portable(model, probe=None) -> PortableModel:
+    """Convert a fitted model; probe rows (ideally real feature rows) are stored for the check"""
+    arrays = _Arrays()
+    spec = _export(model, 'model', arrays)
+    booster_api = spec['kind'] == 'trees' and spec['header']['booster_api']
+    if booster_api:
+        n_features = spec['header']['n_features']
+        classes = [0, 1]
+    else:
+        n_features = int(model.n_features_in_)
+        classes = np.asarray(model.classes_).tolist()
+
+    X_probe = _probe(model, n_features, probe)
+    with warnings.catch_warnings():
+        # Models fitted on DataFrames warn about the plain probe array
+        warnings.simplefilter('ignore')
+        expected = model.predict(X_probe) if booster_api else model.predict_proba(X_probe)
+    if booster_api:
+        expected = np.vstack((1 - expected, expected)).T
+    arrays.arrays['probe_X'] = X_probe
+    arrays.arrays['probe_proba'] = np.asarray(expected, dtype=np.float64)
+
+    feature_names = getattr(model, 'feature_names_in_', None)
+    header = {'format': FORMAT_VERSION, 'source': f"{type(model).__module__}.{type(model).__name__}",
+              'classes': classes, 'n_features': n_features, 'booster_api': booster_api,
+              'feature_names': None if feature_names is None else list(map(str, feature_names)),
+              'model': spec}
+    return PortableModel(header, arrays.arrays)
+
+
+def export_portable(model, path, probe=None) -> Optional[Path]:
+    """Write a checked portable file next to a stored model; None if the model type is unsupported"""
+    logger = logging.getLogger(__name__)
+    try:
+        portable = to_portable(model, probe)
+    except (ValueError, AttributeError) as e:
+        logger.info(f"⏭️ No portable format for {type(model).__name__}: {e}")
+        return None
+    diff = portable.check()
+    path = portable.save(path)
+    logger.info(f"📦 Portable model → {Path(path).name} (probe max diff {diff:.1e})")
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check or export portable models in a registry")
+    parser.add_argument('--root', default="models")
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('check', help="load every promoted portable model with NumPy and re-score its probe")
+    export = sub.add_parser('export', help="write portable files for registered versions that lack one")
+    export.add_argument('names', nargs='*')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    root = Path(args.root)
+    manifest = json.loads((root / "registry.json").read_text())
+
+    if args.command == 'check':
+        failures = 0
+        for name, version in manifest.get('promoted', {}).items():
+            entry = manifest['models'][name][version]
+            if not entry.get('portable_path'):
+                print(f"⚠️ {name} {version}: no portable file (serving needs the training libraries)")
+                continue
+            start = time.perf_counter()
+            try:
+                diff = PortableModel.load(root / entry['portable_path']).check()
+                print(f"✅ {name} {version}: loaded in {(time.perf_counter() - start) * 1e3:.1f} ms, "
+                      f"probe max diff {diff:.1e}")
+            except Exception as e:
+                failures += 1
+                print(f"❌ {name} {version}: {e}")
+        raise SystemExit(1 if failures else 0)
+
+    from model_registry import ModelRegistry
+    registry = ModelRegistry(root)
+    for name in args.names or list(manifest.get('models', {})):
+        for version, entry in registry.versions(name).items():
+            if not entry.get('portable_path'):
+                registry.add_portable(name, version)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Prediction Cache - Skip predict_proba when nothing a prediction depends on has changed
+- Keyed by (model version, symbol, bar timestamp, feature-row hash)
+- One slot per symbol: a new bar or a promoted model changes the key and replaces the entry
+- Repeat cycles on unchanged daily bars return the stored probabilities
+- predict_batch_cached scores only the symbols that missed, in one batch
+"""
+
+import hashlib
+import logging
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from batch_inference import predict_batch
+
+
+def feature_hash(features) -> str:
+    """Digest of a feature row's values (and column names when it has them)"""
+    values = np.ascontiguousarray(np.asarray(features, dtype=np.float64))
+    digest = hashlib.sha1(values.tobytes())
+    index = getattr(features, 'index', getattr(features, 'columns', None))
+    if index is not None:
+        digest.update("|".join(map(str, index)).encode())
+    return digest.hexdigest()[:16]
+
+
+class PredictionCache:
+    """Last prediction per symbol, valid while its key is unchanged"""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._entries = {}  # symbol -> (key, value)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(version, symbol: str, bar_time, features) -> Tuple:
+        return (str(version), symbol, str(bar_time), feature_hash(features))
+
+    def get(self, version, symbol: str, bar_time, features):
+        entry = self._entries.get(symbol)
+        if entry is not None and entry[0] == self.key(version, symbol, bar_time, features):
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        return None
+
+    def put(self, version, symbol: str, bar_time, features, value):
+        self._entries[symbol] = (self.key(version, symbol, bar_time, features), value)
+
+    def snapshot(self) -> 'PredictionCache':
+        """Copy for checkpointing while another thread keeps using this cache"""
+        copy = PredictionCache()
+        copy._entries = dict(self._entries)  # one C-level copy: safe against concurrent put()
+        copy.hits, copy.misses = self.hits, self.misses
+        return copy
+
+    def invalidate(self, symbol: Optional[str] = None):
+        """Drop one symbol's entry, or all of them"""
+        if symbol is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(symbol, None)
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0}
+
+
+def predict_batch_cached(cache: PredictionCache, features: pd.DataFrame, models: Dict[str, object],
+                         versions: Dict[str, str], bar_times: Dict[str, object]) -> pd.DataFrame:
+    """predict_batch over features, reusing cached rows and scoring only the misses"""
+    cached, missed = {}, []
+    for symbol in features.index:
+        if symbol not in models:
+            continue
+        row = cache.get(versions.get(symbol), symbol, bar_times.get(symbol), features.loc[symbol])
+        if row is None:
+            missed.append(symbol)
+        else:
+            cached[symbol] = row
+
+    if missed:
+        # Plain dicts keep each column's type (iterrows would upcast the class label to float)
+        for symbol, row in predict_batch(features.loc[missed], models).to_dict('index').items():
+            cache.put(versions.get(symbol), symbol, bar_times.get(symbol), features.loc[symbol], row)
+            cached[symbol] = row
+
+    if not cached:
+        return predict_batch(features.iloc[:0], models)
+    table = pd.DataFrame.from_dict(cached, orient='index')
+    table.index.name = 'symbol'
+    return table.loc[[s for s in features.index if s in cached]]
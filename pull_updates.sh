@@ -15,10 +15,11 @@ git pull origin main --rebase
 if [ $? -eq 0 ]; then
     echo "✅ Successfully pulled latest updates"
     
-    # Check for new models
-    LATEST_MODEL=$(ls -t research/models/*.pkl 2>/dev/null | head -1)
-    if [ -n "$LATEST_MODEL" ]; then
-        echo "   Latest model: $(basename $LATEST_MODEL)"
+    # Check for new models (* marks the promoted version)
+    if [ -f "research/models/registry.json" ]; then
+        python3 model_registry.py --root research/models list | grep '^\*' | sed 's/^/   Promoted: /'
+        # Promoted models must load here with NumPy alone, whatever library versions trained them
+        python3 portable_model.py --root research/models check | sed 's/^/   /'
     fi
     
     # Check AUC score
@@ -0,0 +1,38 @@
+"""
+Promoted-model lookup shared by the LEAN algorithms (BaselineSMA, CryptoMLTrading, OptimizedMLTrading,
+ProfitableMLTrading, SimpleMLTrading):
+  • path        : model file named by the registry manifest (models/registry.json), else the newest lgb_spy_*.pkl
+  • pin         : a backtest can pin a candidate version with --parameter model_version <version>
+  • calibration : isotonic table fitted on out-of-fold predictions; keeps ml_signal thresholds meaningful
+  • imports     : LEAN runs a copy of the project folder, so main.py finds this file next to research/models
+                  and puts the repo root on sys.path; only json, numpy and pathlib are needed here
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+MODEL_NAME = "lgb_spy"
+
+
+def promoted_model_path(models_dir: Path, pinned_version: Optional[str] = None) -> Tuple[Optional[Path], Optional[Dict]]:
+    """(model file, calibration table) for the pinned or promoted version; no table for the mtime fallback"""
+    manifest_path = models_dir / "registry.json"
+    if manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text())
+        versions = manifest.get("models", {}).get(MODEL_NAME, {})
+        version = pinned_version or manifest.get("promoted", {}).get(MODEL_NAME)
+        if version in versions:
+            path = Path(versions[version]["path"])
+            return (path if path.is_absolute() else models_dir / path), versions[version].get("calibration")
+    model_files = list(models_dir.glob(f"{MODEL_NAME}_*.pkl"))
+    return (max(model_files, key=lambda x: x.stat().st_mtime) if model_files else None), None
+
+
+def calibrate(probability: float, table: Optional[Dict]) -> float:
+    """Map a raw model probability through a version's calibration table"""
+    if not table:
+        return probability
+    return float(np.interp(probability, table["x"], table["y"]))
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Binary LightGBM dataset cache shared by the training, crypto and tuning jobs:
+  • binned datasets are written once with save_binary and reloaded on later runs
+  • key     : data watermark (rows, last bar, content digest) + feature spec + bin params
+  • params  : feature_pre_filter is off so one binary serves every min_child_samples a tuning
+              trial asks for (LightGBM refuses to lower min_data_in_leaf on a pre-filtered dataset)
+  • valid   : validation sets are binned against the training set (reference=)
+              and keyed on it, so they always share its bin boundaries
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+
+CACHE_DIR = Path(__file__).resolve().parent.parent / "dataset_cache"
+DATASET_PARAMS = dict(max_bin=255, feature_pre_filter=False, verbose=-1)
+
+
+def watermark(df: pd.DataFrame, features: List[str], label: str = "target") -> str:
+    """Row count, last bar and a digest of the values the dataset is built from"""
+    values = np.ascontiguousarray(df[features + [label]].to_numpy(dtype=np.float64))
+    digest = hashlib.sha1(values.tobytes()).hexdigest()[:12]
+    last = df.index[-1] if len(df) else ""
+    return f"{len(df)}|{last}|{digest}"
+
+
+def feature_spec(features: List[str], label: str = "target", params: Optional[Dict] = None) -> str:
+    """Everything besides the data that changes how a dataset is binned"""
+    return json.dumps({"features": features, "label": label, "params": params or DATASET_PARAMS,
+                       "lightgbm": lgb.__version__}, sort_keys=True)
+
+
+class DatasetCache:
+    """Loads binned lgb.Dataset objects from disk, building and saving them on a miss"""
+
+    def __init__(self, cache_dir: Path = CACHE_DIR, params: Optional[Dict] = None):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.params = dict(params or DATASET_PARAMS)
+
+    def key(self, df: pd.DataFrame, features: List[str], label: str = "target", extra: str = "") -> str:
+        spec = feature_spec(features, label, self.params)
+        return hashlib.sha1(f"{watermark(df, features, label)}|{spec}|{extra}".encode()).hexdigest()[:16]
+
+    def _path(self, name: str, key: str) -> Path:
+        return self.cache_dir / f"{name}__{key}.bin"
+
+    def _evict(self, name: str, keep: Path):
+        """Older binaries for the same name can never be hit again"""
+        for stale in self.cache_dir.glob(f"{name}__*.bin"):
+            if stale != keep:
+                stale.unlink()
+
+    def get(self, name: str, df: pd.DataFrame, features: List[str], label: str = "target",
+            reference: Optional[lgb.Dataset] = None, extra: str = "") -> lgb.Dataset:
+        """Binned dataset for df[features]; validation sets pass the training set as reference"""
+        path = self._path(name, self.key(df, features, label, extra))
+        if path.exists():
+            return lgb.Dataset(str(path), reference=reference, params=self.params).construct()
+
+        dataset = lgb.Dataset(df[features].values, label=df[label].values, feature_name=features,
+                              reference=reference, params=self.params, free_raw_data=False)
+        dataset.construct()
+        tmp = path.with_suffix(".tmp")
+        dataset.save_binary(str(tmp))
+        tmp.replace(path)
+        self._evict(name, path)
+        return dataset
+
+    def train_valid(self, name: str, df: pd.DataFrame, features: List[str], label: str = "target",
+                    train_fraction: float = 0.7) -> Tuple[lgb.Dataset, lgb.Dataset]:
+        """Time-ordered train/validation pair with the validation set binned on the training set"""
+        cut = int(len(df) * train_fraction)
+        train_df, valid_df = df.iloc[:cut], df.iloc[cut:]
+        dtrain = self.get(f"{name}_train", train_df, features, label)
+        # The validation bins come from the training set, so its key includes the training key
+        dvalid = self.get(f"{name}_valid", valid_df, features, label, reference=dtrain,
+                          extra=self.key(train_df, features, label))
+        return dtrain, dvalid
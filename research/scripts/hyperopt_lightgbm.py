@@ -13,19 +13,22 @@ import argparse, datetime as dt, joblib, optuna
 from pathlib import Path
 import lightgbm as lgb
 
-from train_lightgbm import fetch_data, build_features
+from dataset_cache import DatasetCache
+from train_lightgbm import FEATURES, fetch_data, build_features
+
+_DATASETS = None
 
 
 # ── helpers ────────────────────────────────────────────────────────────────
 def _split() -> tuple[lgb.Dataset, lgb.Dataset]:
-    df = build_features(fetch_data())
-    print("Data fetch failed")
-    cut = int(len(df) * 0.7)
-    X, y = df[["ret_5d", "vol_30d", "mom_20d", "mom_120d", "atr_14d", "skew_30d"]].values, df["target"].values
-    return (
-        lgb.Dataset(X[:cut],  label=y[:cut]),
-        lgb.Dataset(X[cut:], label=y[cut:]),
-    )
+    """Fetch and bin once per process; every trial reuses the same cached pair"""
+    global _DATASETS
+    if _DATASETS is None:
+        df = build_features(fetch_data())
+        if df.empty:
+            raise RuntimeError("Data fetch failed")
+        _DATASETS = DatasetCache().train_valid("lgb_spy_tune", df, FEATURES, train_fraction=0.7)
+    return _DATASETS
 
 
 def _objective(trial: optuna.trial.Trial) -> float:
@@ -53,3 +56,20 @@ def _objective(trial: optuna.trial.Trial) -> float:
 
 def main(trials, n_jobs):
     study = optuna.create_study(load_if_exists=True, study_name=STUDY_NAME, storage=STORAGE, direction="maximize")
+    _split()  # build or load the datasets before the trials start
+    study.optimize(_objective, n_trials=trials, n_jobs=n_jobs)
+
+    print(f"✔ best AUC {study.best_value:.6f} → {study.best_params}")
+    out = Path(__file__).resolve().parent.parent / "models"
+    out.mkdir(parents=True, exist_ok=True)
+    fname = out / f"lgb_best_params_{dt.date.today():%Y-%m-%d}.pkl"
+    joblib.dump(study.best_params, fname)
+    print(f"✔ saved → {fname}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trials", type=int, default=75)
+    parser.add_argument("--jobs", type=int, default=1)
+    args = parser.parse_args()
+    main(args.trials, args.jobs)
@@ -7,14 +7,22 @@ Crypto-focused LightGBM model:
 """
 
 import datetime as dt
+import sys
 from pathlib import Path
 
-import joblib
 import lightgbm as lgb
 import numpy as np
 import pandas as pd
 import yfinance as yf
 
+from dataset_cache import DatasetCache
+
+try:
+    from model_registry import ModelRegistry
+except ImportError:  # run as a script from research/scripts
+    sys.path.append(str(Path(__file__).resolve().parents[2]))
+    from model_registry import ModelRegistry
+
 
 def fetch_crypto_data(tickers: list = ["BTC-USD", "ETH-USD"],
                      start: str = "2020-01-01") -> pd.DataFrame:
@@ -81,10 +89,8 @@ def train_crypto_model(df: pd.DataFrame) -> lgb.Booster:
     # Use the same features as stock model but add volume features
     feature_cols = ["ret_5d", "vol_30d", "mom_20d", "mom_120d", "atr_14d", "skew_30d"]
     
-    X = df[feature_cols].values
-    y = df["target"].values
-    
-    dtrain = lgb.Dataset(X, label=y, feature_name=feature_cols)
+    # Binned dataset is reused from the cache until the data or features change
+    dtrain = DatasetCache().get("lgb_crypto", df, feature_cols)
     
     return lgb.train(
         dict(objective="binary",
@@ -107,13 +113,6 @@ def main() -> None:
     print("Training model...")
     model = train_crypto_model(df_features)
 
-    # Save model
-    out = Path(__file__).resolve().parent.parent / "models"
-    out.mkdir(parents=True, exist_ok=True)
-    fname = out / f"lgb_crypto_{dt.date.today():%Y-%m-%d}.pkl"
-    joblib.dump(model, fname)
-    print(f"✔ saved → {fname}")
-    
     # Calculate and save AUC score
     feature_cols = ["ret_5d", "vol_30d", "mom_20d", "mom_120d", "atr_14d", "skew_30d"]
     X = df_features[feature_cols].values
@@ -131,6 +130,13 @@ def main() -> None:
     print(f"✔ Crypto AUC Score: {auc_score:.6f}")
     print(f"✔ AUC saved → {auc_file}")
 
+    # Save model (compressed, content-addressed) through the registry
+    out = Path(__file__).resolve().parent.parent / "models"
+    registry = ModelRegistry(out)
+    version = registry.register("lgb_crypto", model, version=f"{dt.date.today():%Y-%m-%d}",
+                                metrics={"auc": auc_score}, features=feature_cols, promote=True)
+    print(f"✔ saved → {registry.model_path(registry.versions('lgb_crypto')[version])}")
+
 
 if __name__ == "__main__":
     main()
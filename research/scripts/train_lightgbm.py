@@ -5,15 +5,37 @@ Daily-bar LightGBM model:
   • label   : 1 if price in 5 sessions is higher, else 0
 """
 
+import argparse
 import datetime as dt
+import sys
 from pathlib import Path
 
-import joblib
 import lightgbm as lgb
 import numpy as np
 import pandas as pd
 import yfinance as yf
 
+try:
+    from dataset_cache import DatasetCache
+except ImportError:  # imported as research.scripts.train_lightgbm
+    from research.scripts.dataset_cache import DatasetCache
+
+try:
+    from model_registry import ModelRegistry
+except ImportError:  # run as a script from research/scripts
+    sys.path.append(str(Path(__file__).resolve().parents[2]))
+    from model_registry import ModelRegistry
+from calibration import fit_calibrator
+from walk_forward import WalkForwardValidator
+
+FEATURES = ["ret_5d", "vol_30d", "mom_20d", "mom_120d", "atr_14d", "skew_30d"]
+LGB_PARAMS = dict(objective="binary",
+                  learning_rate=0.05,
+                  num_leaves=31,
+                  metric=["binary_logloss", "auc"],
+                  verbose=-1)
+NUM_BOOST_ROUND = 400
+
 
 def fetch_data(ticker: str = "SPY",
                start: str = "1993-01-29") -> pd.DataFrame:
@@ -56,33 +78,30 @@ def build_features(df: pd.DataFrame) -> pd.DataFrame:
     df.dropna(subset=["ret_5d", "vol_30d", "mom_20d", "mom_120d", "atr_14d", "skew_30d", "target"], inplace=True)
     
     return df
-def train(df: pd.DataFrame) -> lgb.Booster:
-    X = df[["ret_5d","vol_30d","mom_20d","mom_120d","atr_14d","skew_30d"]].values
-    y = df["target"].values
-    FEATURES=["ret_5d","vol_30d","mom_20d","mom_120d","atr_14d","skew_30d"]
-    dtrain = lgb.Dataset(X, label=y, feature_name=FEATURES)
-    return lgb.train(
-        dict(objective="binary",
-             learning_rate=0.05,
-             num_leaves=31,
-             metric=["binary_logloss", "auc"],
-             verbose=-1),
-        dtrain, num_boost_round=400
-    )
-
-
-def main() -> None:
+def train(df: pd.DataFrame, name: str = "lgb_spy") -> lgb.Booster:
+    # Binned dataset is reused from the cache until the data or features change
+    dtrain = DatasetCache().get(name, df, FEATURES)
+    return lgb.train(LGB_PARAMS, dtrain, num_boost_round=NUM_BOOST_ROUND)
+
+
+def calibration_table(df: pd.DataFrame):
+    """Isotonic table fitted on walk-forward out-of-fold probabilities of the same model settings"""
+    estimator = lgb.LGBMClassifier(learning_rate=LGB_PARAMS["learning_rate"], num_leaves=LGB_PARAMS["num_leaves"],
+                                   n_estimators=NUM_BOOST_ROUND, verbose=-1)
+    validator = WalkForwardValidator(n_splits=5, purge=5, embargo=1,
+                                     cache_dir=Path(__file__).resolve().parent.parent / "dataset_cache",
+                                     component="train_lightgbm")
+    result = validator.validate(estimator, df[FEATURES], df["target"], name="lgb_spy_calibration")
+    calibrator = fit_calibrator(result["oof_pred"], df["target"].values)
+    return calibrator.to_dict() if calibrator else None
+
+
+def main(promote: bool = True) -> None:
     df = build_features(fetch_data())
     model = train(df)
 
-    out = Path(__file__).resolve().parent.parent / "models"
-    out.mkdir(parents=True, exist_ok=True)
-    fname = out / f"lgb_spy_{dt.date.today():%Y-%m-%d}.pkl"
-    joblib.dump(model, fname)
-    print(f"✔ saved → {fname}")
-    
     # Calculate and save AUC score for pipeline comparison
-    X = df[["ret_5d","vol_30d","mom_20d","mom_120d","atr_14d","skew_30d"]].values
+    X = df[FEATURES].values
     y = df["target"].values
     predictions = model.predict(X)
     
@@ -97,6 +116,18 @@ def main() -> None:
     print(f"✔ AUC Score: {auc_score:.6f}")
     print(f"✔ AUC saved → {auc_file}")
 
+    # Stored compressed in the registry; LEAN algorithms trade whichever version is promoted
+    out = Path(__file__).resolve().parent.parent / "models"
+    registry = ModelRegistry(out)
+    version = registry.register("lgb_spy", model, version=f"{dt.date.today():%Y-%m-%d}",
+                                metrics={"auc": auc_score}, features=FEATURES, promote=promote,
+                                calibration=calibration_table(df), probe=df[FEATURES].values[-64:])
+    print(f"✔ saved → {registry.model_path(registry.versions('lgb_spy')[version])}")
+    print(f"✔ registered lgb_spy {version}{' (promoted)' if promote else ''}")
+
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--no-promote", action="store_true",
+                        help="register the model without promoting it (promotion gated elsewhere)")
+    main(promote=not parser.parse_args().no_promote)
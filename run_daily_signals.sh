@@ -2,4 +2,5 @@
 # Daily Trading Signals Wrapper
 cd "/Users/admin/Developer/AutoTrader"
 source .venv/bin/activate
-python simple_signals.py >> logs/daily_signals.log 2>&1
+python signal_daemon.py run signals >> logs/daily_signals.log 2>&1 \
+    || { [ $? -eq 2 ] && python simple_signals.py >> logs/daily_signals.log 2>&1; }
@@ -13,10 +13,11 @@ mkdir -p "$TMPDIR"
 cd "$ROOT"
 
 echo "[time] $(date "+%F %T")  —  training model"
-"$PY" Research/scripts/train_lightgbm.py
+"$PY" Research/scripts/train_lightgbm.py --no-promote
+VERSION="$(date +%F)"
 
 echo "[time] $(date "+%F %T")  —  back-testing"
-"$LEAN" backtest BaselineSMA --output pipeline_last.json
+"$LEAN" backtest BaselineSMA --output pipeline_last.json --parameter model_version "$VERSION"
 
 SUMMARY=$(find pipeline_last.json -maxdepth 1 -name '*-summary.json' | head -n 1)
 
@@ -35,6 +36,7 @@ NEW_AUC=$(cat latest_auc.txt 2>/dev/null || echo null)
        (( $(echo "$NEW_AUC > $OLD_AUC + 0.01" | bc -l) )); then
         echo "$NEW"     > previous_sharpe.txt
         echo "$NEW_AUC" > previous_auc.txt
+        "$PY" model_registry.py --root Research/models promote lgb_spy "$VERSION"
         git add Research/models previous_sharpe.txt previous_auc.txt
         git commit -m "Auto-promote model (Sharpe $NEW, AUC $NEW_AUC)"
         git push origin main
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Shadow Scoring - Evaluate candidate models on live rows without touching the signal path
+- A background worker scores every candidate next to the promoted model on the same feature rows
+- AUC and calibration (Brier, ECE) accumulate incrementally in fixed probability bins
+- A candidate is promoted through the registry once it beats the promoted model on enough paired rows
+- Retraining jobs run on the same worker; the signal thread only enqueues and never waits
+"""
+
+import logging
+import queue
+import threading
+from typing import Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from calibration import Calibrator
+from model_registry import ModelRegistry
+
+MAX_PENDING = 1000  # unresolved rows kept per model name
+
+
+class ShadowStats:
+    """Streaming AUC, Brier score and calibration error over binned probabilities"""
+
+    def __init__(self, bins: int = 50):
+        self.bins = bins
+        self.pos = np.zeros(bins)
+        self.neg = np.zeros(bins)
+        self.prob_sum = np.zeros(bins)
+        self.brier_sum = 0.0
+
+    def update(self, probability: float, label: int):
+        b = min(int(probability * self.bins), self.bins - 1)
+        (self.pos if label else self.neg)[b] += 1
+        self.prob_sum[b] += probability
+        self.brier_sum += (probability - label) ** 2
+
+    @property
+    def count(self) -> int:
+        return int(self.pos.sum() + self.neg.sum())
+
+    def auc(self) -> Optional[float]:
+        """Probability a positive outranks a negative (ties within a bin count half)"""
+        n_pos, n_neg = self.pos.sum(), self.neg.sum()
+        if not n_pos or not n_neg:
+            return None
+        neg_below = np.concatenate([[0], np.cumsum(self.neg)[:-1]])
+        return float((self.pos * (neg_below + 0.5 * self.neg)).sum() / (n_pos * n_neg))
+
+    def brier(self) -> Optional[float]:
+        return self.brier_sum / self.count if self.count else None
+
+    def ece(self) -> Optional[float]:
+        """Expected calibration error: mean |predicted - observed| over bins, weighted by rows"""
+        counts = self.pos + self.neg
+        if not counts.sum():
+            return None
+        filled = counts > 0
+        gap = np.abs(self.prob_sum[filled] / counts[filled] - self.pos[filled] / counts[filled])
+        return float((gap * counts[filled]).sum() / counts.sum())
+
+    def summary(self) -> Dict:
+        return {'count': self.count, 'positives': int(self.pos.sum()), 'auc': self.auc(),
+                'brier': self.brier(), 'ece': self.ece()}
+
+
+def positive_probability(model, row: pd.Series, features) -> float:
+    X = row[features].astype(float).fillna(0) if features else row.astype(float).fillna(0)
+    # Models fitted on plain arrays are scored on plain arrays
+    X = X.to_frame().T if hasattr(model, 'feature_names_in_') else X.values.reshape(1, -1)
+    proba = model.predict_proba(X)[0]
+    classes = list(getattr(model, 'classes_', range(len(proba))))
+    return float(proba[classes.index(1)] if 1 in classes else proba[-1])
+
+
+class ShadowScorer:
+    """Background shadow evaluation and promotion of candidate model versions"""
+
+    def __init__(self, root: str = "models", min_samples: int = 100, min_class_count: int = 10,
+                 min_auc_gain: float = 0.01, brier_tolerance: float = 0.005, max_samples: int = 1000,
+                 queue_size: int = 10000):
+        self.logger = logging.getLogger(__name__)
+        # The worker keeps its own registry handle; the signal thread's picks up promotions on its next stat()
+        self.registry = ModelRegistry(root)
+        self.min_samples = min_samples
+        self.min_class_count = min_class_count
+        self.min_auc_gain = min_auc_gain
+        self.brier_tolerance = brier_tolerance
+        self.max_samples = max_samples
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._models = {}      # (name, version) -> (model, calibrator)
+        self._candidates = {}  # name -> {version: {'candidate': ShadowStats, 'promoted': ShadowStats}}
+        self._pending = {}     # name -> {key: {'promoted': version, 'scores': {version: probability}}}
+
+    # --- signal thread: enqueue only -------------------------------------------------
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="shadow-scorer", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5):
+        self._enqueue(('stop',))
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _enqueue(self, job):
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            self.logger.warning(f"⚠️ Shadow queue full, dropping {job[0]} job")
+
+    def submit_training(self, name: str, train_fn: Callable[[], Optional[str]]):
+        """Run train_fn on the worker; the unpromoted version it registers becomes a candidate"""
+        self._enqueue(('train', name, train_fn))
+
+    def add_candidate(self, name: str, version: str):
+        self._enqueue(('candidate', name, version))
+
+    def observe(self, name: str, key, row: pd.Series):
+        """Live feature row (key: e.g. bar timestamp) to score with the promoted model and candidates"""
+        self._enqueue(('observe', name, str(key), row.copy()))
+
+    def resolve(self, name: str, key, label: int):
+        """Outcome for a previously observed row"""
+        self._enqueue(('resolve', name, str(key), int(label)))
+
+    def stats(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {name: {version: {side: s.summary() for side, s in pair.items()}
+                           for version, pair in versions.items()}
+                    for name, versions in self._candidates.items()}
+
+    # --- worker ---------------------------------------------------------------------
+
+    def _run(self):
+        handlers = {'train': self._train, 'candidate': self._add_candidate,
+                    'observe': self._observe, 'resolve': self._resolve}
+        while True:
+            job = self._queue.get()
+            if job[0] == 'stop':
+                return
+            try:
+                handlers[job[0]](*job[1:])
+            except Exception as e:
+                self.logger.error(f"❌ Shadow {job[0]} job failed for {job[1]}: {e}")
+
+    def _train(self, name: str, train_fn: Callable[[], Optional[str]]):
+        version = train_fn()
+        if version is not None:
+            self._add_candidate(name, version)
+
+    def _add_candidate(self, name: str, version: str):
+        promoted = self.registry.manifest().get('promoted', {}).get(name)
+        if promoted is None:
+            # Nothing to compare against
+            self.registry.promote(name, version)
+            return
+        if version == promoted:
+            return
+        with self._lock:
+            self._candidates.setdefault(name, {})[version] = {'candidate': ShadowStats(), 'promoted': ShadowStats()}
+        self.logger.info(f"👥 Shadow scoring {name} {version} against {promoted}")
+
+    def _model(self, name: str, version: str):
+        if (name, version) not in self._models:
+            calibration = self.registry.versions(name)[version].get('calibration')
+            self._models[(name, version)] = (self.registry.load_version(name, version),
+                                             Calibrator.from_dict(calibration))
+        return self._models[(name, version)]
+
+    def _observe(self, name: str, key: str, row: pd.Series):
+        candidates = self._candidates.get(name)
+        promoted = self.registry.manifest().get('promoted', {}).get(name)
+        if not candidates or promoted is None:
+            return
+
+        scores = {}
+        versions = self.registry.versions(name)
+        for version in [promoted, *candidates]:
+            model, calibrator = self._model(name, version)
+            probability = positive_probability(model, row, versions[version].get('features'))
+            # Compare what each version would actually emit, i.e. after its own calibration
+            scores[version] = calibrator(probability) if calibrator else probability
+        pending = self._pending.setdefault(name, {})
+        pending[key] = {'promoted': promoted, 'scores': scores}
+        while len(pending) > MAX_PENDING:
+            pending.pop(next(iter(pending)))
+
+    def _resolve(self, name: str, key: str, label: int):
+        observed = self._pending.get(name, {}).pop(key, None)
+        if observed is None:
+            return
+        promoted, scores = observed['promoted'], observed['scores']
+        with self._lock:
+            for version, pair in self._candidates.get(name, {}).items():
+                # Only rows both models scored count toward the comparison
+                if version in scores and promoted in scores:
+                    pair['candidate'].update(scores[version], label)
+                    pair['promoted'].update(scores[promoted], label)
+        self._evaluate(name)
+
+    def _evaluate(self, name: str):
+        promoted = self.registry.manifest().get('promoted', {}).get(name)
+        with self._lock:
+            pairs = dict(self._candidates.get(name, {}))
+
+        best, best_gain = None, None
+        for version, pair in pairs.items():
+            candidate, incumbent = pair['candidate'], pair['promoted']
+            if candidate.count < self.min_samples or \
+                    min(candidate.pos.sum(), candidate.neg.sum()) < self.min_class_count:
+                continue
+            gain = candidate.auc() - incumbent.auc()
+            calibrated = candidate.brier() <= incumbent.brier() + self.brier_tolerance
+            if gain >= self.min_auc_gain and calibrated and (best_gain is None or gain > best_gain):
+                best, best_gain = version, gain
+            elif candidate.count >= self.max_samples:
+                self.logger.info(f"🗑️ Retiring shadow candidate {name} {version}: AUC gain {gain:+.4f}")
+                with self._lock:
+                    self._candidates[name].pop(version, None)
+
+        if best is None:
+            return
+        pair = pairs[best]
+        self.registry.annotate(name, best, shadow={'candidate': pair['candidate'].summary(),
+                                                   'replaced': promoted,
+                                                   'promoted': pair['promoted'].summary()})
+        self.registry.promote(name, best)
+        self.logger.info(f"🚀 Shadow promotion {name}: {promoted} → {best} (AUC {best_gain:+.4f})")
+
+        # Remaining candidates were compared against the old model; start their comparison over
+        with self._lock:
+            remaining = self._candidates.pop(name, {})
+            remaining.pop(best, None)
+            self._candidates[name] = {v: {'candidate': ShadowStats(), 'promoted': ShadowStats()} for v in remaining}
+        self._models = {k: m for k, m in self._models.items() if k[0] != name or k[1] in (best, *remaining)}
+        self._pending.pop(name, None)
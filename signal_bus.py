@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Signal Bus - Append-only log of trade signals shared by producers and consumers
+- Records are JSON lines in size-capped segments under signals/bus/ (segment files are named by start offset)
+- An offset is the byte position of a record in the whole log, so it never changes once written
+- Appends are one O_APPEND write under an exclusive file lock: concurrent writers, threads or processes,
+  never interleave records; readers only take complete lines
+- Consumers keep a committed offset per name and read only what was appended since
+- tail(n) reads the last n records from the end of the log, without touching older ones
+"""
+
+import argparse
+import fcntl
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+SIGNAL_BUS_DIR = "signals/bus"
+SEGMENT_BYTES = 1 << 20
+TAIL_BLOCK_BYTES = 64 * 1024
+
+
+class SignalBus:
+    """Segmented JSONL log with atomic appends and offset reads"""
+
+    def __init__(self, path: str = SIGNAL_BUS_DIR, segment_bytes: int = SEGMENT_BYTES):
+        self.logger = logging.getLogger(__name__)
+        self.path = Path(path)
+        self.segment_bytes = segment_bytes
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._lock_path = self.path / "append.lock"
+        self._thread_lock = threading.Lock()
+        self._head = None  # (base offset, path) of the segment being appended to
+
+    def _segment_path(self, base: int) -> Path:
+        return self.path / f"{base:016d}.jsonl"
+
+    def segments(self) -> List[Tuple[int, Path]]:
+        return sorted((int(path.stem), path) for path in self.path.glob("*.jsonl"))
+
+    def exists(self) -> bool:
+        return any(self.path.glob("*.jsonl"))
+
+    @contextmanager
+    def _locked(self):
+        with self._thread_lock, open(self._lock_path, 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    # --- producer -----------------------------------------------------------------
+
+    def append(self, record: Dict) -> int:
+        """Append one record; returns its offset"""
+        line = (json.dumps(record, default=str, separators=(',', ':')) + "\n").encode()
+        with self._locked():
+            # Only a full head segment can have been rolled by another writer, so list the directory only then
+            if self._head is None or self._head[1].stat().st_size >= self.segment_bytes:
+                segments = self.segments()
+                self._head = segments[-1] if segments else (0, self._segment_path(0))
+            base, path = self._head
+            size = path.stat().st_size if path.exists() else 0
+            if size >= self.segment_bytes:
+                base, path = base + size, self._segment_path(base + size)
+                self._head, size = (base, path), 0
+
+            fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                written = 0
+                while written < len(line):
+                    written += os.write(fd, line[written:])
+            finally:
+                os.close(fd)
+        return base + size
+
+    # --- consumers ----------------------------------------------------------------
+
+    def end_offset(self) -> int:
+        segments = self.segments()
+        if not segments:
+            return 0
+        base, path = segments[-1]
+        return base + path.stat().st_size
+
+    def read(self, offset: int, max_records: Optional[int] = None) -> Tuple[List[Tuple[int, Dict]], int]:
+        """Complete records at or after offset: ([(offset, record)], offset to continue from)"""
+        records = []
+        for base, path in self.segments():
+            size = path.stat().st_size
+            if base + size <= offset:
+                continue
+            with open(path, 'rb') as f:
+                f.seek(max(0, offset - base))
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        return records, offset  # being written; picked up next time
+                    try:
+                        records.append((offset, json.loads(line)))
+                    except ValueError:
+                        self.logger.warning(f"⚠️ Skipping unreadable signal record at offset {offset}")
+                    offset = max(offset, base) + len(line)
+                    if max_records is not None and len(records) >= max_records:
+                        return records, offset
+        return records, offset
+
+    def tail(self, n: int = 10) -> List[Dict]:
+        """Last n records, oldest first"""
+        if n <= 0:
+            return []
+        lines = []
+        for base, path in reversed(self.segments()):
+            with open(path, 'rb') as f:
+                position = f.seek(0, os.SEEK_END)
+                buffer = b""
+                while position > 0 and buffer.count(b"\n") <= n - len(lines):
+                    step = min(TAIL_BLOCK_BYTES, position)
+                    position -= step
+                    f.seek(position)
+                    buffer = f.read(step) + buffer
+            chunk = buffer.split(b"\n")
+            # The last piece is a record in progress (or empty); the first is partial unless at the file start
+            complete = chunk[:-1] if position == 0 else chunk[1:-1]
+            lines = complete[-(n - len(lines)):] + lines
+            if len(lines) >= n:
+                break
+
+        records = []
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                self.logger.warning("⚠️ Skipping unreadable signal record")
+        return records
+
+
+class SignalConsumer:
+    """Reader with a committed offset, stored under <bus>/offsets/<name>.offset"""
+
+    def __init__(self, bus: SignalBus, name: str, start: str = 'latest'):
+        self.bus = bus
+        self.name = name
+        self.offset_path = bus.path / "offsets" / f"{name}.offset"
+        self.offset = self.committed()
+        if self.offset is None:
+            # A new consumer skips history by default
+            self.offset = bus.end_offset() if start == 'latest' else 0
+
+    def committed(self) -> Optional[int]:
+        try:
+            return int(self.offset_path.read_text().strip())
+        except (OSError, ValueError):
+            return None
+
+    def poll(self, max_records: Optional[int] = None) -> List[Dict]:
+        """Records appended since the last poll"""
+        records, self.offset = self.bus.read(self.offset, max_records)
+        return [record for _, record in records]
+
+    def commit(self):
+        self.offset_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.offset_path.with_suffix('.tmp')
+        tmp.write_text(str(self.offset))
+        os.replace(tmp, self.offset_path)
+
+    def lag(self) -> int:
+        """Bytes appended after the consumer's position"""
+        return self.bus.end_offset() - self.offset
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect the signal bus")
+    parser.add_argument('--path', default=SIGNAL_BUS_DIR)
+    sub = parser.add_subparsers(dest='command', required=True)
+    tail = sub.add_parser('tail', help="print the latest records")
+    tail.add_argument('-n', type=int, default=20)
+    sub.add_parser('offsets', help="committed offset and lag of each consumer")
+    migrate = sub.add_parser('import', help="append the records of a legacy JSON list file")
+    migrate.add_argument('file', nargs='?', default="signals/manual_trades.json")
+    args = parser.parse_args()
+
+    bus = SignalBus(args.path)
+    if args.command == 'tail':
+        for record in bus.tail(args.n):
+            print(json.dumps(record))
+    elif args.command == 'offsets':
+        print(f"📜 End offset: {bus.end_offset()}")
+        for path in sorted((bus.path / "offsets").glob("*.offset")):
+            consumer = SignalConsumer(bus, path.stem)
+            print(f"   {consumer.name}: offset {consumer.offset}, {consumer.lag()} bytes behind")
+    else:
+        with open(args.file, 'r') as f:
+            records = json.load(f)
+        for record in records:
+            bus.append(record)
+        print(f"✅ Imported {len(records)} records from {args.file}")
+
+
+if __name__ == "__main__":
+    main()
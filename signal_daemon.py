@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Signal Daemon - One resident process for the cron-driven signal and training jobs
+- Imports pandas/NumPy/yfinance/LightGBM once and keeps SPY daily bars cached between runs
+  (each run downloads only the last few days and appends them)
+- Jobs are triggered by its own market-hours scheduler (--schedule) or over a local Unix socket
+- `python3 signal_daemon.py run signals` is the thin client the cron scripts call: it imports nothing
+  but the standard library and prints the job's output; exit code 2 means no daemon is listening
+- Socket commands: run <job>, status, ping, stop
+"""
+
+import argparse
+import io
+import json
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Tuple
+
+SOCKET_PATH = "data/signal_daemon.sock"
+JOBS = ('signals', 'train')
+HISTORY_PERIOD = '1y'
+REFRESH_PERIOD = '5d'
+# Exit codes of the client
+EXIT_OK, EXIT_JOB_FAILED, EXIT_NO_DAEMON = 0, 1, 2
+
+
+# --- client (standard library only) -------------------------------------------------
+
+def send_command(command: str, socket_path: str = SOCKET_PATH, out=sys.stdout) -> int:
+    """Send one command, copy the reply to out and return the client exit code"""
+    try:
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        client.connect(socket_path)
+    except (FileNotFoundError, ConnectionRefusedError) as e:
+        print(f"❌ Signal daemon not reachable at {socket_path}: {e}", file=sys.stderr)
+        return EXIT_NO_DAEMON
+
+    with client, client.makefile('rw', encoding='utf-8') as stream:
+        stream.write(command.strip() + "\n")
+        stream.flush()
+        # The reply ends with an 'ok ...' or 'error ...' status line
+        status = ""
+        for line in stream:
+            out.write(line)
+            status = line
+    return EXIT_OK if status.startswith("ok") else EXIT_JOB_FAILED
+
+
+# --- daemon -------------------------------------------------------------------------
+
+class _ThreadOutput:
+    """sys.stdout stand-in that sends a job thread's prints to that job's buffer"""
+
+    def __init__(self, fallback):
+        self.fallback = fallback
+        self.local = threading.local()
+
+    def _target(self):
+        return getattr(self.local, 'buffer', None) or self.fallback
+
+    def write(self, text):
+        return self._target().write(text)
+
+    def flush(self):
+        self._target().flush()
+
+    def __getattr__(self, name):
+        return getattr(self.fallback, name)
+
+
+class BarCache:
+    """Daily bars per symbol: one full download, then only the latest days are fetched and merged"""
+
+    def __init__(self):
+        self.frames = {}
+        self.lock = threading.Lock()
+
+    def get(self, symbol: str):
+        import pandas as pd
+        import yfinance as yf
+
+        with self.lock:
+            cached = self.frames.get(symbol)
+            if cached is None:
+                frame = yf.Ticker(symbol).history(period=HISTORY_PERIOD)
+            else:
+                recent = yf.Ticker(symbol).history(period=REFRESH_PERIOD)
+                frame = pd.concat([cached, recent])
+                frame = frame[~frame.index.duplicated(keep='last')]
+                # Same window as a fresh one-year download
+                frame = frame[frame.index > frame.index[-1] - pd.DateOffset(years=1)]
+            if not frame.empty:
+                self.frames[symbol] = frame
+            return frame.copy()
+
+
+class SignalDaemon:
+    """Warm process that runs the signal and training jobs on request or on schedule"""
+
+    def __init__(self, socket_path: str = SOCKET_PATH, schedule: bool = False):
+        self.logger = logging.getLogger(__name__)
+        self.socket_path = socket_path
+        self.schedule = schedule
+        self.bars = BarCache()
+        self.started = time.time()
+        self.stats = {job: {'runs': 0, 'failures': 0, 'last_run': None, 'last_seconds': None, 'last_error': None}
+                      for job in JOBS}
+        self._job_locks = {job: threading.Lock() for job in JOBS}
+        self._stopping = threading.Event()
+        self._output = _ThreadOutput(sys.stdout)
+
+    def warm_up(self):
+        """Pay the import cost once, at startup"""
+        start = time.perf_counter()
+        import simple_signals  # noqa: F401  (pandas, NumPy, yfinance)
+        from research.scripts import train_lightgbm  # noqa: F401  (LightGBM, sklearn)
+        self.logger.info(f"🔥 Imports warm in {time.perf_counter() - start:.1f}s")
+
+    # --- jobs ---------------------------------------------------------------------
+
+    def job_signals(self):
+        import simple_signals
+        simple_signals.get_trading_signal(self.bars.get('SPY'))
+
+    def job_train(self):
+        from research.scripts import train_lightgbm
+        train_lightgbm.main(promote=True)
+
+    def run_job(self, name: str) -> Tuple[bool, str, float]:
+        """Run a job (waiting for a running instance of the same job first); returns (ok, output, seconds)"""
+        buffer = io.StringIO()
+        with self._job_locks[name]:
+            self._output.local.buffer = buffer
+            start = time.perf_counter()
+            ok = True
+            try:
+                getattr(self, f"job_{name}")()
+            except Exception as e:
+                ok = False
+                self.stats[name]['failures'] += 1
+                self.stats[name]['last_error'] = str(e)
+                print(f"❌ {name} failed: {e}")
+            finally:
+                self._output.local.buffer = None
+            seconds = time.perf_counter() - start
+            self.stats[name].update(runs=self.stats[name]['runs'] + 1, last_seconds=seconds,
+                                    last_run=datetime.now().isoformat())
+        self.logger.info(f"{'✅' if ok else '❌'} {name} finished in {seconds:.2f}s")
+        return ok, buffer.getvalue(), seconds
+
+    def status(self) -> Dict:
+        return {'pid': os.getpid(), 'uptime_seconds': time.time() - self.started, 'scheduled': self.schedule,
+                'cached_symbols': sorted(self.bars.frames), 'jobs': self.stats}
+
+    # --- socket server ------------------------------------------------------------
+
+    def _handle(self, conn: socket.socket):
+        with conn, conn.makefile('rw', encoding='utf-8') as stream:
+            words = stream.readline().split()
+            try:
+                if words[:1] == ['run'] and len(words) == 2 and words[1] in JOBS:
+                    ok, output, seconds = self.run_job(words[1])
+                    stream.write(output)
+                    stream.write(f"{'ok' if ok else 'error'} {words[1]} {seconds:.2f}s\n")
+                elif words == ['status']:
+                    stream.write(json.dumps(self.status(), indent=2) + "\nok\n")
+                elif words == ['ping']:
+                    stream.write("ok pong\n")
+                elif words == ['stop']:
+                    stream.write("ok stopping\n")
+                    self.stop()
+                else:
+                    stream.write(f"error unknown command {' '.join(words)!r} (run {'|'.join(JOBS)}, status, ping, stop)\n")
+                stream.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                self.logger.warning("⚠️ Client disconnected before the reply")
+
+    def _start_scheduler(self):
+        from market_scheduler import MarketScheduler
+
+        scheduler = MarketScheduler()
+        scheduler.every(5, lambda: self.run_job('signals'), assets=('equity',))
+        # 6 PM on a regular day; two hours after an early close
+        scheduler.at_close(lambda: self.run_job('train'), 'equity', offset_minutes=120)
+        threading.Thread(target=scheduler.run_forever, args=(self._stopping.is_set,),
+                         name="daemon-scheduler", daemon=True).start()
+        self.logger.info("⏰ Internal schedule: signals every 5-minute equity bar, training 2h after the close")
+
+    def serve(self):
+        path = Path(self.socket_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.exists():
+            if send_command("ping", self.socket_path, out=io.StringIO()) == EXIT_OK:
+                raise RuntimeError(f"Another signal daemon is listening on {path}")
+            path.unlink()
+
+        sys.stdout = self._output
+        self.warm_up()
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(str(path))
+        os.chmod(path, 0o600)
+        server.listen()
+        server.settimeout(1.0)
+        if self.schedule:
+            self._start_scheduler()
+        self.logger.info(f"🛰️ Signal daemon listening on {path} (pid {os.getpid()})")
+
+        try:
+            while not self._stopping.is_set():
+                try:
+                    conn, _ = server.accept()
+                except socket.timeout:
+                    continue
+                threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+        finally:
+            server.close()
+            path.unlink(missing_ok=True)
+            sys.stdout = self._output.fallback
+            self.logger.info("🏁 Signal daemon stopped")
+
+    def stop(self):
+        self._stopping.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resident signal/training daemon and its client")
+    parser.add_argument('--socket', default=SOCKET_PATH)
+    sub = parser.add_subparsers(dest='command', required=True)
+    serve = sub.add_parser('serve', help="run the daemon in the foreground")
+    serve.add_argument('--schedule', action='store_true', help="also run jobs on the market-hours schedule")
+    run = sub.add_parser('run', help="run a job in the daemon and print its output")
+    run.add_argument('job', choices=JOBS)
+    for command in ('status', 'ping', 'stop'):
+        sub.add_parser(command)
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        Path("logs").mkdir(exist_ok=True)
+        logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s',
+                            handlers=[logging.FileHandler("logs/signal_daemon.log"), logging.StreamHandler()])
+        SignalDaemon(args.socket, schedule=args.schedule).serve()
+        return
+
+    command = f"run {args.job}" if args.command == 'run' else args.command
+    sys.exit(send_command(command, args.socket))
+
+
+if __name__ == "__main__":
+    main()
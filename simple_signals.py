@@ -3,71 +3,42 @@
 Simple Daily Trading Signals - 100% FREE
 """
 
-import pandas as pd
-import numpy as np
-import yfinance as yf
-from datetime import datetime, timedelta
+from datetime import datetime
+from strategy_host import run_strategy, trend_macd
 
-def get_trading_signal():
-    """Get today's trading signal"""
+def get_trading_signal(data=None):
+    """Get today's trading signal (data: SPY daily bars, e.g. kept warm by signal_daemon.py)"""
     print(f"🚀 FREE Daily Trading Signal - {datetime.now().strftime('%Y-%m-%d')}")
     print("💰 No API costs, no cloud fees - 100% FREE!")
     
-    # Get SPY data
-    ticker = yf.Ticker('SPY')
-    data = ticker.history(period='1y')
-    
-    # Calculate indicators
-    data['sma_50'] = data['Close'].rolling(50).mean()
-    data['sma_200'] = data['Close'].rolling(200).mean()
-    
-    # RSI
-    delta = data['Close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(14).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
-    rs = gain / loss
-    data['rsi'] = 100 - (100 / (1 + rs))
-    
-    # MACD
-    exp1 = data['Close'].ewm(span=12).mean()
-    exp2 = data['Close'].ewm(span=26).mean()
-    data['macd'] = exp1 - exp2
-    data['macd_signal'] = data['macd'].ewm(span=9).mean()
-    
-    # Get latest values
-    latest = data.iloc[-1]
-    
-    # Your profitable strategy
-    sma_bullish = latest['sma_50'] > latest['sma_200']
-    rsi_oversold = latest['rsi'] < 30
-    rsi_overbought = latest['rsi'] > 70
-    macd_bullish = latest['macd'] > latest['macd_signal']
-    
-    should_buy = (sma_bullish and macd_bullish) or (sma_bullish and rsi_oversold)
-    should_sell = not sma_bullish or rsi_overbought
+    # Your profitable strategy: trend_macd in strategy_host.py (downloads SPY unless bars are passed in)
+    signal = run_strategy(trend_macd, ['SPY'], snapshot=None if data is None else {'SPY': data}).get('SPY')
+    if signal is None:
+        print("❌ Not enough SPY history for a signal")
+        return None
     
     # Print results
     print(f"\n📊 SPY TRADING SIGNAL")
     print("=" * 40)
-    print(f"💰 Current Price: ${latest['Close']:.2f}")
-    print(f"📈 SMA 50: ${latest['sma_50']:.2f}")
-    print(f"📉 SMA 200: ${latest['sma_200']:.2f}")
-    print(f"🎯 RSI: {latest['rsi']:.1f}")
-    print(f"📊 MACD: {latest['macd']:.4f}")
+    print(f"💰 Current Price: ${signal['price']:.2f}")
+    print(f"📈 SMA 50: ${signal['sma_50']:.2f}")
+    print(f"📉 SMA 200: ${signal['sma_200']:.2f}")
+    print(f"🎯 RSI: {signal['rsi']:.1f}")
+    print(f"📊 MACD: {signal['macd']:.4f}")
     
     print(f"\n🔍 TECHNICAL ANALYSIS:")
-    print(f"   SMA Bullish: {'✅' if sma_bullish else '❌'}")
-    print(f"   RSI Oversold: {'✅' if rsi_oversold else '❌'}")
-    print(f"   RSI Overbought: {'✅' if rsi_overbought else '❌'}")
-    print(f"   MACD Bullish: {'✅' if macd_bullish else '❌'}")
+    print(f"   SMA Bullish: {'✅' if signal['sma_bullish'] else '❌'}")
+    print(f"   RSI Oversold: {'✅' if signal['rsi_oversold'] else '❌'}")
+    print(f"   RSI Overbought: {'✅' if signal['rsi_overbought'] else '❌'}")
+    print(f"   MACD Bullish: {'✅' if signal['macd_bullish'] else '❌'}")
     
     print(f"\n🎯 TRADING SIGNAL:")
-    if should_buy:
+    if signal['action'] == "BUY":
         print(f"   🟢 BUY SPY!")
         print(f"   💡 Strong bullish momentum detected")
-        print(f"   🛑 Stop Loss: ${latest['Close'] * 0.95:.2f} (5% stop)")
-        print(f"   🎯 Take Profit: ${latest['Close'] * 1.15:.2f} (15% target)")
-    elif should_sell:
+        print(f"   🛑 Stop Loss: ${signal['price'] * 0.95:.2f} (5% stop)")
+        print(f"   🎯 Take Profit: ${signal['price'] * 1.15:.2f} (15% target)")
+    elif signal['action'] == "SELL":
         print(f"   🔴 SELL SPY!")
         print(f"   💡 Bearish conditions detected")
     else:
@@ -83,6 +54,7 @@ def get_trading_signal():
     print(f"   2. Execute the signal manually at market open")
     print(f"   3. No API costs, no monthly fees")
     print(f"   4. Expected 33% annual returns!")
+    return signal
 
 if __name__ == "__main__":
     get_trading_signal()
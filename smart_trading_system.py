@@ -12,32 +12,38 @@ import pandas as pd
 import numpy as np
 import yfinance as yf
 import sqlite3
-import joblib
 import json
 import time
 import logging
 from datetime import datetime, timedelta
 from pathlib import Path
-import schedule
 import warnings
 from sklearn.ensemble import VotingClassifier
 import xgboost as xgb
 import lightgbm as lgb
-from sklearn.metrics import roc_auc_score
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
+from calibration import Calibrator, fit_calibrator
+from db_writer import get_writer
+from latency_tracer import LatencyTracer
+from market_scheduler import MarketScheduler, asset_class
+from model_registry import ModelRegistry
+from prediction_cache import PredictionCache
+from shadow_scoring import ShadowScorer
+from walk_forward import WalkForwardValidator, fold_rows, store_fold_metrics
 import threading
 warnings.filterwarnings('ignore')
 
+# A row's 5-day target is known once 5 later bars exist; one more skips today's partial bar
+SHADOW_LABEL_LAG = 7
+
 class SmartTradingSystem:
     def __init__(self):
         self.setup_logging()
         self.setup_database()
         self.setup_directories()
         
+        # Per-stage cycle timings, flushed to the database every few minutes
+        self.tracer = LatencyTracer(self.db_path, "smart_trading_system")
+        
         # Trading parameters
         self.symbols = ['SPY', 'QQQ', 'IWM', 'VTI', 'BTC-USD', 'ETH-USD']
         self.virtual_portfolio = 10000
@@ -47,6 +53,21 @@ class SmartTradingSystem:
         self.min_confidence = 0.7  # Minimum confidence for trades
         self.learning_threshold = 0.05  # Retrain if performance drops 5%
         
+        # Walk-forward validation (5-day target -> 5 bar purge)
+        self.validator = WalkForwardValidator(n_splits=5, purge=5, embargo=1, component="smart_trading_system")
+        
+        # Versioned models: compressed, deduplicated and pruned by the retention policy
+        self.registry = ModelRegistry("models")
+        
+        # Retrained models are scored in the background next to the promoted one before replacing it
+        self.shadow = ShadowScorer("models").start()
+        
+        # Repeat cycles on an unchanged daily bar reuse the last prediction
+        self.prediction_cache = PredictionCache()
+        
+        # Session-aware scheduling from the market-hours database
+        self.scheduler = MarketScheduler()
+        
         # Models and performance tracking
         self.models = {}
         self.performance_history = {}
@@ -143,6 +164,8 @@ class SmartTradingSystem:
         ''')
         
         self.conn.commit()
+        # Writes go through one batching writer (also used by background retraining); self.conn is for reads
+        self.db = get_writer(self.db_path)
         self.logger.info("📊 Smart trading database initialized")
     
     def setup_directories(self):
@@ -154,6 +177,10 @@ class SmartTradingSystem:
     def setup_browser(self):
         """Setup Chrome browser for automation"""
         try:
+            # Selenium is imported only when a browser is actually set up
+            from selenium import webdriver
+            from selenium.webdriver.chrome.options import Options
+            
             chrome_options = Options()
             chrome_options.add_argument("--no-sandbox")
             chrome_options.add_argument("--disable-dev-shm-usage")
@@ -266,8 +293,10 @@ class SmartTradingSystem:
         df['obv'] = (df['Volume'] * np.where(df['Close'] > df['Close'].shift(1), 1, 
                                            np.where(df['Close'] < df['Close'].shift(1), -1, 0))).cumsum()
     
-    def create_smart_model(self, symbol):
+    def create_smart_model(self, symbol, promote=True, registry=None):
         """Create smart ensemble model with learning capabilities"""
+        # Background retraining passes its own registry handle
+        registry = registry or self.registry
         try:
             # Get enhanced data
             data = self.collect_enhanced_data(symbol)
@@ -292,26 +321,23 @@ class SmartTradingSystem:
                 ])
             }
             
-            # Train and evaluate models
+            # Evaluate models with purged walk-forward validation
             best_model = None
             best_score = 0
+            best_oof = None
+            model_version = datetime.now().strftime("%Y%m%d_%H%M%S")
+            fold_metric_rows = []
             
             for name, model in models.items():
                 try:
-                    # Simple train/test split for now
-                    split_idx = int(len(X) * 0.8)
-                    X_train, X_test = X[:split_idx], X[split_idx:]
-                    y_train, y_test = y[:split_idx], y[split_idx:]
-                    
-                    model.fit(X_train, y_train)
-                    
-                    # Get predictions and calculate AUC
-                    y_pred_proba = model.predict_proba(X_test)[:, 1]
-                    score = roc_auc_score(y_test, y_pred_proba)
+                    result = self.validator.validate(model, X, y, name=symbol)
+                    score = result['mean_auc']
+                    fold_metric_rows += fold_rows(symbol, name, model_version, result)
                     
                     if score > best_score:
                         best_score = score
                         best_model = model
+                        best_oof = result['oof_pred']
                     
                     self.logger.info(f"✅ {name} model for {symbol}: AUC = {score:.4f}")
                     
@@ -319,11 +345,17 @@ class SmartTradingSystem:
                     self.logger.error(f"❌ Error training {name} for {symbol}: {e}")
                     continue
             
+            store_fold_metrics(self.db, fold_metric_rows)
+            
             if best_model and best_score > 0.55:  # Minimum acceptable performance
+                # Train the winner on all data
+                best_model.fit(X, y)
+                calibrator = fit_calibrator(best_oof, y)
+                
                 # Save model
-                model_version = datetime.now().strftime("%Y%m%d_%H%M%S")
-                model_path = Path(f"models/{symbol}_smart_model_{model_version}.pkl")
-                joblib.dump(best_model, model_path)
+                registry.register(f"{symbol}_smart_model", best_model, version=model_version,
+                                  metrics={'auc': best_score}, features=feature_cols, promote=promote,
+                                  calibration=calibrator.to_dict() if calibrator else None, probe=X.tail(64))
                 
                 # Store performance
                 self.store_model_performance(symbol, model_version, best_score, len(data), feature_cols)
@@ -334,7 +366,8 @@ class SmartTradingSystem:
                     'model': best_model,
                     'version': model_version,
                     'score': best_score,
-                    'feature_cols': feature_cols
+                    'feature_cols': feature_cols,
+                    'calibrator': calibrator
                 }
             
         except Exception as e:
@@ -343,35 +376,53 @@ class SmartTradingSystem:
     
     def store_model_performance(self, symbol, version, score, total_samples, feature_cols):
         """Store model performance metrics"""
-        cursor = self.conn.cursor()
-        
         # Calculate additional metrics
         precision = score * 0.9
         recall = score * 0.85
         f1 = 2 * (precision * recall) / (precision + recall)
         
-        cursor.execute('''
+        self.db.execute('''
             INSERT INTO model_performance 
             (symbol, version, timestamp, accuracy, precision_score, recall_score, 
              f1_score, roc_auc, total_predictions)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
         ''', (symbol, version, datetime.now().isoformat(), score, precision, 
               recall, f1, score, total_samples))
-        
-        self.conn.commit()
+    
+    def train_candidate(self, symbol):
+        """Retrain on the shadow worker; the new version is registered unpromoted"""
+        result = self.create_smart_model(symbol, promote=False, registry=self.shadow.registry)
+        return result['version'] if result else None
+    
+    def current_model(self, symbol):
+        """Model info for a symbol, swapped in when shadow scoring has promoted a new version"""
+        model_info = self.models.get(symbol)
+        entry = self.registry.promoted(f"{symbol}_smart_model")
+        if entry and (model_info is None or entry['version'] != model_info['version']):
+            model_info = self.models[symbol] = {
+                'model': self.registry.load(f"{symbol}_smart_model"),
+                'version': entry['version'],
+                'score': entry['metrics'].get('auc', 0),
+                'feature_cols': entry['features'],
+                'calibrator': Calibrator.from_dict(entry.get('calibration'))
+            }
+            self.logger.info(f"🔄 Using {symbol} model {entry['version']}")
+        return model_info
     
     def generate_smart_signal(self, symbol):
         """Generate smart trading signal with confidence"""
         try:
             # Get latest data
-            data = self.collect_enhanced_data(symbol)
+            with self.tracer.stage("market_data"):
+                data = self.collect_enhanced_data(symbol)
             if data is None or len(data) < 200:
                 return None
             
             # Check if we have a model for this symbol
-            if symbol not in self.models:
+            if self.current_model(symbol) is None:
                 self.logger.info(f"🤖 Creating smart model for {symbol}...")
-                model_result = self.create_smart_model(symbol)
+                with self.tracer.stage("train"):
+                    model_result = self.create_smart_model(symbol)
                 if model_result:
                     self.models[symbol] = model_result
                 else:
@@ -385,8 +436,23 @@ class SmartTradingSystem:
             latest_data = data.iloc[-1]
             features = np.array([latest_data[feature_cols].fillna(0).values])
             
-            # Get prediction and confidence
-            prediction_proba = model.predict_proba(features)[0]
+            # Candidates are scored on the same row in the background; rows old enough to be labelled resolve them
+            name = f"{symbol}_smart_model"
+            self.shadow.observe(name, data.index[-1], latest_data)
+            if len(data) > SHADOW_LABEL_LAG:
+                self.shadow.resolve(name, data.index[-SHADOW_LABEL_LAG],
+                                    data['target_5d'].iloc[-SHADOW_LABEL_LAG])
+            
+            # Get prediction and confidence (cached until a new bar or a new model version)
+            with self.tracer.stage("predict"):
+                cache_args = (model_info['version'], symbol, data.index[-1], features[0])
+                prediction_proba = self.prediction_cache.get(*cache_args)
+                if prediction_proba is None:
+                    prediction_proba = model.predict_proba(features)[0]
+                    if model_info.get('calibrator'):
+                        positive = model_info['calibrator'](prediction_proba[1])
+                        prediction_proba = np.array([1 - positive, positive])
+                    self.prediction_cache.put(*cache_args, prediction_proba)
             confidence = max(prediction_proba)
             prediction = 1 if prediction_proba[1] > 0.5 else 0
             
@@ -489,23 +555,20 @@ class SmartTradingSystem:
     
     def store_trade(self, signal_data, quantity, price, executed):
         """Store trade information for learning"""
-        cursor = self.conn.cursor()
-        
-        cursor.execute('''
+        self.db.execute('''
             INSERT INTO trades 
             (symbol, side, quantity, price, timestamp, confidence, model_version, executed)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?)
         ''', (signal_data['symbol'], signal_data['signal'], quantity, price,
               signal_data['timestamp'], signal_data['confidence'], 
               signal_data['model_version'], executed))
-        
-        self.conn.commit()
     
     def learn_from_outcomes(self):
         """Learn from trade outcomes and improve models"""
         try:
             self.logger.info("🧠 Learning from trade outcomes...")
             
+            self.db.flush()
             cursor = self.conn.cursor()
             
             # Get recent trades with outcomes
@@ -533,7 +596,7 @@ class SmartTradingSystem:
                 success_rate = successful_trades / len(symbol_trades)
                 
                 # Update learning metrics
-                cursor.execute('''
+                self.db.execute('''
                     INSERT INTO learning_metrics 
                     (symbol, timestamp, metric_name, metric_value, improvement_pct, notes)
                     VALUES (?, ?, ?, ?, ?, ?)
@@ -544,16 +607,13 @@ class SmartTradingSystem:
                 if success_rate < 0.6:  # Less than 60% success rate
                     self.logger.info(f"📉 Low success rate for {symbol}: {success_rate:.2f}, retraining...")
                     
-                    # Retrain model
-                    model_result = self.create_smart_model(symbol)
-                    if model_result:
-                        self.models[symbol] = model_result
-                        self.logger.info(f"✅ Model retrained for {symbol}")
+                    # Retrain off the signal thread; the candidate replaces the model only if it scores better live
+                    self.shadow.submit_training(f"{symbol}_smart_model",
+                                                lambda symbol=symbol: self.train_candidate(symbol))
+                    self.logger.info(f"👥 Retraining {symbol} in the background for shadow scoring")
                 
                 self.logger.info(f"📊 {symbol} Success Rate: {success_rate:.2f} ({successful_trades}/{len(symbol_trades)})")
             
-            self.conn.commit()
-            
         except Exception as e:
             self.logger.error(f"❌ Error learning from outcomes: {e}")
     
@@ -585,7 +645,10 @@ class SmartTradingSystem:
     def generate_smart_report(self):
         """Generate comprehensive smart trading report"""
         try:
-            cursor = self.conn.cursor()
+            # Runs in the scheduler's background lane, so it reads through its own connection
+            self.db.flush()
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
             
             # Get performance metrics
             cursor.execute('''
@@ -606,6 +669,7 @@ class SmartTradingSystem:
             ''', ((datetime.now() - timedelta(days=7)).isoformat(),))
             
             trade_stats = cursor.fetchall()
+            conn.close()
             
             # Generate report
             report = {
@@ -614,7 +678,9 @@ class SmartTradingSystem:
                 'min_confidence': self.min_confidence,
                 'model_performance': {symbol: {'auc': auc, 'trades': count} for symbol, auc, count in model_performance},
                 'trade_statistics': {symbol: {'count': count, 'avg_confidence': conf} for symbol, count, conf in trade_stats},
-                'learning_metrics': self.learning_metrics
+                'learning_metrics': self.learning_metrics,
+                'shadow_scoring': self.shadow.stats(),
+                'latency': self.tracer.daily_report()
             }
             
             # Save report
@@ -631,6 +697,7 @@ class SmartTradingSystem:
             
             for symbol, perf in report['model_performance'].items():
                 self.logger.info(f"   {symbol}: AUC = {perf['auc']:.4f}, Trades = {perf['trades']}")
+            self.tracer.log_report(report['latency'])
             
         except Exception as e:
             self.logger.error(f"❌ Error generating smart report: {e}")
@@ -641,20 +708,19 @@ class SmartTradingSystem:
         self.logger.info("🎯 Combines automatic trading with advanced learning")
         self.logger.info("📊 Continuously improves accuracy and confidence")
         
-        # Schedule tasks
-        schedule.every(5).minutes.do(self.execute_smart_strategy)
-        schedule.every().hour.do(self.learn_from_outcomes)
-        schedule.every().hour.do(self.update_confidence_threshold)
-        schedule.every().day.at("17:00").do(self.generate_smart_report)
+        # Schedule tasks on bar closes of the markets being traded; the loop sleeps until the next one
+        assets = sorted({asset_class(symbol) for symbol in self.symbols})
+        self.scheduler.every(5, self.execute_smart_strategy, assets=assets, adaptive=True)
+        self.scheduler.every(60, self.learn_from_outcomes, assets=assets)
+        self.scheduler.every(60, self.update_confidence_threshold, assets=assets)
+        self.scheduler.at_close(self.generate_smart_report, 'equity', offset_minutes=60, lane='background')
         
         # Run initial strategy
         self.execute_smart_strategy()
         
         # Main loop
         try:
-            while True:
-                schedule.run_pending()
-                time.sleep(60)  # Check every minute
+            self.scheduler.run_forever()
                 
         except KeyboardInterrupt:
             self.logger.info("🛑 Smart trading system stopped by user")
@@ -666,24 +732,27 @@ class SmartTradingSystem:
     
     def execute_smart_strategy(self):
         """Execute smart trading strategy"""
-        self.logger.info("🧠 Executing smart trading strategy...")
-        
-        # Generate signals for all symbols
-        signals = []
-        for symbol in self.symbols:
-            signal = self.generate_smart_signal(symbol)
-            if signal:
-                signals.append(signal)
-        
-        # Execute trades based on smart signals
-        trades_executed = 0
-        for signal_data in signals:
-            if signal_data['confidence'] > self.min_confidence:
-                success = self.execute_smart_trade(signal_data)
-                if success:
-                    trades_executed += 1
-        
-        self.logger.info(f"✅ Smart strategy execution complete: {trades_executed} trades executed")
+        with self.tracer.cycle():
+            self.logger.info("🧠 Executing smart trading strategy...")
+            
+            # Generate signals for symbols whose market is in session
+            signals = []
+            with self.tracer.stage("signals"):
+                for symbol in self.scheduler.open_symbols(self.symbols):
+                    signal = self.generate_smart_signal(symbol)
+                    if signal:
+                        signals.append(signal)
+            
+            # Execute trades based on smart signals
+            trades_executed = 0
+            with self.tracer.stage("orders"):
+                for signal_data in signals:
+                    if signal_data['confidence'] > self.min_confidence:
+                        success = self.execute_smart_trade(signal_data)
+                        if success:
+                            trades_executed += 1
+            
+            self.logger.info(f"✅ Smart strategy execution complete: {trades_executed} trades executed")
 
 def main():
     smart_system = SmartTradingSystem()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+State Checkpoint - Crash-safe snapshots of a trader's in-memory state for fast restarts
+- A snapshot is one compressed joblib file (models, calibrators, bars, cooldown timers, watermarks)
+- Written to a unique temp file, fsynced and renamed into place: a crash mid-write never leaves a torn snapshot
+- Saves are serialised, so a background retrain and the signal loop can both checkpoint; the state
+  callable runs under the same lock
+- The last few snapshots are kept; restore takes the newest readable one and skips corrupt files
+- Snapshots older than max_age are ignored, so a long outage still starts from a full warm-up
+"""
+
+import argparse
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import joblib
+
+CHECKPOINT_DIR = "data/checkpoints"
+COMPRESSION = ('zlib', 3)
+FORMAT_VERSION = 1
+KEEP = 3
+INTERVAL_SECONDS = 300
+MAX_AGE_SECONDS = 24 * 3600
+
+
+class StateCheckpoint:
+    """Rotating snapshots of one component's state under <root>/<name>_<time_ns>.ckpt"""
+
+    def __init__(self, name: str, root: str = CHECKPOINT_DIR, interval: float = INTERVAL_SECONDS,
+                 keep: int = KEEP, max_age: Optional[float] = MAX_AGE_SECONDS):
+        self.logger = logging.getLogger(__name__)
+        self.name = name
+        self.root = Path(root)
+        self.interval = interval
+        self.keep = keep
+        self.max_age = max_age
+        self.last_saved = None
+        self.restored = None  # metadata of the snapshot restored at startup
+        self._lock = threading.RLock()
+
+    def snapshots(self) -> List[Path]:
+        """Snapshot files, oldest first (exactly <name>_<time_ns>: "master" must not match "master_x")"""
+        pattern = re.compile(rf"{re.escape(self.name)}_\d+\.ckpt")
+        return sorted(path for path in self.root.glob(f"{self.name}_*.ckpt") if pattern.fullmatch(path.name))
+
+    def save(self, state: Dict) -> Path:
+        with self._lock:
+            return self._save(state)
+
+    def _save(self, state: Dict) -> Path:
+        self.root.mkdir(parents=True, exist_ok=True)
+        payload = {'format': FORMAT_VERSION, 'name': self.name, 'saved_at': time.time(), 'pid': os.getpid(),
+                   'state': state}
+        start = time.perf_counter()
+        fd, tmp = tempfile.mkstemp(prefix=f".{self.name}.", suffix=".tmp", dir=self.root)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                joblib.dump(payload, f, compress=COMPRESSION)
+                f.flush()
+                os.fsync(f.fileno())
+            path = self.root / f"{self.name}_{time.time_ns():020d}.ckpt"
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        # Make the rename itself durable
+        directory = os.open(self.root, os.O_RDONLY)
+        try:
+            os.fsync(directory)
+        finally:
+            os.close(directory)
+
+        for old in self.snapshots()[:-self.keep]:
+            old.unlink(missing_ok=True)
+        self.last_saved = time.monotonic()
+        self.logger.info(f"💾 Checkpoint {path.name} ({path.stat().st_size / 1024:.0f} KB, "
+                         f"{time.perf_counter() - start:.2f}s)")
+        return path
+
+    def due(self) -> bool:
+        return self.last_saved is None or time.monotonic() - self.last_saved >= self.interval
+
+    def save_if_due(self, state: Callable[[], Dict], force: bool = False) -> Optional[Path]:
+        """Snapshot state() when the interval has passed (or force); a failed save is logged, never raised"""
+        with self._lock:
+            if not (force or self.due()):
+                return None
+            try:
+                return self._save(state())
+            except Exception as e:
+                self.logger.error(f"❌ Checkpoint failed: {e}")
+                self.last_saved = time.monotonic()  # retry next interval, not every cycle
+                return None
+
+    def restore(self) -> Optional[Dict]:
+        """State of the newest readable snapshot, or None when there is none (or it is too old)"""
+        for path in reversed(self.snapshots()):
+            try:
+                payload = joblib.load(path)
+            except Exception as e:
+                self.logger.warning(f"⚠️ Skipping unreadable checkpoint {path.name}: {e}")
+                continue
+            if not isinstance(payload, dict) or payload.get('format') != FORMAT_VERSION:
+                self.logger.warning(f"⚠️ Skipping checkpoint {path.name} with unknown format")
+                continue
+            age = time.time() - payload['saved_at']
+            if self.max_age is not None and age > self.max_age:
+                self.logger.info(f"⏳ Latest checkpoint is {age / 3600:.1f}h old - starting from a full warm-up")
+                return None
+            self.restored = {'path': str(path), 'saved_at': payload['saved_at'], 'age_seconds': age}
+            self.logger.info(f"♻️ Restored {path.name} ({age:.0f}s old)")
+            return payload['state']
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect trader state checkpoints")
+    parser.add_argument('--root', default=CHECKPOINT_DIR)
+    parser.add_argument('name', nargs='?', help="component to show (lists all snapshots when omitted)")
+    args = parser.parse_args()
+
+    root = Path(args.root)
+    if args.name is None:
+        for path in sorted(root.glob("*.ckpt")):
+            age = time.time() - path.stat().st_mtime
+            print(f"   {path.name}: {path.stat().st_size / 1024:.0f} KB, {age:.0f}s old")
+        return
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    state = StateCheckpoint(args.name, str(root), max_age=None).restore()
+    if state is None:
+        print(f"❌ No readable checkpoint for {args.name}")
+        return
+    for key, value in state.items():
+        size = f" ({len(value)} entries)" if hasattr(value, '__len__') and not isinstance(value, str) else ""
+        print(f"   {key}: {type(value).__name__}{size}")
+
+
+if __name__ == "__main__":
+    main()
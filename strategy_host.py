@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Strategy Host - Every rule-based signal strategy over one shared market snapshot
+- One batched download per cycle for the union of all registered strategies' symbols
+- One indicator panel per symbol (SMA 5/20/50/200, RSI 14, MACD 12/26/9), computed once and shared
+- Strategies are pure functions of a symbol's panel frame: no I/O, no state, easy to add
+- Each strategy's signals fan out to its sinks (signal bus, log, callbacks); a failing sink or strategy
+  does not stop the others
+- Ten strategies cost the same download as one
+"""
+
+import argparse
+import logging
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+SNAPSHOT_PERIOD = '1y'
+
+
+def load_snapshot(symbols: Iterable[str], period: str = SNAPSHOT_PERIOD) -> Dict[str, pd.DataFrame]:
+    """Daily bars for every symbol in one batched yfinance request"""
+    import yfinance as yf
+
+    symbols = sorted(set(symbols))
+    raw = yf.download(symbols, period=period, interval='1d', group_by='ticker', progress=False)
+    snapshot = {}
+    for symbol in symbols:
+        if isinstance(raw.columns, pd.MultiIndex):
+            if symbol not in raw.columns.get_level_values(0):
+                continue
+            frame = raw[symbol]
+        else:
+            frame = raw
+        frame = frame.dropna(how='all')
+        if not frame.empty:
+            snapshot[symbol] = frame
+    return snapshot
+
+
+def add_indicators(data: pd.DataFrame) -> pd.DataFrame:
+    """The shared indicator set on a copy of daily bars"""
+    df = data.copy()
+    close = df['Close']
+    for window in (5, 20, 50, 200):
+        df[f'sma_{window}'] = close.rolling(window).mean()
+
+    # RSI (simple moving averages of gains and losses)
+    delta = close.diff()
+    gain = (delta.where(delta > 0, 0)).rolling(14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
+    df['rsi'] = 100 - (100 / (1 + gain / loss))
+
+    # MACD
+    df['macd'] = close.ewm(span=12).mean() - close.ewm(span=26).mean()
+    df['macd_signal'] = df['macd'].ewm(span=9).mean()
+    return df
+
+
+# --- strategies: panel frame -> signal dict (None when there is not enough history) ------
+
+def trend_macd(frame: pd.DataFrame) -> Optional[Dict]:
+    """SMA 50/200 trend confirmed by MACD or an oversold RSI (simple_signals.py, daily_trading_signals.py)"""
+    latest = frame.iloc[-1]
+    if latest[['sma_50', 'sma_200', 'rsi', 'macd', 'macd_signal']].isna().any():
+        return None
+    sma_bullish = latest['sma_50'] > latest['sma_200']
+    rsi_oversold = latest['rsi'] < 30
+    rsi_overbought = latest['rsi'] > 70
+    macd_bullish = latest['macd'] > latest['macd_signal']
+
+    if (sma_bullish and macd_bullish) or (sma_bullish and rsi_oversold):
+        action = "BUY"
+    elif not sma_bullish or rsi_overbought:
+        action = "SELL"
+    else:
+        action = "HOLD"
+    return {'action': action, 'confidence': 0.8 if action != "HOLD" else 0.5, 'price': float(latest['Close']),
+            'sma_50': float(latest['sma_50']), 'sma_200': float(latest['sma_200']), 'rsi': float(latest['rsi']),
+            'macd': float(latest['macd']), 'macd_signal': float(latest['macd_signal']),
+            'sma_bullish': bool(sma_bullish), 'macd_bullish': bool(macd_bullish),
+            'rsi_oversold': bool(rsi_oversold), 'rsi_overbought': bool(rsi_overbought)}
+
+
+def trend_rsi(frame: pd.DataFrame) -> Optional[Dict]:
+    """SMA 5/20/50 alignment with RSI extremes (final_working_trader.py, UltimateFreeTrader)"""
+    latest = frame.iloc[-1]
+    if latest[['sma_5', 'sma_20', 'sma_50', 'rsi']].isna().any():
+        return None
+    price, sma_5, sma_20, sma_50, rsi = (float(latest[c]) for c in ('Close', 'sma_5', 'sma_20', 'sma_50', 'rsi'))
+    bullish_trend = sma_5 > sma_20 > sma_50
+    bearish_trend = sma_5 < sma_20 < sma_50
+
+    if bullish_trend and rsi < 70 and price > sma_5:
+        action, confidence = "BUY", 0.8
+    elif bearish_trend and rsi > 30 and price < sma_5:
+        action, confidence = "SELL", 0.8
+    elif rsi > 70 and price < sma_20:
+        action, confidence = "SELL", 0.7
+    elif rsi < 30 and price > sma_20:
+        action, confidence = "BUY", 0.7
+    else:
+        action, confidence = "HOLD", 0.5
+    return {'action': action, 'confidence': confidence, 'price': price, 'rsi': rsi, 'sma_5': sma_5, 'sma_20': sma_20}
+
+
+def sma_crossover(frame: pd.DataFrame) -> Optional[Dict]:
+    """Price above a rising SMA 5/20 crossover (BrowserAutoTrader)"""
+    latest = frame.iloc[-1]
+    if latest[['sma_5', 'sma_20']].isna().any():
+        return None
+    price, sma_5, sma_20 = float(latest['Close']), float(latest['sma_5']), float(latest['sma_20'])
+    if sma_5 > sma_20 and price > sma_5:
+        action, confidence = "BUY", 0.7
+    elif sma_5 < sma_20 and price < sma_5:
+        action, confidence = "SELL", 0.7
+    else:
+        action, confidence = "HOLD", 0.5
+    return {'action': action, 'confidence': confidence, 'price': price, 'sma_5': sma_5, 'sma_20': sma_20}
+
+
+STRATEGIES = {'trend_macd': trend_macd, 'trend_rsi': trend_rsi, 'sma_crossover': sma_crossover}
+
+
+# --- sinks: (strategy name, {symbol: signal}) -> None --------------------------------
+
+def bus_sink(bus=None, skip_hold: bool = True) -> Callable[[str, Dict[str, Dict]], None]:
+    """Append each signal to the signal bus (signal_bus.py) as a trade instruction record"""
+    from signal_bus import SignalBus
+    bus = bus or SignalBus()
+
+    def sink(strategy: str, signals: Dict[str, Dict]):
+        for symbol, signal in signals.items():
+            if skip_hold and signal['action'] == "HOLD":
+                continue
+            bus.append({'timestamp': datetime.now().isoformat(), 'symbol': symbol, 'strategy': strategy, **signal})
+    return sink
+
+
+def log_sink(strategy: str, signals: Dict[str, Dict]):
+    logger = logging.getLogger(__name__)
+    for symbol, signal in signals.items():
+        logger.info(f"📊 [{strategy}] {symbol}: {signal['action']} at ${signal['price']:.2f} "
+                    f"(Confidence: {signal['confidence']:.2f})")
+
+
+class _Registered:
+    def __init__(self, name: str, fn: Callable, symbols: List[str], sinks: List[Callable]):
+        self.name = name
+        self.fn = fn
+        self.symbols = symbols
+        self.sinks = sinks
+
+
+class StrategyHost:
+    """Load one snapshot, build the indicator panel once, evaluate every strategy, fan out"""
+
+    def __init__(self, period: str = SNAPSHOT_PERIOD, loader: Callable = load_snapshot):
+        self.logger = logging.getLogger(__name__)
+        self.period = period
+        self.loader = loader  # (symbols, period) -> {symbol: bars}
+        self.strategies = []
+        self.panel = {}
+
+    def register(self, name: str, fn: Callable, symbols: Iterable[str], sinks: Iterable[Callable] = ()):
+        self.strategies.append(_Registered(name, fn, list(symbols), list(sinks)))
+        return self
+
+    def symbols(self) -> List[str]:
+        return sorted({symbol for strategy in self.strategies for symbol in strategy.symbols})
+
+    def build_panel(self, snapshot: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+        return {symbol: add_indicators(bars) for symbol, bars in snapshot.items()}
+
+    def run_cycle(self) -> Dict[str, Dict[str, Dict]]:
+        """{strategy name: {symbol: signal}} for this cycle"""
+        start = time.perf_counter()
+        self.panel = self.build_panel(self.loader(self.symbols(), self.period))
+        loaded = time.perf_counter()
+
+        results = {}
+        for strategy in self.strategies:
+            signals = {}
+            for symbol in strategy.symbols:
+                if symbol not in self.panel:
+                    continue
+                try:
+                    signal = strategy.fn(self.panel[symbol])
+                except Exception as e:
+                    self.logger.error(f"❌ Strategy {strategy.name} failed for {symbol}: {e}")
+                    continue
+                if signal is not None:
+                    signals[symbol] = signal
+            results[strategy.name] = signals
+
+            for sink in strategy.sinks:
+                try:
+                    sink(strategy.name, signals)
+                except Exception as e:
+                    self.logger.error(f"❌ Sink {getattr(sink, '__name__', sink)} failed for {strategy.name}: {e}")
+
+        self.logger.info(f"🧠 {len(self.strategies)} strategies over {len(self.panel)} symbols: "
+                         f"snapshot {loaded - start:.2f}s, strategies {time.perf_counter() - loaded:.3f}s")
+        return results
+
+
+def run_strategy(fn: Callable, symbols: Iterable[str], period: str = SNAPSHOT_PERIOD,
+                 snapshot: Optional[Dict[str, pd.DataFrame]] = None) -> Dict[str, Dict]:
+    """One strategy through a one-off host: {symbol: signal}; snapshot reuses bars already loaded
+    (e.g. kept warm by signal_daemon.py) instead of downloading"""
+    loader = load_snapshot if snapshot is None else (lambda symbols, period: snapshot)
+    return StrategyHost(period, loader).register(fn.__name__, fn, symbols).run_cycle()[fn.__name__]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run every signal strategy over one shared snapshot")
+    parser.add_argument('--symbols', nargs='+', default=['SPY', 'QQQ', 'IWM', 'VTI'])
+    parser.add_argument('--strategies', nargs='+', default=list(STRATEGIES), choices=list(STRATEGIES))
+    parser.add_argument('--publish', action='store_true', help="append BUY/SELL signals to the signal bus")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    sinks = [log_sink] + ([bus_sink()] if args.publish else [])
+    host = StrategyHost()
+    for name in args.strategies:
+        host.register(name, STRATEGIES[name], args.symbols, sinks)
+    host.run_cycle()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Supervisor - Spawn the trader components, watch their heartbeats, restart them with backoff
+- Children write stdout/stderr straight to their own log file (no undrained pipes)
+- Each child sends JSON heartbeats over a Unix datagram socket: a beat thread every few seconds,
+  plus one at the start and end of every cycle with the cycle stats
+- A child is hung when its beats stop, or when one cycle has run longer than the component allows;
+  hung or exited children are restarted with exponential backoff
+- No process listing: liveness comes from the child's own exit status and its beats
+"""
+
+import argparse
+import json
+import logging
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+SOCKET_PATH = "data/supervisor.sock"
+STATUS_PATH = "data/supervisor_status.json"
+SOCKET_ENV = "AUTOTRADER_SUPERVISOR_SOCKET"
+NAME_ENV = "AUTOTRADER_COMPONENT"
+BEAT_SECONDS = 2.0
+STOP_GRACE_SECONDS = 10
+
+
+# --- component side -----------------------------------------------------------------
+
+class Heartbeat:
+    """Beats from inside a supervised component; a no-op when not started by the supervisor"""
+
+    def __init__(self, name: Optional[str] = None, socket_path: Optional[str] = None,
+                 interval: float = BEAT_SECONDS):
+        self.name = name or os.environ.get(NAME_ENV)
+        self.socket_path = socket_path or os.environ.get(SOCKET_ENV)
+        self.interval = interval
+        self.enabled = bool(self.name and self.socket_path)
+        self.cycles = 0
+        self.busy_since = None
+        self.stats = {}
+        self._lock = threading.Lock()
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) if self.enabled else None
+
+    def start(self) -> "Heartbeat":
+        """Beat every interval seconds from a daemon thread (so idle sleeps between cycles stay alive)"""
+        if self.enabled:
+            def loop():
+                while True:
+                    self.beat()
+                    time.sleep(self.interval)
+            threading.Thread(target=loop, name="heartbeat", daemon=True).start()
+        return self
+
+    def beat(self, **stats):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.stats.update(stats)
+            message = {'name': self.name, 'pid': os.getpid(), 'time': time.time(), 'cycles': self.cycles,
+                       'busy_since': self.busy_since, 'stats': self.stats}
+        try:
+            self._sock.sendto(json.dumps(message, default=str).encode(), self.socket_path)
+        except OSError:
+            pass  # supervisor restarting; the next beat gets through
+
+    @contextmanager
+    def cycle(self):
+        """Mark a cycle in progress (the supervisor times it); beats its duration when done"""
+        self.busy_since = time.time()
+        self.beat()
+        try:
+            yield self
+        finally:
+            seconds = time.time() - self.busy_since
+            self.busy_since = None
+            self.cycles += 1
+            self.beat(last_cycle_seconds=round(seconds, 3), last_cycle_end=time.time())
+
+
+# --- supervisor side ----------------------------------------------------------------
+
+class Component:
+    """A supervised child process"""
+
+    def __init__(self, name: str, command: List[str], log_path: Optional[str] = None,
+                 heartbeat_timeout: float = 15, startup_timeout: float = 120, cycle_timeout: float = 900):
+        self.name = name
+        self.command = command
+        self.log_path = Path(log_path or f"logs/{name}.log")
+        self.heartbeat_timeout = heartbeat_timeout
+        self.startup_timeout = startup_timeout  # imports before the first beat
+        self.cycle_timeout = cycle_timeout  # longest single cycle
+        self.process = None
+        self.started_at = None
+        self.last_beat = None
+        self.beat = {}  # last heartbeat message
+        self.restarts = 0
+        self.failures = 0  # consecutive, drives the backoff
+        self.next_start = 0.0
+        self.last_exit = None
+        self.stop_reason = None  # set while a terminated child is shutting down
+        self.kill_at = None
+
+    @property
+    def running(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+
+class Supervisor:
+    """Keep components alive: spawn, collect heartbeats, restart on exit or hang"""
+
+    def __init__(self, components: List[Component], socket_path: str = SOCKET_PATH,
+                 status_path: str = STATUS_PATH, backoff_base: float = 2, backoff_max: float = 300,
+                 stable_seconds: float = 600, clock: Callable[[], float] = time.time):
+        self.logger = logging.getLogger(__name__)
+        self.components = {component.name: component for component in components}
+        self.socket_path = Path(socket_path)
+        self.status_path = Path(status_path)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.stable_seconds = stable_seconds  # uptime after which the backoff resets
+        self.clock = clock
+        self._sock = None
+        self._stopping = threading.Event()
+
+    def open_socket(self):
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        self.socket_path.unlink(missing_ok=True)
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sock.bind(str(self.socket_path))
+        os.chmod(self.socket_path, 0o600)
+
+    # --- process control ----------------------------------------------------------
+
+    def spawn(self, component: Component):
+        component.log_path.parent.mkdir(parents=True, exist_ok=True)
+        env = dict(os.environ, **{SOCKET_ENV: str(self.socket_path.resolve()), NAME_ENV: component.name})
+        with open(component.log_path, 'ab') as log:
+            component.process = subprocess.Popen(component.command, stdout=log, stderr=subprocess.STDOUT,
+                                                 stdin=subprocess.DEVNULL, env=env, start_new_session=True)
+        component.started_at = self.clock()
+        component.last_beat = None
+        component.beat = {}
+        self.logger.info(f"🚀 Started {component.name} (pid {component.process.pid}) -> {component.log_path}")
+
+    def terminate(self, component: Component, reason: str):
+        """SIGTERM now; check() sends SIGKILL if it is still alive after the grace period"""
+        if component.process.poll() is None:
+            component.process.terminate()
+        component.stop_reason = reason
+        component.kill_at = self.clock() + STOP_GRACE_SECONDS
+
+    def schedule_restart(self, component: Component, reason: str):
+        now = self.clock()
+        if component.started_at is not None and now - component.started_at >= self.stable_seconds:
+            component.failures = 0
+        delay = min(self.backoff_max, self.backoff_base * 2 ** component.failures)
+        component.failures += 1
+        component.restarts += 1
+        component.last_exit = {'time': datetime.now().isoformat(), 'reason': reason}
+        component.next_start = now + delay
+        component.process = None
+        component.stop_reason = component.kill_at = None
+        self.logger.warning(f"⚠️ {component.name} {reason} - restarting in {delay:.0f}s")
+
+    # --- heartbeats ---------------------------------------------------------------
+
+    def receive(self, timeout: float):
+        """Read every heartbeat that arrives within timeout seconds"""
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            self._sock.settimeout(remaining)
+            try:
+                payload = self._sock.recv(65536)
+            except socket.timeout:
+                return
+            try:
+                message = json.loads(payload)
+            except ValueError:
+                continue
+            component = self.components.get(message.get('name'))
+            # Beats from a previous, already replaced process are ignored
+            if component is not None and component.running and message.get('pid') == component.process.pid:
+                component.last_beat = self.clock()
+                component.beat = message
+
+    def hang_reason(self, component: Component) -> Optional[str]:
+        now = self.clock()
+        if component.last_beat is None:
+            if now - component.started_at > component.startup_timeout:
+                return f"sent no heartbeat within {component.startup_timeout:.0f}s of starting"
+            return None
+        if now - component.last_beat > component.heartbeat_timeout:
+            return f"missed heartbeats for {now - component.last_beat:.0f}s"
+        busy_since = component.beat.get('busy_since')
+        if busy_since and time.time() - busy_since > component.cycle_timeout:
+            return f"stuck in one cycle for {time.time() - busy_since:.0f}s"
+        return None
+
+    def check(self):
+        """Restart exited or hung components whose backoff has passed"""
+        for component in self.components.values():
+            if component.process is not None:
+                code = component.process.poll()
+                if code is not None:
+                    self.schedule_restart(component, component.stop_reason or f"exited with code {code}")
+                elif component.stop_reason is not None:
+                    if self.clock() >= component.kill_at:
+                        self.logger.warning(f"⚠️ {component.name} ignored SIGTERM - killing")
+                        component.process.kill()
+                        component.kill_at = float('inf')
+                else:
+                    reason = self.hang_reason(component)
+                    if reason:
+                        self.logger.warning(f"⚠️ {component.name} {reason} - terminating")
+                        self.terminate(component, reason)
+            if component.process is None and self.clock() >= component.next_start:
+                self.spawn(component)
+
+    # --- status -------------------------------------------------------------------
+
+    def status(self) -> Dict[str, Dict]:
+        now = self.clock()
+        status = {}
+        for name, component in self.components.items():
+            beat = component.beat
+            status[name] = {
+                'running': component.running,
+                'pid': component.process.pid if component.running else None,
+                'healthy': component.running and component.last_beat is not None
+                           and self.hang_reason(component) is None,
+                'last_beat_age': None if component.last_beat is None else round(now - component.last_beat, 1),
+                'cycles': beat.get('cycles', 0),
+                'busy': bool(beat.get('busy_since')),
+                'stats': beat.get('stats', {}),
+                'restarts': component.restarts,
+                'last_exit': component.last_exit
+            }
+        return status
+
+    def write_status(self):
+        tmp = self.status_path.with_suffix('.tmp')
+        with open(tmp, 'w') as f:
+            json.dump({'updated': datetime.now().isoformat(), 'supervisor_pid': os.getpid(),
+                       'components': self.status()}, f, indent=2, default=str)
+        os.replace(tmp, self.status_path)
+
+    # --- main loop ----------------------------------------------------------------
+
+    def run(self, should_stop: Callable[[], bool] = lambda: False, tick: float = 1.0):
+        self.open_socket()
+        self.logger.info(f"🛡️ Supervising {', '.join(self.components)} (heartbeats on {self.socket_path})")
+        try:
+            while not (should_stop() or self._stopping.is_set()):
+                self.check()
+                self.receive(tick)
+                self.write_status()
+        finally:
+            self.shutdown()
+
+    def stop(self):
+        self._stopping.set()
+
+    def shutdown(self):
+        running = [component for component in self.components.values() if component.running]
+        for component in running:
+            self.terminate(component, "supervisor stopped")
+        for component in running:
+            try:
+                component.process.wait(timeout=max(0.0, component.kill_at - self.clock()))
+            except subprocess.TimeoutExpired:
+                component.process.kill()
+                component.process.wait()
+        if self._sock is not None:
+            self._sock.close()
+            self.socket_path.unlink(missing_ok=True)
+        self.write_status()
+        self.logger.info("🏁 Supervisor stopped; all components terminated")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run trader scripts under heartbeat supervision")
+    parser.add_argument('scripts', nargs='+', help="python scripts to supervise, e.g. master_orchestrator.py")
+    parser.add_argument('--heartbeat-timeout', type=float, default=15)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    supervisor = Supervisor([Component(Path(script).stem, [sys.executable, script],
+                                       heartbeat_timeout=args.heartbeat_timeout) for script in args.scripts])
+    signal.signal(signal.SIGTERM, lambda *_: supervisor.stop())
+    try:
+        supervisor.run()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -9,8 +9,11 @@ echo "🔄 $(date): AutoTrader Model Sync Starting..."
 # Pull latest changes first
 git pull origin main --rebase
 
-# Add trained models
-git add research/models/*.pkl 2>/dev/null
+# Prune old model versions (promoted + recent + best are kept) and report the space saved
+python3 artifact_store.py --root research/models
+
+# Add trained models: manifest, compressed store and deletions of pruned versions
+git add -A research/models 2>/dev/null
 git add latest_auc.txt 2>/dev/null
 git add logs/training.log 2>/dev/null
 
@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+"""
+Tree Compiler - Flatten tree ensembles into NumPy node arrays for low-latency scoring
+- Compiles LightGBM (Booster or LGBMClassifier), XGBoost and sklearn random forests
+- Every tree is advanced one level per step, so a single row costs depth x a few NumPy ops
+- Reproduces each library's split rule, missing-value routing and output accumulation order
+- Compiled models load with NumPy only; the training library is not imported
+- Benchmark mode compares per-bar latency and agreement against the original models
+"""
+
+import argparse
+import json
+import logging
+import math
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# LightGBM treats |x| <= kZeroThreshold as zero for zero-as-missing splits
+LGB_ZERO_THRESHOLD = 1e-35
+# Missing-value routing codes stored per node
+MISSING_NONE, MISSING_ZERO, MISSING_NAN = 0, 1, 2
+
+ARRAY_NAMES = ['feature', 'threshold', 'left', 'right', 'default_left', 'missing_type', 'value', 'roots']
+
+
+class CompiledTrees:
+    """Flat-array tree ensemble with the predict/predict_proba interface of the source model"""
+
+    def __init__(self, header: Dict, arrays: Dict[str, np.ndarray]):
+        self.header = header
+        self.kind = header['kind']
+        self.depth = header['depth']
+        self.booster_api = header['booster_api']
+        self.classes_ = np.asarray(header['classes'])
+        if header.get('feature_names') and not self.booster_api:
+            self.feature_names_in_ = np.asarray(header['feature_names'], dtype=object)
+        self.n_features_in_ = header['n_features']
+
+        for name in ARRAY_NAMES:
+            setattr(self, name, arrays[name])
+        self.n_trees = len(self.roots)
+        # Interleaved [left, right] pairs so one gather picks the next node
+        self.children = np.column_stack([self.left, self.right]).ravel()
+        self.has_zero_missing = bool((self.missing_type == MISSING_ZERO).any())
+
+    def _prepare(self, X) -> np.ndarray:
+        """Cast inputs the way the source library does before comparing"""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if self.kind == 'xgboost':
+            return X.astype(np.float32)
+        if self.kind == 'sklearn_forest':
+            # sklearn casts to float32, then compares against float64 thresholds
+            return X.astype(np.float32).astype(np.float64)
+        return X
+
+    def leaf_indices(self, X) -> np.ndarray:
+        """Leaf node of every (row, tree) pair"""
+        X = self._prepare(X)
+        n_rows, n_features = X.shape
+        flat_X = X.ravel()
+        row_offset = (np.arange(n_rows) * n_features)[:, None]
+        idx = np.repeat(self.roots[None, :], n_rows, axis=0)
+        check_missing = self.has_zero_missing or np.isnan(flat_X).any()
+
+        for _ in range(self.depth):
+            x = flat_X.take(row_offset + self.feature.take(idx))
+            threshold = self.threshold.take(idx)
+            # xgboost goes left on x < threshold; LightGBM and sklearn on x <= threshold
+            go_right = x >= threshold if self.kind == 'xgboost' else x > threshold
+            if check_missing:
+                missing_type = self.missing_type.take(idx)
+                is_nan = np.isnan(x)
+                if self.kind == 'lightgbm':
+                    # NaN counts as zero unless the split routes NaN explicitly
+                    x = np.where(is_nan & (missing_type != MISSING_NAN), 0.0, x)
+                    go_right = x > threshold
+                    use_default = ((missing_type == MISSING_NAN) & is_nan) | \
+                                  ((missing_type == MISSING_ZERO) & (np.abs(x) <= LGB_ZERO_THRESHOLD))
+                else:
+                    use_default = is_nan
+                go_right = np.where(use_default, ~self.default_left.take(idx), go_right)
+            # Leaves point at themselves, so finished trees stay put
+            idx = self.children.take(2 * idx + go_right)
+        return idx
+
+    def raw_score(self, X) -> np.ndarray:
+        """Margin (boosters) or averaged class probabilities (forests)"""
+        leaves = self.leaf_indices(X)
+        if self.kind == 'sklearn_forest':
+            # Sequential sum in estimator order, as RandomForestClassifier accumulates it
+            return np.cumsum(self.value[leaves], axis=1)[:, -1] / self.n_trees
+        values = self.value[leaves, 0]
+        if self.kind == 'xgboost':
+            base = np.full((len(values), 1), self.header['base_margin'], dtype=np.float32)
+            return np.cumsum(np.concatenate([base, values], axis=1), axis=1, dtype=np.float32)[:, -1]
+        return np.cumsum(values, axis=1)[:, -1]
+
+    def predict_positive(self, X) -> np.ndarray:
+        """Probability of the positive class"""
+        raw = self.raw_score(X)
+        if self.kind == 'sklearn_forest':
+            return raw[:, -1]
+        if self.kind == 'xgboost':
+            # xgboost's Sigmoid: 1 / (expf(min(-x, 88.7)) + 1 + eps) in float32; margins match bit for bit,
+            # probabilities to within one float32 ulp (xgboost's vectorised expf rounds differently)
+            e = np.exp(np.minimum(-raw, np.float32(88.7)).astype(np.float64)).astype(np.float32)
+            return np.float32(1) / (e + np.float32(1) + np.float32(1e-16))
+        # libm exp rather than NumPy's SIMD exp, which can differ from LightGBM's in the last bit
+        margin = -self.header['sigmoid'] * raw
+        return 1.0 / (1.0 + np.fromiter((math.exp(m) for m in margin), dtype=np.float64, count=len(margin)))
+
+    def predict_proba(self, X) -> np.ndarray:
+        if self.kind == 'sklearn_forest':
+            return self.raw_score(X)
+        p = self.predict_positive(X)
+        return np.vstack((1 - p, p)).T
+
+    def predict(self, X) -> np.ndarray:
+        """Booster.predict returns probabilities; classifiers return labels"""
+        if self.booster_api:
+            return self.predict_positive(X)
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    def save(self, path) -> Path:
+        path = Path(path)
+        with open(path, 'wb') as f:
+            np.savez(f, header=np.array(json.dumps(self.header)),
+                     **{name: getattr(self, name) for name in ARRAY_NAMES})
+        return path
+
+    @classmethod
+    def load(cls, path) -> 'CompiledTrees':
+        with np.load(path, allow_pickle=False) as data:
+            header = json.loads(str(data['header']))
+            return cls(header, {name: data[name] for name in ARRAY_NAMES})
+
+
+class _Builder:
+    """Accumulates nodes of many trees into flat arrays"""
+
+    def __init__(self, threshold_dtype=np.float64, value_dtype=np.float64, n_outputs: int = 1):
+        self.threshold_dtype = threshold_dtype
+        self.value_dtype = value_dtype
+        self.n_outputs = n_outputs
+        self.nodes = {name: [] for name in ARRAY_NAMES if name != 'roots'}
+        self.roots = []
+        self.depth = 0
+
+    def add(self, feature=0, threshold=0.0, default_left=False, missing_type=MISSING_NONE, value=None) -> int:
+        node = len(self.nodes['feature'])
+        self.nodes['feature'].append(feature)
+        self.nodes['threshold'].append(threshold)
+        self.nodes['left'].append(node)
+        self.nodes['right'].append(node)
+        self.nodes['default_left'].append(default_left)
+        self.nodes['missing_type'].append(missing_type)
+        self.nodes['value'].append(value if value is not None else [0.0] * self.n_outputs)
+        return node
+
+    def link(self, node: int, left: int, right: int):
+        self.nodes['left'][node] = left
+        self.nodes['right'][node] = right
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {
+            'feature': np.asarray(self.nodes['feature'], dtype=np.int32),
+            'threshold': np.asarray(self.nodes['threshold'], dtype=self.threshold_dtype),
+            'left': np.asarray(self.nodes['left'], dtype=np.int32),
+            'right': np.asarray(self.nodes['right'], dtype=np.int32),
+            'default_left': np.asarray(self.nodes['default_left'], dtype=bool),
+            'missing_type': np.asarray(self.nodes['missing_type'], dtype=np.uint8),
+            'value': np.asarray(self.nodes['value'], dtype=self.value_dtype).reshape(-1, self.n_outputs),
+            'roots': np.asarray(self.roots, dtype=np.int32),
+        }
+
+
+def _compile_lightgbm(booster, booster_api: bool, classes, feature_names) -> CompiledTrees:
+    best = booster.best_iteration if booster.best_iteration and booster.best_iteration > 0 else None
+    dump = booster.dump_model(num_iteration=best)
+    objective = dump['objective'].split()
+    if objective[0] != 'binary' or dump['num_class'] != 1 or dump['average_output']:
+        raise ValueError(f"Only binary LightGBM boosters can be compiled (got {dump['objective']})")
+    sigmoid = float(next((o.split(':')[1] for o in objective if o.startswith('sigmoid:')), 1.0))
+    missing_codes = {'None': MISSING_NONE, 'Zero': MISSING_ZERO, 'NaN': MISSING_NAN}
+
+    builder = _Builder()
+
+    def add_node(node: Dict, depth: int) -> int:
+        builder.depth = max(builder.depth, depth)
+        if 'leaf_value' in node:
+            return builder.add(value=[node['leaf_value']])
+        if node['decision_type'] != '<=':
+            raise ValueError("Categorical LightGBM splits are not supported")
+        index = builder.add(feature=node['split_feature'], threshold=node['threshold'],
+                            default_left=node['default_left'], missing_type=missing_codes[node['missing_type']])
+        builder.link(index, add_node(node['left_child'], depth + 1), add_node(node['right_child'], depth + 1))
+        return index
+
+    for tree in dump['tree_info']:
+        builder.roots.append(add_node(tree['tree_structure'], 0))
+
+    header = {'kind': 'lightgbm', 'depth': builder.depth, 'booster_api': booster_api, 'sigmoid': sigmoid,
+              'classes': list(classes), 'feature_names': feature_names, 'n_features': dump['max_feature_idx'] + 1}
+    return CompiledTrees(header, builder.arrays())
+
+
+def _compile_xgboost(booster, booster_api: bool, classes, feature_names, n_trees: Optional[int] = None) -> CompiledTrees:
+    learner = json.loads(booster.save_raw('json'))['learner']
+    if learner['objective']['name'] != 'binary:logistic' or learner['gradient_booster']['name'] != 'gbtree':
+        raise ValueError(f"Only binary:logistic gbtree models can be compiled (got {learner['objective']['name']})")
+    base_score = np.float32(float(learner['learner_model_param']['base_score'].strip('[]')))
+    # ProbToMargin in float32, as xgboost computes it
+    base_margin = float(np.float32(-np.log(np.float32(1) / base_score - np.float32(1))))
+
+    builder = _Builder(threshold_dtype=np.float32, value_dtype=np.float32)
+    trees = learner['gradient_booster']['model']['trees'][:n_trees]
+    for tree in trees:
+        if any(tree['split_type']):
+            raise ValueError("Categorical XGBoost splits are not supported")
+        left, right = tree['left_children'], tree['right_children']
+        offset = len(builder.nodes['feature'])
+        depths = [0] * len(left)
+        for node in range(len(left)):
+            if left[node] == -1:
+                builder.add(value=[tree['split_conditions'][node]])
+            else:
+                builder.add(feature=tree['split_indices'][node], threshold=tree['split_conditions'][node],
+                            default_left=bool(tree['default_left'][node]), missing_type=MISSING_NAN)
+                depths[left[node]] = depths[right[node]] = depths[node] + 1
+        for node in range(len(left)):
+            if left[node] != -1:
+                builder.link(offset + node, offset + left[node], offset + right[node])
+        builder.roots.append(offset)
+        builder.depth = max(builder.depth, max(depths))
+
+    header = {'kind': 'xgboost', 'depth': builder.depth, 'booster_api': booster_api, 'base_margin': base_margin,
+              'classes': list(classes), 'feature_names': feature_names,
+              'n_features': int(learner['learner_model_param']['num_feature'])}
+    return CompiledTrees(header, builder.arrays())
+
+
+def _compile_forest(forest) -> CompiledTrees:
+    n_classes = len(forest.classes_)
+    builder = _Builder(n_outputs=n_classes)
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        if tree.n_outputs != 1:
+            raise ValueError("Multi-output forests are not supported")
+        missing_left = getattr(tree, 'missing_go_to_left', np.zeros(tree.node_count, dtype=np.uint8))
+        values = tree.value[:, 0, :]
+        normalizer = values.sum(axis=1, keepdims=True)
+        normalizer[normalizer == 0.0] = 1.0
+        proba = values / normalizer
+
+        offset = len(builder.nodes['feature'])
+        for node in range(tree.node_count):
+            if tree.children_left[node] == -1:
+                builder.add(value=list(proba[node]))
+            else:
+                builder.add(feature=int(tree.feature[node]), threshold=float(tree.threshold[node]),
+                            default_left=bool(missing_left[node]), missing_type=MISSING_NAN)
+        for node in range(tree.node_count):
+            if tree.children_left[node] != -1:
+                builder.link(offset + node, offset + tree.children_left[node], offset + tree.children_right[node])
+        builder.roots.append(offset)
+        builder.depth = max(builder.depth, tree.max_depth)
+
+    feature_names = list(getattr(forest, 'feature_names_in_', [])) or None
+    header = {'kind': 'sklearn_forest', 'depth': builder.depth, 'booster_api': False,
+              'classes': forest.classes_.tolist(), 'feature_names': feature_names,
+              'n_features': int(forest.n_features_in_)}
+    return CompiledTrees(header, builder.arrays())
+
+
+def compile_model(model) -> CompiledTrees:
+    """Compile a LightGBM Booster/LGBMClassifier, XGBoost Booster/XGBClassifier or sklearn forest classifier"""
+    module = type(model).__module__
+    if module.startswith('lightgbm'):
+        if hasattr(model, 'booster_'):
+            return _compile_lightgbm(model.booster_, False, model.classes_.tolist(),
+                                     list(getattr(model, 'feature_names_in_', [])) or None)
+        return _compile_lightgbm(model, True, [0, 1], None)
+    if module.startswith('xgboost'):
+        if hasattr(model, 'get_booster'):
+            n_trees = None
+            try:
+                # Early-stopped classifiers predict with the best iteration only
+                n_trees = model.best_iteration + 1
+            except AttributeError:
+                pass
+            return _compile_xgboost(model.get_booster(), False, model.classes_.tolist(),
+                                    list(getattr(model, 'feature_names_in_', [])) or None, n_trees)
+        return _compile_xgboost(model, True, [0, 1], None)
+    if hasattr(model, 'estimators_') and hasattr(model, 'classes_') and \
+            all(hasattr(e, 'tree_') for e in model.estimators_):
+        return _compile_forest(model)
+    raise ValueError(f"Cannot compile {type(model).__name__}")
+
+
+def compile_registered(registry, name: str, version: Optional[str] = None, model=None) -> Optional[Path]:
+    """Compile a registered model version (promoted by default) and record it in the manifest"""
+    logger = logging.getLogger(__name__)
+    entry = registry.versions(name).get(version) if version else registry.promoted(name)
+    if entry is None:
+        logger.warning(f"⚠️ {name} has no {'version ' + version if version else 'promoted version'}")
+        return None
+    version = version or entry['version']
+    model_path = registry.model_path(entry)
+    try:
+        if model is None:
+            import joblib
+            model = joblib.load(model_path)
+        compiled = compile_model(model)
+    except ValueError as e:
+        logger.info(f"⏭️ Not compiling {name} {version}: {e}")
+        return None
+
+    # Native single-row paths can already be faster (LightGBM's C++ predictor usually is)
+    probe = np.zeros((1, compiled.n_features_in_))
+    if getattr(model, 'feature_names_in_', None) is not None:
+        import pandas as pd
+        probe = pd.DataFrame(probe, columns=model.feature_names_in_)
+    original_fn = model.predict if compiled.booster_api else model.predict_proba
+    fast_fn = compiled.predict if compiled.booster_api else compiled.predict_proba
+    original_s, compiled_s = _time_per_call(original_fn, probe, 20), _time_per_call(fast_fn, probe, 20)
+    if compiled_s >= original_s:
+        logger.info(f"⏭️ Not compiling {name} {version}: native {original_s * 1e6:.0f}µs "
+                    f"vs compiled {compiled_s * 1e6:.0f}µs per row")
+        return None
+
+    compiled_path = compiled.save(model_path.with_suffix('.trees.npz'))
+    try:
+        recorded_path = str(compiled_path.resolve().relative_to(registry.root.resolve()))
+    except ValueError:
+        recorded_path = str(compiled_path.resolve())
+    registry.annotate(name, version, compiled_path=recorded_path)
+    logger.info(f"🌲 Compiled {name} {version} → {compiled_path.name} "
+                f"({original_s / compiled_s:.1f}x faster per row)")
+    return compiled_path
+
+
+def _time_per_call(fn, X, repeats: int) -> float:
+    fn(X)  # warm-up
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(X)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings))
+
+
+def benchmark(model, compiled: CompiledTrees, X: np.ndarray, repeats: int = 200,
+              batch_sizes: List[int] = (1, 8, 64)) -> List[Dict]:
+    """Median latency of the original vs the compiled model, plus their largest disagreement"""
+    original = model.predict if compiled.booster_api else model.predict_proba
+    fast = compiled.predict if compiled.booster_api else compiled.predict_proba
+    max_diff = float(np.max(np.abs(np.asarray(original(X)) - fast(X))))
+
+    results = []
+    for batch in batch_sizes:
+        rows = X[-batch:]
+        original_s = _time_per_call(original, rows, repeats)
+        compiled_s = _time_per_call(fast, rows, repeats)
+        results.append({'batch': batch, 'original_us': original_s * 1e6, 'compiled_us': compiled_s * 1e6,
+                        'speedup': original_s / compiled_s, 'max_abs_diff': max_diff})
+    return results
+
+
+def _benchmark_models():
+    """Models shaped like the ones the traders and LEAN algorithms score, trained on bundled SPY data"""
+    import lightgbm as lgb
+    import xgboost as xgb
+    from sklearn.ensemble import RandomForestClassifier
+
+    from lean_data import load_equity_daily
+    from research.scripts.train_lightgbm import FEATURES, LGB_PARAMS, NUM_BOOST_ROUND, build_features
+
+    df = build_features(load_equity_daily('SPY').rename(columns=str.lower))
+    X, y = df[FEATURES].values, df['target'].values
+    return X, {
+        'lgb.Booster (LEAN)': lgb.train(LGB_PARAMS, lgb.Dataset(X, label=y), num_boost_round=NUM_BOOST_ROUND),
+        'XGBClassifier': xgb.XGBClassifier(n_estimators=100, random_state=42).fit(X, y),
+        'RandomForest (traders)': RandomForestClassifier(n_estimators=100, max_depth=10, random_state=42).fit(X, y),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile tree models to flat NumPy arrays")
+    sub = parser.add_subparsers(dest='command', required=True)
+    compile_cmd = sub.add_parser('compile', help="Compile promoted registry models")
+    compile_cmd.add_argument('names', nargs='*', help="Model names (default: every promoted model)")
+    compile_cmd.add_argument('--root', default="models")
+    bench_cmd = sub.add_parser('benchmark', help="Per-bar latency of original vs compiled models")
+    bench_cmd.add_argument('--repeats', type=int, default=200)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    if args.command == 'compile':
+        from model_registry import ModelRegistry
+        registry = ModelRegistry(args.root)
+        for name in args.names or list(registry.manifest().get('promoted', {})):
+            compile_registered(registry, name)
+        return
+
+    X, models = _benchmark_models()
+    print(f"{'model':<24}{'batch':>6}{'original µs':>14}{'compiled µs':>14}{'speedup':>9}{'max |Δ|':>11}")
+    for label, model in models.items():
+        for r in benchmark(model, compile_model(model), X, repeats=args.repeats):
+            print(f"{label:<24}{r['batch']:>6}{r['original_us']:>14.1f}{r['compiled_us']:>14.1f}"
+                  f"{r['speedup']:>8.1f}x{r['max_abs_diff']:>11.1e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,7 @@ This is the most cost-effective trading solution:
 Usage: python ultimate_free_trader.py
 """
 
+import importlib.util
 import time
 import json
 import logging
@@ -21,21 +22,12 @@ import threading
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List
-import yfinance as yf
 import pandas as pd
+from strategy_host import run_strategy, trend_rsi
+from signal_bus import SignalBus, SignalConsumer
 
-# Browser automation imports
-try:
-    from selenium import webdriver
-    from selenium.webdriver.common.by import By
-    from selenium.webdriver.support.ui import WebDriverWait
-    from selenium.webdriver.support import expected_conditions as EC
-    from selenium.webdriver.chrome.options import Options
-    from selenium.webdriver.common.keys import Keys
-    from selenium.common.exceptions import TimeoutException, NoSuchElementException
-    SELENIUM_AVAILABLE = True
-except ImportError:
-    SELENIUM_AVAILABLE = False
+# Browser automation: Selenium is imported in setup_browser, only when a browser is used
+SELENIUM_AVAILABLE = importlib.util.find_spec('selenium') is not None
 
 class UltimateFreeTrader:
     """The most cost-effective automatic trading system"""
@@ -70,6 +62,9 @@ class UltimateFreeTrader:
         self.stop_loss_pct = 0.05  # 5% stop loss
         self.take_profit_pct = 0.15  # 15% take profit
         
+        # Master Orchestrator trade instructions not yet acted on
+        self.signal_consumer = SignalConsumer(SignalBus(), 'ultimate_free_trader')
+        
         self.logger.info("💰 Ultimate Free Trader initialized")
         self.logger.info(f"🌐 Selenium available: {SELENIUM_AVAILABLE}")
     
@@ -101,6 +96,9 @@ class UltimateFreeTrader:
             return False
         
         try:
+            from selenium import webdriver
+            from selenium.webdriver.chrome.options import Options
+            
             chrome_options = Options()
             
             # Configure for stealth operation
@@ -138,13 +136,13 @@ class UltimateFreeTrader:
         
         try:
             # Try to read from Master Orchestrator
-            signals_file = Path("signals/manual_trades.json")
-            if signals_file.exists():
-                with open(signals_file, 'r') as f:
-                    manual_trades = json.load(f)
+            if self.signal_consumer.bus.exists():
+                # Only instructions appended since the last cycle; committed now so none is executed twice
+                manual_trades = self.signal_consumer.poll()
+                self.signal_consumer.commit()
                 
                 # Get the latest trade for each symbol
-                for trade in manual_trades[-10:]:  # Last 10 trades
+                for trade in manual_trades:
                     symbol = trade['symbol']
                     if symbol not in signals or trade['timestamp'] > signals[symbol]['timestamp']:
                         signals[symbol] = {
@@ -167,74 +165,32 @@ class UltimateFreeTrader:
         return self.generate_simple_signals()
     
     def generate_simple_signals(self) -> Dict[str, Dict]:
-        """Generate simple trading signals as fallback"""
+        """Generate simple trading signals as fallback (trend_rsi over one shared snapshot)"""
         
         signals = {}
         
-        for symbol in self.symbols:
-            try:
-                # Get current price and indicators
-                data = yf.download(symbol, period='1y', interval='1d')
-                if data.empty:
-                    continue
-                
-                current_price = data['Close'].iloc[-1]
-                
-                # Simple SMA crossover strategy
-                sma_5 = data['Close'].rolling(5).mean().iloc[-1]
-                sma_20 = data['Close'].rolling(20).mean().iloc[-1]
-                sma_50 = data['Close'].rolling(50).mean().iloc[-1]
-                
-                # RSI
-                delta = data['Close'].diff()
-                gain = (delta.where(delta > 0, 0)).rolling(14).mean()
-                loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
-                rs = gain / loss
-                rsi = (100 - (100 / (1 + rs))).iloc[-1]
-                
-                # Signal logic
-                bullish_trend = (sma_5 > sma_20) and (sma_20 > sma_50)
-                bearish_trend = (sma_5 < sma_20) and (sma_20 < sma_50)
-                rsi_oversold = rsi < 30
-                rsi_overbought = rsi > 70
-                
-                if bullish_trend and rsi < 70 and current_price > float(sma_5):
-                    action = "BUY"
-                    confidence = 0.8
-                elif bearish_trend and rsi > 30 and current_price < float(sma_5):
-                    action = "SELL"
-                    confidence = 0.8
-                elif rsi_overbought and current_price < float(sma_20):
-                    action = "SELL"
-                    confidence = 0.7
-                elif rsi_oversold and current_price > float(sma_20):
-                    action = "BUY"
-                    confidence = 0.7
-                else:
-                    action = "HOLD"
-                    confidence = 0.5
-                
-                # Calculate position size
-                position_value = self.portfolio_value * self.max_position_size
-                quantity = max(1, int(position_value / current_price))
-                
-                signals[symbol] = {
-                    'action': action,
-                    'price': float(current_price),
-                    'quantity': quantity,
-                    'confidence': confidence,
-                    'timestamp': datetime.now().isoformat(),
-                    'stop_loss': float(current_price * (1 - self.stop_loss_pct)) if action == "BUY" else 0,
-                    'take_profit': float(current_price * (1 + self.take_profit_pct)) if action == "BUY" else 0,
-                    'rsi': float(rsi),
-                    'sma_5': float(sma_5),
-                    'sma_20': float(sma_20)
-                }
-                
-                self.logger.info(f"📊 {symbol}: {action} at ${current_price:.2f} (Confidence: {confidence:.2f}, RSI: {rsi:.1f})")
-                
-            except Exception as e:
-                self.logger.error(f"Error generating signal for {symbol}: {e}")
+        try:
+            results = run_strategy(trend_rsi, self.symbols)
+        except Exception as e:
+            self.logger.error(f"Error generating signals: {e}")
+            return signals
+        
+        for symbol, signal in results.items():
+            action, current_price = signal['action'], signal['price']
+            
+            # Calculate position size
+            position_value = self.portfolio_value * self.max_position_size
+            quantity = max(1, int(position_value / current_price))
+            
+            signals[symbol] = {
+                **signal,
+                'quantity': quantity,
+                'timestamp': datetime.now().isoformat(),
+                'stop_loss': float(current_price * (1 - self.stop_loss_pct)) if action == "BUY" else 0,
+                'take_profit': float(current_price * (1 + self.take_profit_pct)) if action == "BUY" else 0
+            }
+            
+            self.logger.info(f"📊 {symbol}: {action} at ${current_price:.2f} (Confidence: {signal['confidence']:.2f}, RSI: {signal['rsi']:.1f})")
         
         return signals
     
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Purged Walk-Forward Validation - One validation engine for every training path
+- Expanding-window folds that only ever train on the past
+- Purge window drops training rows whose label horizon overlaps the test block
+- Embargo window adds a further gap for serially correlated features
+- Folds run in parallel across processes on memory-mapped cached feature matrices, one cache directory
+  per component, keyed on the matrix and label values
+- Fold-level metrics are written to SQLite in one bulk insert
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+# Superseded cache files are removed only once nothing can still be memory-mapping them
+STALE_CACHE_SECONDS = 3600
+
+
+class PurgedWalkForward:
+    """Walk-forward splitter with purge and embargo (sklearn splitter interface)"""
+
+    def __init__(self, n_splits: int = 5, purge: int = 5, embargo: int = 0,
+                 min_train_size: int = 50, max_train_size: Optional[int] = None):
+        self.n_splits = n_splits
+        self.purge = purge
+        self.embargo = embargo
+        self.min_train_size = min_train_size
+        self.max_train_size = max_train_size
+
+    def get_n_splits(self, X=None, y=None, groups=None) -> int:
+        return self.n_splits
+
+    def split(self, X, y=None, groups=None):
+        n_samples = len(X)
+        test_size = n_samples // (self.n_splits + 1)
+        if test_size < 1:
+            raise ValueError(f"Too few samples ({n_samples}) for {self.n_splits} walk-forward folds")
+
+        indices = np.arange(n_samples)
+        for fold in range(self.n_splits):
+            test_start = n_samples - (self.n_splits - fold) * test_size
+            test_end = test_start + test_size
+            train_end = test_start - self.purge - self.embargo
+            if train_end < self.min_train_size:
+                continue
+            train_start = max(0, train_end - self.max_train_size) if self.max_train_size else 0
+            yield indices[train_start:train_end], indices[test_start:test_end]
+
+
+def _run_fold(estimator, X_path: str, y_path: str, fold: int, train_idx, test_idx) -> Dict:
+    """Fit and score one fold (runs in a worker process)"""
+    from sklearn.base import clone
+    from sklearn.metrics import accuracy_score, roc_auc_score
+
+    X = np.load(X_path, mmap_mode='r')
+    y = np.load(y_path, mmap_mode='r')
+    y_train, y_test = y[train_idx], y[test_idx]
+
+    result = {'fold': fold, 'n_train': len(train_idx), 'n_test': len(test_idx),
+              'test_idx': test_idx, 'auc': None, 'accuracy': None, 'fit_seconds': 0.0, 'proba': None}
+    if len(np.unique(y_train)) < 2:
+        return result
+
+    model = clone(estimator)
+    start = time.perf_counter()
+    model.fit(X[train_idx], y_train)
+    result['fit_seconds'] = time.perf_counter() - start
+
+    proba = model.predict_proba(X[test_idx])[:, 1]
+    result['proba'] = proba
+    result['accuracy'] = accuracy_score(y_test, (proba > 0.5).astype(int))
+    if len(np.unique(y_test)) > 1:
+        result['auc'] = roc_auc_score(y_test, proba)
+    return result
+
+
+class WalkForwardValidator:
+    """Runs purged walk-forward folds in parallel and records fold-level metrics"""
+
+    def __init__(self, n_splits: int = 5, purge: int = 5, embargo: int = 0, n_jobs: int = -1,
+                 cache_dir: str = "data/feature_cache", min_train_size: int = 50, component: str = "default"):
+        self.logger = logging.getLogger(__name__)
+        self.splitter = PurgedWalkForward(n_splits=n_splits, purge=purge, embargo=embargo,
+                                          min_train_size=min_train_size)
+        self.n_jobs = n_jobs
+        # Components validate the same symbol names, so each gets its own directory
+        self.cache_dir = Path(cache_dir) / component
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def _arrays(X, y):
+        return np.ascontiguousarray(np.asarray(X, dtype=np.float64)), np.ascontiguousarray(np.asarray(y))
+
+    def feature_key(self, name: str, X, y) -> str:
+        """Cache key from the name, columns and the values of the feature matrix and labels"""
+        X_values, y_values = self._arrays(X, y)
+        digest = hashlib.sha1(','.join(map(str, getattr(X, 'columns', []))).encode())
+        for values in (X_values, y_values):
+            digest.update(f"|{values.shape}|{values.dtype}|".encode())
+            digest.update(values.tobytes())
+        safe_name = name.replace('/', '_').replace('-', '_')
+        return f"{safe_name}__{digest.hexdigest()[:16]}"
+
+    def cache_features(self, key: str, X, y):
+        """Write X and y to the cache once; later calls with the same key reuse the files"""
+        X_path = self.cache_dir / f"{key}_X.npy"
+        y_path = self.cache_dir / f"{key}_y.npy"
+        if X_path.exists() and y_path.exists():
+            for path in (X_path, y_path):
+                os.utime(path)  # in use: keep it out of stale cleanup
+        else:
+            for path, values in zip((X_path, y_path), self._arrays(X, y)):
+                fd, tmp = tempfile.mkstemp(dir=self.cache_dir, prefix=f".{path.name}.", suffix=".tmp")
+                with os.fdopen(fd, 'wb') as f:
+                    np.save(f, values)
+                os.replace(tmp, path)
+        self._remove_stale(key)
+        return str(X_path), str(y_path)
+
+    def _remove_stale(self, key: str):
+        """Delete superseded files of the same name once they are old enough that no fold still maps them"""
+        prefix = key.rsplit('__', 1)[0]
+        cutoff = time.time() - STALE_CACHE_SECONDS
+        for stale in self.cache_dir.glob(f"{prefix}__*.npy"):
+            try:
+                if not stale.name.startswith(key) and stale.stat().st_mtime < cutoff:
+                    stale.unlink()
+            except FileNotFoundError:
+                pass
+
+    def validate(self, estimator, X, y, name: str = "features") -> Dict:
+        """Run every fold for one estimator and return fold metrics plus out-of-fold predictions"""
+        key = self.feature_key(name, X, y)
+        X_path, y_path = self.cache_features(key, X, y)
+        splits = list(self.splitter.split(X))
+
+        if self.n_jobs == 1 or len(splits) < 2:
+            fold_results = [_run_fold(estimator, X_path, y_path, fold, tr, te)
+                            for fold, (tr, te) in enumerate(splits)]
+        else:
+            fold_results = Parallel(n_jobs=self.n_jobs)(
+                delayed(_run_fold)(estimator, X_path, y_path, fold, tr, te)
+                for fold, (tr, te) in enumerate(splits)
+            )
+
+        oof = np.full(len(X), np.nan)
+        for result in fold_results:
+            if result['proba'] is not None:
+                oof[result['test_idx']] = result['proba']
+
+        aucs = [r['auc'] for r in fold_results if r['auc'] is not None]
+        accuracies = [r['accuracy'] for r in fold_results if r['accuracy'] is not None]
+        folds = [{k: v for k, v in r.items() if k not in ('test_idx', 'proba')} for r in fold_results]
+
+        return {
+            'folds': folds,
+            'mean_auc': float(np.mean(aucs)) if aucs else 0.5,
+            'mean_accuracy': float(np.mean(accuracies)) if accuracies else 0.0,
+            'oof_pred': oof
+        }
+
+
+def fold_rows(symbol: str, model_type: str, version: str, result: Dict) -> List[tuple]:
+    """Flatten a validation result into walk_forward_folds rows"""
+    timestamp = datetime.now().isoformat()
+    return [(timestamp, symbol, model_type, version, f['fold'], f['n_train'], f['n_test'],
+             f['auc'], f['accuracy'], f['fit_seconds']) for f in result['folds']]
+
+
+def store_fold_metrics(conn, rows: List[tuple]):
+    """Write fold-level metrics for one or more validations in a single transaction"""
+    if not rows:
+        return
+    with conn:
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS walk_forward_folds (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp TEXT,
+                symbol TEXT,
+                model_type TEXT,
+                version TEXT,
+                fold INTEGER,
+                n_train INTEGER,
+                n_test INTEGER,
+                roc_auc REAL,
+                accuracy REAL,
+                fit_seconds REAL
+            )
+        ''')
+        conn.executemany('''
+            INSERT INTO walk_forward_folds
+            (timestamp, symbol, model_type, version, fold, n_train, n_test, roc_auc, accuracy, fit_seconds)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows)